@@ -3,15 +3,21 @@
 Script principal de nettoyage et normalisation
 """
 
+import argparse
+import os
+import time
+import traceback
 import pandas as pd
 import json
 import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 import sys
 
 # Import des modules de nettoyage
 sys.path.append(str(Path(__file__).parent))
 from modules.sirene_validator import SIRENEValidator
+from modules.shard_store import ShardStore, write_parquet
 from modules.cleaners.job_cleaner import JobDataCleaner
 from modules.cleaners.github_cleaner import GitHubDataCleaner
 from modules.cleaners.trends_cleaner import TrendsDataCleaner
@@ -21,6 +27,26 @@ from modules.cleaners.survey_cleaner import SurveyDataCleaner
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Sources indépendantes (répertoires bruts et fichiers parquet disjoints) → étape du pipeline
+SOURCE_STEPS = {
+    'jobs': 'process_job_data',
+    'github': 'process_github_data',
+    'trends': 'process_trends_data',
+    'surveys': 'process_survey_data',
+}
+
+# Pipeline propre à chaque worker (dictionnaires chargés une fois par processus)
+_worker_pipeline = None
+
+def _init_worker():
+    """Initialisation d'un worker du pool: charge les dictionnaires une seule fois"""
+    global _worker_pipeline
+    _worker_pipeline = DataCleaningPipeline()
+
+def _run_source_in_worker(source):
+    """Nettoie une source dans le worker courant"""
+    return _worker_pipeline.run_source(source)
+
 class DataCleaningPipeline:
     """Pipeline principal de nettoyage des données"""
     
@@ -29,6 +55,9 @@ class DataCleaningPipeline:
         self.dictionaries = {}
         self.sirene_validator = SIRENEValidator()
         self.load_dictionaries()
+        # Shards par fichier brut: seuls les fichiers nouveaux ou modifiés sont renettoyés
+        self.shard_store = ShardStore(self.project_root / "data" / "cache" / "clean_shards",
+                                      self.project_root, self.dictionaries)
     
     def load_dictionaries(self):
         """Charge tous les dictionnaires de normalisation"""
@@ -70,7 +99,7 @@ class DataCleaningPipeline:
         """Traite les données d'emploi (Adzuna + Glassdoor)"""
         logger.info("=== TRAITEMENT DES DONNÉES D'EMPLOI ===")
         
-        job_cleaner = JobDataCleaner(self.project_root, self.dictionaries, self.sirene_validator)
+        job_cleaner = JobDataCleaner(self.project_root, self.dictionaries, self.sirene_validator, self.shard_store)
         job_results = job_cleaner.clean_data()
         
         results = {}
@@ -78,13 +107,13 @@ class DataCleaningPipeline:
         # Sauvegarde des résultats
         if 'adzuna' in job_results:
             output_path = self.project_root / "data" / "clean" / "adzuna_jobs_clean.parquet"
-            job_results['adzuna'].to_parquet(output_path, compression='snappy', index=False)
+            write_parquet(job_results['adzuna'], output_path)
             logger.info(f"[OK] Adzuna sauvé: {len(job_results['adzuna'])} lignes → {output_path}")
             results['adzuna'] = len(job_results['adzuna'])
         
         if 'glassdoor' in job_results:
             output_path = self.project_root / "data" / "clean" / "glassdoor_jobs_clean.parquet"
-            job_results['glassdoor'].to_parquet(output_path, compression='snappy', index=False)
+            write_parquet(job_results['glassdoor'], output_path)
             logger.info(f"[OK] Glassdoor sauvé: {len(job_results['glassdoor'])} lignes → {output_path}")
             results['glassdoor'] = len(job_results['glassdoor'])
         
@@ -93,7 +122,7 @@ class DataCleaningPipeline:
             consolidated = self._consolidate_job_data(job_results['adzuna'], job_results['glassdoor'])
             if consolidated is not None:
                 output_path = self.project_root / "data" / "clean" / "jobs_consolidated_clean.parquet"
-                consolidated.to_parquet(output_path, compression='snappy', index=False)
+                write_parquet(consolidated, output_path)
                 logger.info(f"[OK] Consolidé sauvé: {len(consolidated)} lignes → {output_path}")
                 results['consolidated'] = len(consolidated)
                 
@@ -106,7 +135,7 @@ class DataCleaningPipeline:
         """Traite les données GitHub"""
         logger.info("=== TRAITEMENT DES DONNÉES GITHUB ===")
         
-        github_cleaner = GitHubDataCleaner(self.project_root, self.dictionaries)
+        github_cleaner = GitHubDataCleaner(self.project_root, self.dictionaries, self.shard_store)
         github_results = github_cleaner.clean_data()
         
         results = {}
@@ -115,13 +144,13 @@ class DataCleaningPipeline:
             # Sauvegarde séparée des language stats et trending repos
             if 'language_stats' in github_results:
                 output_path = self.project_root / "data" / "clean" / "github_language_stats_clean.parquet"
-                github_results['language_stats'].to_parquet(output_path, compression='snappy', index=False)
+                write_parquet(github_results['language_stats'], output_path)
                 logger.info(f"[OK] GitHub Language Stats sauvé: {len(github_results['language_stats'])} lignes → {output_path}")
                 results['github_language_stats'] = len(github_results['language_stats'])
             
             if 'trending_repos' in github_results:
                 output_path = self.project_root / "data" / "clean" / "github_trending_repos_clean.parquet"
-                github_results['trending_repos'].to_parquet(output_path, compression='snappy', index=False)
+                write_parquet(github_results['trending_repos'], output_path)
                 logger.info(f"[OK] GitHub Trending Repos sauvé: {len(github_results['trending_repos'])} lignes → {output_path}")
                 results['github_trending_repos'] = len(github_results['trending_repos'])
         
@@ -131,7 +160,7 @@ class DataCleaningPipeline:
         """Traite les données Google Trends"""
         logger.info("=== TRAITEMENT DES DONNÉES GOOGLE TRENDS ===")
         
-        trends_cleaner = TrendsDataCleaner(self.project_root, self.dictionaries)
+        trends_cleaner = TrendsDataCleaner(self.project_root, self.dictionaries, self.shard_store)
         trends_results = trends_cleaner.clean_data()
         
         results = {}
@@ -140,13 +169,13 @@ class DataCleaningPipeline:
             # Sauvegarde séparée des comparaisons tech et tendances pays
             if 'tech_comparisons' in trends_results:
                 output_path = self.project_root / "data" / "clean" / "tech_comparisons_clean.parquet"
-                trends_results['tech_comparisons'].to_parquet(output_path, compression='snappy', index=False)
+                write_parquet(trends_results['tech_comparisons'], output_path)
                 logger.info(f"[OK] Tech Comparisons sauvé: {len(trends_results['tech_comparisons'])} lignes → {output_path}")
                 results['tech_comparisons'] = len(trends_results['tech_comparisons'])
             
             if 'country_trends' in trends_results:
                 output_path = self.project_root / "data" / "clean" / "country_trends_clean.parquet"
-                trends_results['country_trends'].to_parquet(output_path, compression='snappy', index=False)
+                write_parquet(trends_results['country_trends'], output_path)
                 logger.info(f"[OK] Country Trends sauvé: {len(trends_results['country_trends'])} lignes → {output_path}")
                 results['country_trends'] = len(trends_results['country_trends'])
         
@@ -156,7 +185,7 @@ class DataCleaningPipeline:
         """Traite les données de surveys"""
         logger.info("=== TRAITEMENT DES DONNÉES SURVEYS ===")
         
-        survey_cleaner = SurveyDataCleaner(self.project_root, self.dictionaries)
+        survey_cleaner = SurveyDataCleaner(self.project_root, self.dictionaries, self.shard_store)
         survey_results = survey_cleaner.clean_data()
         
         results = {}
@@ -165,19 +194,19 @@ class DataCleaningPipeline:
             # Sauvegarde séparée de chaque survey
             if 'kaggle_europe' in survey_results:
                 output_path = self.project_root / "data" / "clean" / "kaggle_europe_clean.parquet"
-                survey_results['kaggle_europe'].to_parquet(output_path, compression='snappy', index=False)
+                write_parquet(survey_results['kaggle_europe'], output_path)
                 logger.info(f"[OK] Kaggle Europe sauvé: {len(survey_results['kaggle_europe'])} lignes → {output_path}")
                 results['kaggle_europe'] = len(survey_results['kaggle_europe'])
             
             if 'kaggle_raw' in survey_results:
                 output_path = self.project_root / "data" / "clean" / "kaggle_raw_clean.parquet"
-                survey_results['kaggle_raw'].to_parquet(output_path, compression='snappy', index=False)
+                write_parquet(survey_results['kaggle_raw'], output_path)
                 logger.info(f"[OK] Kaggle Raw sauvé: {len(survey_results['kaggle_raw'])} lignes → {output_path}")
                 results['kaggle_raw'] = len(survey_results['kaggle_raw'])
             
             if 'stackoverflow' in survey_results:
                 output_path = self.project_root / "data" / "clean" / "stackoverflow_clean.parquet"
-                survey_results['stackoverflow'].to_parquet(output_path, compression='snappy', index=False)
+                write_parquet(survey_results['stackoverflow'], output_path)
                 logger.info(f"[OK] StackOverflow sauvé: {len(survey_results['stackoverflow'])} lignes → {output_path}")
                 results['stackoverflow'] = len(survey_results['stackoverflow'])
         
@@ -211,39 +240,109 @@ class DataCleaningPipeline:
             total_french = len(french_jobs)
             logger.info(f"Validation globale: {verified_count}/{total_french} entreprises françaises vérifiées ({verified_count/total_french*100:.1f}%)")
     
-    def run_pipeline(self):
-        """Exécute le pipeline complet"""
+    def run_source(self, source):
+        """
+        Nettoie une source et capture son résultat
+        
+        Returns:
+            dict: source, results (lignes par fichier), seconds, error
+                (None si succès) — une erreur n'interrompt pas les autres sources
+        """
+        start = time.perf_counter()
+        try:
+            results = getattr(self, SOURCE_STEPS[source])()
+            error = None
+        except Exception as e:
+            logger.error(f"[NOK] Source {source} en erreur: {e}")
+            results, error = {}, traceback.format_exc()
+        
+        return {'source': source, 'results': results,
+                'seconds': time.perf_counter() - start, 'error': error}
+    
+    def _run_parallel(self, sources, workers):
+        """Une source par worker, résultats collectés au fil de l'eau"""
+        reports = {}
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            futures = {executor.submit(_run_source_in_worker, source): source for source in sources}
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    reports[source] = future.result()
+                except Exception as e:
+                    # Worker mort (mémoire, signal): la source est marquée en erreur
+                    logger.error(f"[NOK] Worker de la source {source} interrompu: {e}")
+                    reports[source] = {'source': source, 'results': {}, 'seconds': None, 'error': repr(e)}
+        
+        # Ordre d'affichage stable quel que soit l'ordre de fin
+        return [reports[source] for source in sources]
+    
+    def _log_reports(self, reports, elapsed):
+        """Résumé par source: lignes, durée, erreurs"""
+        logger.info("=== RÉSUMÉ PAR SOURCE ===")
+        for report in reports:
+            seconds = f"{report['seconds']:.1f}s" if report['seconds'] is not None else "-"
+            if report['error']:
+                logger.error(f"   [NOK] {report['source']}: erreur après {seconds}")
+                logger.error(report['error'])
+            else:
+                rows = sum(report['results'].values())
+                logger.info(f"   [OK] {report['source']}: {rows} lignes en {seconds}")
+        logger.info(f"Durée totale: {elapsed:.1f}s")
+    
+    def run_pipeline(self, workers=None, sequential=False, full=False):
+        """
+        Exécute le pipeline complet
+        
+        Par défaut chaque source (emploi, GitHub, Trends, surveys) est
+        nettoyée dans son propre processus; la durée totale tend vers celle
+        de la source la plus lente. sequential=True garde l'exécution
+        historique dans le processus courant.
+        
+        Seuls les fichiers bruts nouveaux ou modifiés depuis le run
+        précédent sont renettoyés; full=True supprime les shards et
+        renettoie tout.
+        """
         logger.info("Démarrage du pipeline de nettoyage modulaire - Bryan")
         
+        if full:
+            logger.info("Nettoyage complet: suppression des shards existants")
+            self.shard_store.clear()
+        
         # Test des dictionnaires
         self.test_dictionaries()
         
-        # Traitement par module
-        all_results = {}
-        
-        # 1. Données d'emploi
-        job_results = self.process_job_data()
-        all_results.update(job_results)
+        sources = list(SOURCE_STEPS)
+        workers = min(workers or os.cpu_count() or 1, len(sources))
+        start = time.perf_counter()
         
-        # 2. Données GitHub
-        github_results = self.process_github_data()
-        all_results.update(github_results)
-        
-        # 3. Données Google Trends
-        trends_results = self.process_trends_data()
-        all_results.update(trends_results)
+        if sequential or workers == 1:
+            logger.info("Exécution séquentielle des sources")
+            reports = [self.run_source(source) for source in sources]
+        else:
+            logger.info(f"Exécution parallèle: {len(sources)} sources sur {workers} processus")
+            reports = self._run_parallel(sources, workers)
         
-        # 4. Données de surveys
-        survey_results = self.process_survey_data()
-        all_results.update(survey_results)
+        self._log_reports(reports, time.perf_counter() - start)
         
+        all_results = {}
+        for report in reports:
+            all_results.update(report['results'])
         return all_results
 
 def main():
     """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Pipeline de nettoyage des données TalentInsight")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Nombre de processus (défaut: nombre de CPU, au plus une source par processus)")
+    parser.add_argument('--sequential', action='store_true',
+                        help="Nettoie les sources l'une après l'autre dans le processus courant")
+    parser.add_argument('--full', action='store_true',
+                        help="Renettoie tous les fichiers bruts (ignore les shards du run précédent)")
+    args = parser.parse_args()
+    
     try:
         pipeline = DataCleaningPipeline()
-        results = pipeline.run_pipeline()
+        results = pipeline.run_pipeline(workers=args.workers, sequential=args.sequential, full=args.full)
         
         if results:
             logger.info("[OK] Pipeline terminé avec succès!")
@@ -255,7 +354,6 @@ def main():
             
     except Exception as e:
         logger.error(f"[NOK] Erreur générale: {e}")
-        import traceback
         traceback.print_exc()
 
 if __name__ == "__main__":
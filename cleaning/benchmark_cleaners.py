@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark des normalisations du nettoyage: version ligne à ligne (`.apply`)
+contre version colonne, sur les données brutes StackOverflow et Kaggle
+(pays, technologies, salaires, listes de compétences).
+
+Chaque comparaison vérifie d'abord que les deux versions produisent
+exactement la même colonne, puis mesure le meilleur temps sur plusieurs
+exécutions.
+
+Usage: python cleaning/benchmark_cleaners.py [--scale 10] [--runs 3]
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent))
+from modules.cleaners.base_cleaner import BaseDataCleaner
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+class BenchmarkCleaner(BaseDataCleaner):
+    """Nettoyeur minimal donnant accès aux normalisations de BaseDataCleaner"""
+
+    def clean_data(self):
+        return None
+
+
+def load_dictionaries():
+    """Dictionnaires de normalisation (mêmes fichiers que le pipeline)"""
+    dict_path = PROJECT_ROOT / "dictionaries"
+    dictionaries = {}
+    for key, filename in [('tech', 'tech_mapping.json'), ('countries', 'countries.json')]:
+        with open(dict_path / filename, 'r', encoding='utf-8') as f:
+            dictionaries[key] = json.load(f)
+    return dictionaries
+
+
+def load_raw_sets(scale):
+    """Fichiers bruts StackOverflow (consolidé) et Kaggle, répliqués `scale` fois"""
+    raw_path = PROJECT_ROOT / "data" / "raw"
+    sets = {}
+
+    stackoverflow_files = sorted((raw_path / "stackoverflow").glob("*all_countries*.csv"))
+    if stackoverflow_files:
+        sets['StackOverflow'] = pd.read_csv(stackoverflow_files[-1])
+
+    kaggle_files = sorted((raw_path / "kaggle").glob("*.csv"))
+    if kaggle_files:
+        df = pd.read_csv(kaggle_files[-1])
+        if 'country_code' in df.columns and 'country' not in df.columns:
+            df['country'] = df['country_code']
+        sets['Kaggle'] = df
+
+    return {name: pd.concat([df] * scale, ignore_index=True) for name, df in sets.items()}
+
+
+def best_time(func, runs):
+    """Meilleur temps d'exécution (secondes) et résultat de la dernière exécution"""
+    best = float('inf')
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def as_lists(series):
+    """Cellules en listes Python (None si vide) pour comparer listes objet et listes Arrow"""
+    return [list(value) if isinstance(value, (list, tuple, np.ndarray)) else None for value in series]
+
+
+def compare(label, scalar_func, column_func, runs, lists=False):
+    """Vérifie l'égalité des deux versions puis affiche le gain"""
+    scalar_time, expected = best_time(scalar_func, runs)
+    column_time, actual = best_time(column_func, runs)
+    if lists:
+        assert as_lists(expected) == as_lists(actual), f"{label}: résultats différents"
+    else:
+        pd.testing.assert_series_equal(expected, actual, check_names=False)
+
+    speedup = scalar_time / column_time if column_time else float('inf')
+    logger.info(f"  {label:<32} ligne: {scalar_time * 1000:8.1f} ms | "
+                f"colonne: {column_time * 1000:7.1f} ms | x{speedup:.0f}")
+    return speedup
+
+
+def benchmark_normalizers(cleaner, name, df, runs):
+    """Pays, technologies et salaires d'un jeu de données"""
+    logger.info(f"{name}: {len(df)} lignes")
+    currency_col = 'currency' if 'currency' in df.columns else None
+
+    if 'country' in df.columns:
+        compare('normalize_country', lambda: df['country'].apply(cleaner.normalize_country),
+                lambda: cleaner.normalize_country_column(df['country']), runs)
+
+    for col in ['language', 'skills', 'languages_worked']:
+        if col in df.columns:
+            compare(f'normalize_technology ({col})', lambda: df[col].apply(cleaner.normalize_technology),
+                    lambda: cleaner.normalize_technology_column(df[col]), runs)
+
+    currencies = df[currency_col] if currency_col else None
+    for col in ['salary_eur', 'salary_yearly', 'salary']:
+        if col in df.columns:
+            compare(f'normalize_salary ({col})',
+                    lambda: df.apply(lambda row: cleaner.normalize_salary(row.get(col), row.get(currency_col)), axis=1),
+                    lambda: cleaner.normalize_salary_column(df[col], currencies), runs)
+
+    # Listes de compétences: normalize_skills ligne à ligne vs parse_skills_column (listes Arrow)
+    for col in ['languages_worked', 'skills']:
+        if col in df.columns:
+            compare(f'normalize_skills ({col})', lambda: df[col].apply(cleaner.normalize_skills),
+                    lambda: cleaner.parse_skills_column(df[col]), runs, lists=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des normalisations du nettoyage")
+    parser.add_argument('--scale', type=int, default=1, help="Réplique les jeux bruts N fois")
+    parser.add_argument('--runs', type=int, default=3, help="Exécutions par mesure (meilleur temps)")
+    args = parser.parse_args()
+
+    cleaner = BenchmarkCleaner(PROJECT_ROOT, load_dictionaries())
+    raw_sets = load_raw_sets(args.scale)
+    if not raw_sets:
+        logger.error("[NOK] Aucune donnée brute StackOverflow/Kaggle trouvée")
+        return
+
+    for name, df in raw_sets.items():
+        benchmark_normalizers(cleaner, name, df, args.runs)
+
+
+if __name__ == "__main__":
+    main()
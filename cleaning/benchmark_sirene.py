@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la validation SIRENE: index (exact + bigrammes) contre le
+parcours exhaustif historique, sur une base SIRENE synthétique.
+
+La base est l'échantillon dictionaries/sirene_sample.csv complété de
+noms générés à partir des entreprises des offres Adzuna/Glassdoor
+(mots recombinés, variantes orthographiques). Les requêtes sont les
+noms d'entreprise des offres, plus autant de noms faits de mots
+fréquents (SAS, FRANCE, CONSEIL, GROUP...). Chaque requête vérifie que
+l'index renvoie la même ligne et le même score que le parcours
+exhaustif; le script échoue (code 1) au moindre écart.
+--no-exhaustive ne mesure que l'index (grandes bases, 10M noms: le
+parcours exhaustif prendrait des heures).
+
+Usage: python cleaning/benchmark_sirene.py [--names 50000] [--queries 100] [--no-exhaustive]
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+from fuzzywuzzy import fuzz
+
+sys.path.append(str(Path(__file__).parent))
+from modules.sirene_index import SireneIndex
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+LEGAL_SUFFIXES = ['', ' SAS', ' SARL', ' SA', ' FRANCE', ' CONSULTING', ' GROUP', ' SERVICES', ' TECHNOLOGIES']
+
+
+def load_company_names():
+    """Noms d'entreprise des offres brutes (requêtes et graines de la base)"""
+    raw_path = PROJECT_ROOT / "data" / "raw"
+    names = []
+    for file in sorted((raw_path / "adzuna").glob("*.csv")) + sorted((raw_path / "glassdoor").glob("*.csv")):
+        df = pd.read_csv(file)
+        if 'company' in df.columns:
+            names.extend(df['company'].dropna().astype(str))
+    return list(dict.fromkeys(names))
+
+
+def mutate(name, rng):
+    """Variante orthographique: suppression, substitution ou inversion d'un caractère"""
+    if len(name) < 4:
+        return name
+    i = rng.randrange(len(name) - 1)
+    operation = rng.randrange(3)
+    if operation == 0:
+        return name[:i] + name[i + 1:]
+    if operation == 1:
+        return name[:i] + rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') + name[i + 1:]
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+
+def company_words(seed_names):
+    """Mots des noms d'entreprise (plus de deux lettres)"""
+    return sorted({word for name in seed_names for word in name.upper().split() if len(word) > 2})
+
+
+def build_names(seed_names, size, rng):
+    """Base synthétique de `size` noms (échantillon SIRENE en tête)"""
+    sample = pd.read_csv(PROJECT_ROOT / "dictionaries" / "sirene_sample.csv")
+    names = list(sample['company_name'])
+    words = company_words(seed_names)
+
+    while len(names) < size:
+        roll = rng.random()
+        if roll < 0.3:
+            name = mutate(rng.choice(seed_names).upper(), rng)
+        else:
+            name = ' '.join(rng.sample(words, rng.randint(1, 3)))
+        names.append(name + rng.choice(LEGAL_SUFFIXES))
+    return names[:size]
+
+
+def common_word_queries(names, count, rng):
+    """Requêtes faites des mots les plus fréquents de la base (nombreux candidats proches)"""
+    counts = pd.Series([word for name in names for word in str(name).upper().split()]).value_counts()
+    words = list(counts.index[:40])
+    return [' '.join(rng.sample(words, rng.randint(2, 5))) for _ in range(count)]
+
+
+def brute_force(query, names, optimized):
+    """Parcours exhaustif historique (validate_company_fuzzy[_optimized]): (ligne, score)"""
+    query = str(query).upper().strip()
+    best_row, best_score = -1, 0
+    for row, name in enumerate(names):
+        name = str(name).upper().strip()
+        if optimized:
+            if abs(len(query) - len(name)) > max(len(query), len(name)) * 0.5:
+                continue
+            if query and name and query[0] != name[0]:
+                continue
+        score = fuzz.ratio(query, name)
+        if score > best_score:
+            best_row, best_score = row, score
+    return best_row, best_score
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark index SIRENE vs parcours exhaustif")
+    parser.add_argument('--names', type=int, default=50_000, help="Taille de la base synthétique")
+    parser.add_argument('--queries', type=int, default=100, help="Requêtes comparées au parcours exhaustif")
+    parser.add_argument('--no-exhaustive', action='store_true', help="Latence de l'index seule, sans comparaison")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    companies = load_company_names()
+    if not companies:
+        logger.error("[NOK] Aucune entreprise trouvée dans data/raw/adzuna et data/raw/glassdoor")
+        return
+
+    names = build_names(companies, args.names, rng)
+    start = time.perf_counter()
+    index = SireneIndex(names)
+    logger.info(f"Index construit: {len(names)} noms en {time.perf_counter() - start:.1f}s")
+
+    queries = rng.sample(companies, min(args.queries, len(companies)))
+    queries += common_word_queries(names, len(queries), rng)
+    total_mismatches = 0
+    for label, min_score, options, optimized in [
+            ('fuzzy (80)', 80, {}, False),
+            ('fuzzy_optimized (75)', 75, {'same_first_char': True, 'max_length_gap': 0.5}, True)]:
+        index_time, brute_time, mismatches = 0.0, 0.0, 0
+        for query in queries:
+            start = time.perf_counter()
+            row, score = index.best_match(query, fuzz.ratio, min_score=min_score, **options)
+            index_time += time.perf_counter() - start
+            if args.no_exhaustive:
+                continue
+
+            start = time.perf_counter()
+            expected_row, expected = brute_force(query, names, optimized)
+            brute_time += time.perf_counter() - start
+
+            # Seul le meilleur score au-dessus du seuil est utilisé (sinon "not_found")
+            if (score >= min_score or expected >= min_score) and (row, score) != (expected_row, expected):
+                mismatches += 1
+                logger.error(f"  {query!r}: index {score} (ligne {row}) vs exhaustif {expected} "
+                             f"(ligne {expected_row})")
+
+        if args.no_exhaustive:
+            logger.info(f"  {label:<22} index: {index_time / len(queries) * 1000:7.3f} ms/requête")
+            continue
+        logger.info(f"  {label:<22} index: {index_time / len(queries) * 1000:7.3f} ms/requête | "
+                    f"exhaustif: {brute_time / len(queries) * 1000:9.1f} ms/requête | "
+                    f"écarts: {mismatches}/{len(queries)}")
+        total_mismatches += mismatches
+
+    if args.no_exhaustive:
+        return
+    if total_mismatches:
+        logger.error(f"[NOK] {total_mismatches} écarts avec le parcours exhaustif")
+        sys.exit(1)
+    logger.info("[OK] Même meilleur nom que le parcours exhaustif pour toutes les requêtes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Conversion d'un CSV SIRENE en store colonnaire (dictionaries/sirene_store/)
+
+Le pipeline convertit automatiquement dictionaries/sirene_sample.csv;
+ce script sert aux grandes bases, par exemple le stock national des
+établissements INSEE (--insee pour ses noms de colonnes). Une fois
+converti, le CSV source peut être supprimé: le store est utilisé tel quel.
+
+Stock INSEE: la plupart des établissements n'ont ni dénomination usuelle
+ni enseigne; le nom de l'entreprise est la dénomination de l'unité légale
+(StockUniteLegale_utf8.csv, --legal-units), jointe par SIREN. Ordre retenu:
+dénomination de l'unité légale, dénomination usuelle de l'établissement,
+enseigne. Le statut A/F devient Actif/Fermé.
+
+Usage: python cleaning/build_sirene_store.py --source StockEtablissement_utf8.csv --insee \
+           --legal-units StockUniteLegale_utf8.csv
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+from modules.sirene_store import INSEE_STATUS_LABELS, INSEE_STOCK_COLUMNS, SireneStore, build_sirene_store
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversion CSV SIRENE → store colonnaire")
+    parser.add_argument('--source', type=Path, default=PROJECT_ROOT / "dictionaries" / "sirene_sample.csv",
+                        help="CSV SIRENE à convertir")
+    parser.add_argument('--store', type=Path, default=PROJECT_ROOT / "dictionaries" / "sirene_store",
+                        help="Dossier du store")
+    parser.add_argument('--insee', action='store_true', help="Colonnes du stock des établissements INSEE")
+    parser.add_argument('--legal-units', type=Path,
+                        help="Stock des unités légales INSEE (dénomination jointe par SIREN)")
+    args = parser.parse_args()
+
+    for path in (args.source, args.legal_units):
+        if path is not None and not path.exists():
+            logger.error(f"[NOK] Fichier SIRENE introuvable: {path}")
+            return
+    if args.insee and args.legal_units is None:
+        logger.warning("[ATTENTION] Sans --legal-units, la plupart des établissements INSEE n'ont pas de nom")
+
+    build_sirene_store(args.source, args.store,
+                       columns=INSEE_STOCK_COLUMNS if args.insee else None,
+                       status_labels=INSEE_STATUS_LABELS if args.insee else None,
+                       legal_units=args.legal_units)
+
+    start = time.perf_counter()
+    store = SireneStore(args.store).open()
+    logger.info(f"Ouverture du store: {len(store)} établissements en {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,11 @@
 Classe de base simplifiée pour les nettoyeurs de données
 """
 
+import ast
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import logging
 from pathlib import Path
 from abc import ABC, abstractmethod
@@ -13,15 +17,56 @@ logger = logging.getLogger(__name__)
 class BaseDataCleaner(ABC):
     """Classe de base simplifiée pour tous les nettoyeurs de données"""
     
-    def __init__(self, project_root, dictionaries):
+    # Taux de conversion vers l'EUR
+    SALARY_RATES = {'EUR': 1.0, 'USD': 0.92, 'GBP': 1.17, 'CHF': 1.05}
+    
+    def __init__(self, project_root, dictionaries, shard_store=None):
         self.project_root = Path(project_root)
         self.dictionaries = dictionaries
+        # ShardStore (nettoyage incrémental), None = tout renettoyer
+        self.shard_store = shard_store
     
     @abstractmethod
     def clean_data(self):
         """Méthode abstraite pour nettoyer les données"""
         pass
     
+    def clean_files(self, files, table, clean_file):
+        """
+        Lignes nettoyées de chaque fichier brut, fusionnées
+        
+        `clean_file(path)` lit et normalise un seul fichier (traitements
+        ligne à ligne uniquement). Avec un shard_store, un fichier inchangé
+        depuis le run précédent est relu depuis son shard.
+        
+        Returns:
+            DataFrame concaténé (ordre des fichiers conservé) ou None
+        """
+        frames = []
+        for path in files:
+            df = self.shard_store.load(table, path) if self.shard_store else None
+            if df is not None:
+                logger.info(f"{path.name}: {len(df)} lignes (inchangé, shard réutilisé)")
+            else:
+                try:
+                    df = clean_file(path)
+                except Exception as e:
+                    logger.error(f"[NOK] Erreur lecture {path.name}: {e}")
+                    continue
+                if df is None:
+                    continue
+                if self.shard_store:
+                    self.shard_store.save(table, path, df)
+            frames.append(df)
+        
+        if self.shard_store:
+            self.shard_store.prune(table, files)
+            self.shard_store.flush(table)
+        
+        if not frames:
+            return None
+        return pd.concat(frames, ignore_index=True)
+    
     def normalize_technology(self, tech_str):
         """Normalise une technologie"""
         if pd.isna(tech_str):
@@ -41,29 +86,93 @@ class BaseDataCleaner(ABC):
         if pd.isna(salary_value) or salary_value == 0:
             return None
         
-        rates = {'EUR': 1.0, 'USD': 0.92, 'GBP': 1.17, 'CHF': 1.05}
         currency_clean = str(currency).upper() if currency else 'EUR'
-        rate = rates.get(currency_clean, 1.0)
+        rate = self.SALARY_RATES.get(currency_clean, 1.0)
         
         try:
             return float(salary_value) * rate
         except:
             return None
     
+    # Versions colonne des normalisations ci-dessus: même résultat que
+    # `.apply` ligne à ligne, mais la normalisation scalaire n'est appelée
+    # qu'une fois par valeur distincte (quelques dizaines de pays ou
+    # technologies pour des milliers de lignes) puis redéployée par codes.
+    
+    def _normalize_distinct(self, series, normalize):
+        """Applique `normalize` aux valeurs distinctes de la colonne puis redéploie"""
+        if series.empty:
+            return series.copy()
+        
+        codes, uniques = pd.factorize(series)
+        normalized = [normalize(value) for value in uniques]
+        
+        if isinstance(series.dtype, pd.StringDtype) and all(isinstance(value, str) for value in normalized):
+            # Colonne texte: redéploiement par take Arrow, codes -1 → NaN comme l'original
+            values = pd.array(normalized, dtype=series.dtype).take(codes, allow_fill=True)
+            return pd.Series(values, index=series.index, name=series.name)
+        
+        # Codes -1 = valeurs manquantes: renvoyées telles quelles comme en scalaire
+        values = series.to_numpy(dtype=object, copy=True)
+        present = codes != -1
+        values[present] = np.array(normalized, dtype=object)[codes[present]]
+        return pd.Series(values, index=series.index, name=series.name).infer_objects()
+    
+    def normalize_technology_column(self, series):
+        """Normalise une colonne de technologies (équivalent vectorisé de normalize_technology)"""
+        return self._normalize_distinct(series, self.normalize_technology)
+    
+    def normalize_country_column(self, series):
+        """Normalise une colonne de pays (équivalent vectorisé de normalize_country)"""
+        return self._normalize_distinct(series, self.normalize_country)
+    
+    def normalize_salary_column(self, salaries, currencies=None):
+        """
+        Convertit une colonne de salaires en EUR (équivalent vectorisé de normalize_salary)
+        
+        Le taux de chaque ligne vient de sa devise (EUR par défaut) et le
+        produit est fait sur la colonne entière; salaires manquants, nuls ou
+        non numériques → NaN.
+        """
+        if currencies is None:
+            rate = 1.0
+        else:
+            codes, uniques = pd.factorize(currencies)
+            # Devise vide/None → EUR, inconnue → 1.0 (même règle que la version scalaire)
+            distinct_rates = np.array([self.SALARY_RATES.get(str(currency).upper() if currency else 'EUR', 1.0)
+                                       for currency in uniques] + [1.0])
+            # Code -1 (devise manquante) → dernier élément, taux 1.0
+            rate = distinct_rates[codes]
+        
+        values = pd.to_numeric(salaries, errors='coerce')
+        values = values.mask(salaries.isna() | (salaries == 0))
+        return (values.astype(float) * rate).rename(None)
+    
+    def split_skills(self, skills_str):
+        """
+        Liste brute des compétences d'une cellule
+        
+        Littéral de liste ("['Python', 'SQL']") lu avec ast.literal_eval
+        (jamais exécuté), sinon texte délimité par ';' s'il y en a
+        (languages_worked StackOverflow) ou par ','.
+        """
+        if isinstance(skills_str, str):
+            if skills_str.startswith('['):
+                parsed = ast.literal_eval(skills_str)
+                if not isinstance(parsed, (list, tuple)):
+                    raise ValueError("le littéral n'est pas une liste")
+                return [item if isinstance(item, str) else str(item) for item in parsed if item]
+            delimiter = ';' if ';' in skills_str else ','
+            return [s.strip() for s in skills_str.split(delimiter)]
+        return [str(skills_str)]
+    
     def normalize_skills(self, skills_str):
         """Normalise une liste de compétences"""
         if pd.isna(skills_str):
             return None
         
         try:
-            if isinstance(skills_str, str):
-                if skills_str.startswith('['):
-                    skills_list = eval(skills_str)
-                else:
-                    skills_list = [s.strip() for s in skills_str.split(',')]
-            else:
-                skills_list = [str(skills_str)]
-            
+            skills_list = self.split_skills(skills_str)
             normalized = [self.normalize_technology(skill) for skill in skills_list if skill]
             return normalized if normalized else None
             
@@ -71,6 +180,81 @@ class BaseDataCleaner(ABC):
             logger.warning(f"Erreur normalisation skills '{skills_str}': {e}")
             return None
     
+    def parse_skills_column(self, series):
+        """
+        Normalise une colonne de compétences en une passe (équivalent de normalize_skills)
+        
+        Les cellules délimitées sont découpées par Arrow, aplaties en une
+        seule colonne de compétences, normalisées une fois par valeur
+        distincte puis regroupées par ligne. Les littéraux de liste et
+        valeurs non texte (rares) passent par split_skills.
+        
+        Returns:
+            Series list<string> Arrow, nulle là où normalize_skills renvoie None
+        """
+        n = len(series)
+        present = series.notna().to_numpy()
+        if isinstance(series.dtype, pd.StringDtype):
+            # Colonne texte: tableau Arrow direct, sans passage par des objets Python
+            values = None
+            is_text = present
+            text = pa.chunked_array(pa.array(series.array)).combine_chunks().cast(pa.string())
+        else:
+            values = series.to_numpy(dtype=object)
+            is_text = np.fromiter((isinstance(value, str) for value in values), dtype=bool, count=n)
+            text = pa.array(np.where(is_text, values, None), type=pa.string())
+        
+        def arrow_mask(condition):
+            return pc.fill_null(condition, False).to_numpy(zero_copy_only=False)
+        
+        literal = arrow_mask(pc.starts_with(text, pattern='['))
+        semicolon = arrow_mask(pc.match_substring(text, pattern=';'))
+        
+        item_arrays, item_rows = [], []
+        
+        # Texte délimité: split Arrow vectorisé par délimiteur
+        for delimiter, mask in ((';', is_text & ~literal & semicolon), (',', is_text & ~literal & ~semicolon)):
+            if not mask.any():
+                continue
+            split = pc.split_pattern(text.filter(pa.array(mask)), pattern=delimiter)
+            item_arrays.append(pc.utf8_trim_whitespace(pc.list_flatten(split)))
+            item_rows.append(np.flatnonzero(mask)[pc.list_parent_indices(split).to_numpy()])
+        
+        # Littéraux de liste et valeurs non texte (rares): ligne par ligne
+        invalid = np.zeros(n, dtype=bool)
+        python_items, python_rows = [], []
+        for row in np.flatnonzero((present & ~is_text) | (is_text & literal)):
+            cell = text[row].as_py() if is_text[row] else values[row]
+            try:
+                skills_list = self.split_skills(cell)
+            except Exception as e:
+                logger.warning(f"Erreur normalisation skills '{cell}': {e}")
+                invalid[row] = True
+                continue
+            python_items.extend(skills_list)
+            python_rows.extend([row] * len(skills_list))
+        item_arrays.append(pa.array(python_items, type=pa.string()))
+        item_rows.append(np.array(python_rows, dtype=np.int64))
+        
+        items = pa.concat_arrays(item_arrays)
+        rows = np.concatenate(item_rows).astype(np.int64)
+        
+        # Compétences vides écartées, normalisation par valeur distincte
+        keep = pc.not_equal(items, '').to_numpy(zero_copy_only=False)
+        items, rows = items.filter(pa.array(keep)), rows[keep]
+        encoded = pc.dictionary_encode(items)
+        distinct = pa.array([self.normalize_technology(value) for value in encoded.dictionary.to_pylist()],
+                            type=pa.string())
+        normalized = distinct.take(encoded.indices)
+        
+        # Regroupement par ligne (ordre d'origine conservé), sans compétence → null
+        order = np.argsort(rows, kind='stable')
+        counts = np.bincount(rows, minlength=n)
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int32)
+        lists = pa.ListArray.from_arrays(pa.array(offsets), normalized.take(pa.array(order)),
+                                         mask=pa.array((counts == 0) | invalid))
+        return pd.Series(pd.arrays.ArrowExtensionArray(lists), index=series.index, name=series.name)
+    
     def remove_duplicates(self, df, source_name):
         """Supprime les doublons"""
         initial_count = len(df)
@@ -85,19 +269,94 @@ class BaseDataCleaner(ABC):
         
         return df_clean
     
-    def remove_duplicates_safe(self, df, source_name):
-        """Supprime les doublons en gérant les colonnes avec des listes"""
+    # Déduplication par empreinte: un hash 64 bits par ligne, calculé
+    # colonne par colonne (les listes sont hachées élément par élément),
+    # au lieu d'une copie du DataFrame avec les listes converties en str.
+    
+    def _hash_lists(self, lists):
+        """Hash uint64 par liste Arrow (ordre, longueur et valeurs des éléments)"""
+        values = pc.list_flatten(lists)
+        parents = pc.list_parent_indices(lists).to_numpy()
+        lengths = pc.fill_null(pc.list_value_length(lists), 0).to_numpy().astype(np.uint64)
+        
+        # Position de chaque élément dans sa liste, mélangée à son hash
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+        positions = (np.arange(len(values)) - starts[parents]).astype(np.uint64)
+        element_hashes = pd.util.hash_pandas_object(values.to_pandas(), index=False).to_numpy()
+        element_hashes = pd.util.hash_array(element_hashes ^ pd.util.hash_array(positions))
+        
+        hashes = np.zeros(len(lists), dtype=np.uint64)
+        np.add.at(hashes, parents, element_hashes)
+        hashes = pd.util.hash_array(hashes ^ pd.util.hash_array(lengths))
+        # Liste nulle distincte de la liste vide
+        hashes[lists.is_null().to_numpy(zero_copy_only=False)] = np.uint64(0)
+        return hashes
+    
+    def _hash_column(self, series):
+        """Hash uint64 par cellule d'une colonne (scalaires ou listes)"""
+        dtype = series.dtype
+        if isinstance(dtype, pd.ArrowDtype) and pa.types.is_list(dtype.pyarrow_dtype):
+            return self._hash_lists(pa.chunked_array(pa.array(series.array)).combine_chunks())
+        
+        if dtype != 'object':
+            return pd.util.hash_pandas_object(series, index=False).to_numpy()
+        
+        # Colonne objet: les cellules liste (ou tableau relu d'un parquet) sont hachées à part
+        values = series.to_numpy()
+        is_list = np.fromiter((isinstance(value, (list, tuple, np.ndarray)) for value in values),
+                              dtype=bool, count=len(values))
+        if not is_list.any():
+            return pd.util.hash_pandas_object(series, index=False).to_numpy()
+        
+        hashes = pd.util.hash_pandas_object(series.where(~is_list), index=False).to_numpy(copy=True)
+        cells = [list(value) for value in values[is_list]]
+        try:
+            lists = pa.array(cells)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            lists = pa.array([[str(item) for item in cell] for cell in cells], type=pa.list_(pa.string()))
+        hashes[is_list] = self._hash_lists(lists)
+        return hashes
+    
+    def row_fingerprints(self, df, columns=None):
+        """
+        Empreinte 64 bits de chaque ligne sur `columns` (toutes par défaut)
+        
+        Deux lignes égales ont la même empreinte; la probabilité de
+        collision entre lignes différentes est négligeable (2^-64 par paire).
+        """
+        fingerprints = np.zeros(len(df), dtype=np.uint64)
+        for col in (df.columns if columns is None else columns):
+            # Mélange après chaque colonne: l'empreinte dépend de l'ordre des colonnes
+            fingerprints = pd.util.hash_array(fingerprints ^ self._hash_column(df[col]))
+        return fingerprints
+    
+    def remove_duplicates_safe(self, df, source_name, subset=None, keep_latest_by=None):
+        """
+        Supprime les doublons en gérant les colonnes avec des listes
+        
+        Args:
+            subset: colonnes clés (ex. ['id']) au lieu de la ligne entière
+            keep_latest_by: colonne date (ex. 'collected_at'); parmi les
+                doublons, garde la ligne la plus récente au lieu de la première
+        """
         initial_count = len(df)
+        if subset is not None:
+            subset = [col for col in subset if col in df.columns]
+            if not subset:
+                logger.warning(f"{source_name} - Colonnes clés absentes, déduplication sur la ligne entière")
+                subset = None
         
-        # Convertir les colonnes avec des listes en strings pour la comparaison
-        df_temp = df.copy()
-        for col in df_temp.columns:
-            if df_temp[col].dtype == 'object':
-                # Convertir les listes en strings
-                df_temp[col] = df_temp[col].apply(lambda x: str(x) if isinstance(x, list) else x)
+        fingerprints = pd.Series(self.row_fingerprints(df, subset))
+        if keep_latest_by is not None and keep_latest_by in df.columns:
+            # Tri stable par date (dates invalides en premier), dernière occurrence gardée
+            dates = pd.to_datetime(df[keep_latest_by], errors='coerce').reset_index(drop=True)
+            order = dates.sort_values(kind='stable', na_position='first').index
+            keep = np.zeros(len(df), dtype=bool)
+            keep[order[~fingerprints.reindex(order).duplicated(keep='last').to_numpy()]] = True
+        else:
+            keep = ~fingerprints.duplicated().to_numpy()
         
-        # Supprimer les doublons sur la version temporaire
-        df_clean = df.loc[~df_temp.duplicated()]
+        df_clean = df.loc[keep]
         
         final_count = len(df_clean)
         duplicates_removed = initial_count - final_count
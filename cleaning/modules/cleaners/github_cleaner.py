@@ -51,28 +51,24 @@ class GitHubDataCleaner(BaseDataCleaner):
     def _process_files(self, files, github_type):
         """Traite les fichiers GitHub selon le type"""
         logger.info(f"Fichiers {github_type}: {len(files)}")
-        all_data = []
         
-        for file in files:
-            try:
-                df = pd.read_csv(file)
-                df['source_file'] = file.name
-                df['github_data_type'] = github_type
-                logger.info(f"{file.name}: {len(df)} lignes ({github_type})")
-                all_data.append(df)
-            except Exception as e:
-                logger.error(f"[NOK] Erreur lecture {file.name}: {e}")
+        def read_file(file):
+            df = pd.read_csv(file)
+            df['source_file'] = file.name
+            df['github_data_type'] = github_type
+            logger.info(f"{file.name}: {len(df)} lignes ({github_type})")
+            
+            # Normalisation des langages si colonne 'language' présente
+            if 'language' in df.columns:
+                df['language_normalized'] = self.normalize_technology_column(df['language'])
+            return df
         
-        if not all_data:
+        df_consolidated = self.clean_files(sorted(files), f'github_{github_type}', read_file)
+        if df_consolidated is None:
             return None
         
-        df_consolidated = pd.concat(all_data, ignore_index=True)
         logger.info(f"{github_type} consolidés: {len(df_consolidated)} lignes")
         
-        # Normalisation des langages si colonne 'language' présente
-        if 'language' in df_consolidated.columns:
-            df_consolidated['language_normalized'] = df_consolidated['language'].apply(self.normalize_technology)
-        
         # Enrichissement métadonnées
         df_consolidated['source_type'] = f'github_{github_type}'
         df_consolidated['processed_at'] = pd.Timestamp.now()
@@ -12,8 +12,8 @@ logger = logging.getLogger(__name__)
 class JobDataCleaner(BaseDataCleaner):
     """Nettoyeur simplifié pour les données d'emploi"""
     
-    def __init__(self, project_root, dictionaries, sirene_validator):
-        super().__init__(project_root, dictionaries)
+    def __init__(self, project_root, dictionaries, sirene_validator, shard_store=None):
+        super().__init__(project_root, dictionaries, shard_store)
         self.sirene_validator = sirene_validator
     
     def clean_data(self):
@@ -43,21 +43,22 @@ class JobDataCleaner(BaseDataCleaner):
             logger.warning("Aucune donnée Adzuna trouvée")
             return None
         
-        all_data = []
-        for file in adzuna_files:
-            try:
-                df = pd.read_csv(file)
-                logger.info(f"{file.name}: {len(df)} lignes")
-                all_data.append(df)
-            except Exception as e:
-                logger.error(f"Erreur lecture {file.name}: {e}")
-        
-        if not all_data:
+        df = self.clean_files(sorted(adzuna_files), 'adzuna', self._read_adzuna_file)
+        if df is None:
             return None
         
-        df = pd.concat(all_data, ignore_index=True)
+        df['source_type'] = 'job_board'
+        df['processed_at'] = pd.Timestamp.now()
+        
         logger.info(f"Total Adzuna: {len(df)} lignes")
         
+        # Une offre collectée par plusieurs exécutions: version la plus récente
+        return self._deduplicate_jobs(df, key_columns=['id'])
+    
+    def _read_adzuna_file(self, file):
+        """Lit et normalise un fichier Adzuna"""
+        df = pd.read_csv(file)
+        logger.info(f"{file.name}: {len(df)} lignes")
         return self._normalize_job_data(df)
     
     def _clean_glassdoor(self):
@@ -69,49 +70,62 @@ class JobDataCleaner(BaseDataCleaner):
             logger.warning("Fichier Glassdoor non trouvé")
             return None
         
-        try:
-            df = pd.read_csv(glassdoor_file)
-            logger.info(f"Glassdoor: {len(df)} lignes")
-            
-            # Harmonisation colonnes
-            if 'job_title' in df.columns:
-                df = df.rename(columns={'job_title': 'title'})
-            if 'country_code' in df.columns:
-                df = df.rename(columns={'country_code': 'country'})
-            
-            return self._normalize_job_data(df)
-            
-        except Exception as e:
-            logger.error(f"Erreur lecture Glassdoor: {e}")
+        df = self.clean_files([glassdoor_file], 'glassdoor', self._read_glassdoor_file)
+        if df is None:
             return None
+        
+        df['source_type'] = 'job_board'
+        df['processed_at'] = pd.Timestamp.now()
+        
+        return self._deduplicate_jobs(df, key_columns=['id'])
+    
+    def _read_glassdoor_file(self, file):
+        """Lit, harmonise et normalise le fichier Glassdoor"""
+        df = pd.read_csv(file)
+        logger.info(f"Glassdoor: {len(df)} lignes")
+        
+        # Harmonisation colonnes
+        if 'job_title' in df.columns:
+            df = df.rename(columns={'job_title': 'title'})
+        if 'country_code' in df.columns:
+            df = df.rename(columns={'country_code': 'country'})
+        
+        return self._normalize_job_data(df)
     
     def _normalize_job_data(self, df):
-        """Normalise les données d'emploi"""
+        """Normalise les données d'emploi (ligne à ligne, un fichier à la fois)"""
         df_clean = df.copy()
         
         # Normalisation
         if 'skills' in df_clean.columns:
-            df_clean['skills_normalized'] = df_clean['skills'].apply(self.normalize_skills)
+            df_clean['skills_normalized'] = self.parse_skills_column(df_clean['skills'])
         
         if 'country' in df_clean.columns:
-            df_clean['country_normalized'] = df_clean['country'].apply(self.normalize_country)
+            df_clean['country_normalized'] = self.normalize_country_column(df_clean['country'])
         
-        # Salaires
+        # Salaires (taux de change appliqué sur toute la colonne)
+        currencies = df_clean['currency'] if 'currency' in df_clean.columns else None
         if 'salary_min' in df_clean.columns:
-            df_clean['salary_eur_min'] = df_clean.apply(
-                lambda row: self.normalize_salary(row.get('salary_min'), row.get('currency')), axis=1)
+            df_clean['salary_eur_min'] = self.normalize_salary_column(df_clean['salary_min'], currencies)
         
         if 'salary_max' in df_clean.columns:
-            df_clean['salary_eur_max'] = df_clean.apply(
-                lambda row: self.normalize_salary(row.get('salary_max'), row.get('currency')), axis=1)
+            df_clean['salary_eur_max'] = self.normalize_salary_column(df_clean['salary_max'], currencies)
         
         if 'salary_eur_min' in df_clean.columns and 'salary_eur_max' in df_clean.columns:
             df_clean['salary_eur_avg'] = (df_clean['salary_eur_min'] + df_clean['salary_eur_max']) / 2
         
-        # Métadonnées
-        df_clean['source_type'] = 'job_board'
-        df_clean['processed_at'] = pd.Timestamp.now()
-        
+        return df_clean
+    
+    def _deduplicate_jobs(self, df_clean, key_columns=None):
+        """
+        Supprime les doublons sur l'ensemble des fichiers fusionnés
+        
+        Args:
+            key_columns: identifiant d'offre; les doublons sur cette clé
+                sont résolus en gardant le `collected_at` le plus récent
+        """
+        if key_columns:
+            return self.remove_duplicates_safe(df_clean, "Jobs", subset=key_columns, keep_latest_by='collected_at')
         return self.remove_duplicates_safe(df_clean, "Jobs")
     
     def _validate_french_companies(self, df):
@@ -129,8 +143,9 @@ class JobDataCleaner(BaseDataCleaner):
         
         logger.info(f"Validation de {len(df_french)} entreprises françaises...")
         
-        df_french_validated = self.sirene_validator.validate_dataframe_optimized(
-            df_french, company_col='company', chunk_size=50)
+        # Une validation par entreprise distincte, redéployée sur les offres
+        df_french_validated = self.sirene_validator.validate_dataframe_batch(df_french, company_col='company',
+                                                                             location_col='location')
         
         df_others['is_verified_company'] = None
         df_others['sirene_match_score'] = None
@@ -60,24 +60,22 @@ class SurveyDataCleaner(BaseDataCleaner):
             return None
         
         logger.info(f"Fichiers {kaggle_type}: {len(files)}")
-        all_data = []
-        
-        for file in files:
-            try:
-                df = pd.read_csv(file)
-                df['survey_source'] = kaggle_type
-                df['source_file'] = file.name
-                logger.info(f"{kaggle_type} {file.name}: {len(df)} lignes")
-                all_data.append(df)
-            except Exception as e:
-                logger.error(f"[NOK] Erreur lecture {kaggle_type} {file.name}: {e}")
-        
-        if not all_data:
+        
+        def read_file(file):
+            df = pd.read_csv(file)
+            df['survey_source'] = kaggle_type
+            df['source_file'] = file.name
+            logger.info(f"{kaggle_type} {file.name}: {len(df)} lignes")
+            return self._normalize_survey_rows(df)
+        
+        df_consolidated = self.clean_files(sorted(files), kaggle_type, read_file)
+        if df_consolidated is None:
             return None
         
-        df_consolidated = pd.concat(all_data, ignore_index=True)
-        logger.info(f"Total {kaggle_type}: {len(df_consolidated)} lignes")
+        df_consolidated['source_type'] = 'survey_data'
+        df_consolidated['processed_at'] = pd.Timestamp.now()
         
+        logger.info(f"Total {kaggle_type}: {len(df_consolidated)} lignes")
         return df_consolidated
     
     def _clean_stackoverflow_data(self):
@@ -107,30 +105,34 @@ class SurveyDataCleaner(BaseDataCleaner):
             logger.info(f"Fichiers StackOverflow individuels: {len(individual_files)}")
             logger.info("ATTENTION: Consolidation des fichiers individuels")
         
-        all_data = []
-        for file in files_to_process:
-            try:
-                df = pd.read_csv(file)
-                df['survey_source'] = 'stackoverflow'
-                df['source_file'] = file.name
-                logger.info(f"StackOverflow {file.name}: {len(df)} lignes")
-                all_data.append(df)
-            except Exception as e:
-                logger.error(f"[NOK] Erreur lecture StackOverflow {file.name}: {e}")
-        
-        if not all_data:
+        def read_file(file):
+            df = pd.read_csv(file)
+            df['survey_source'] = 'stackoverflow'
+            df['source_file'] = file.name
+            logger.info(f"StackOverflow {file.name}: {len(df)} lignes")
+            return self._normalize_survey_rows(df)
+        
+        df_consolidated = self.clean_files(sorted(files_to_process), 'stackoverflow', read_file)
+        if df_consolidated is None:
             return None
         
-        df_consolidated = pd.concat(all_data, ignore_index=True)
+        df_consolidated['source_type'] = 'survey_data'
+        df_consolidated['processed_at'] = pd.Timestamp.now()
+        
         logger.info(f"StackOverflow consolidé: {len(df_consolidated)} lignes")
         
         return df_consolidated
     
     def _normalize_survey_data(self, df, survey_type):
-        """Normalise les données de surveys"""
+        """Finalise les données de surveys fusionnées (suppression des doublons)"""
         if df is None or len(df) == 0:
             return None
         
+        # Suppression des doublons
+        return self.remove_duplicates_safe(df, survey_type)
+    
+    def _normalize_survey_rows(self, df):
+        """Normalise les données de surveys (ligne à ligne, un fichier à la fois)"""
         df_clean = df.copy()
         
         # Harmonisation des colonnes pays
@@ -139,29 +141,19 @@ class SurveyDataCleaner(BaseDataCleaner):
         
         # Normalisation pays
         if 'country' in df_clean.columns:
-            df_clean['country_normalized'] = df_clean['country'].apply(self.normalize_country)
+            df_clean['country_normalized'] = self.normalize_country_column(df_clean['country'])
         
         # Normalisation des compétences/langages
         skill_columns = ['skills', 'languages_worked', 'language']
         for col in skill_columns:
             if col in df_clean.columns:
-                df_clean[f'{col}_normalized'] = df_clean[col].apply(self.normalize_skills)
+                df_clean[f'{col}_normalized'] = self.parse_skills_column(df_clean[col])
         
-        # Normalisation salaires
+        # Normalisation salaires (taux de change appliqué sur toute la colonne)
         salary_columns = ['salary_eur', 'salary_yearly', 'salary']
+        currencies = df_clean['currency'] if 'currency' in df_clean.columns else None
         for col in salary_columns:
             if col in df_clean.columns:
-                currency_col = 'currency' if 'currency' in df_clean.columns else None
-                df_clean[f'{col}_eur_normalized'] = df_clean.apply(
-                    lambda row: self.normalize_salary(row.get(col), row.get(currency_col)),
-                    axis=1
-                )
-        
-        # Enrichissement métadonnées
-        df_clean['source_type'] = 'survey_data'
-        df_clean['processed_at'] = pd.Timestamp.now()
-        
-        # Suppression des doublons
-        df_clean = self.remove_duplicates_safe(df_clean, survey_type)
+                df_clean[f'{col}_eur_normalized'] = self.normalize_salary_column(df_clean[col], currencies)
         
         return df_clean
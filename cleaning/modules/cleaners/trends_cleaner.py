@@ -56,28 +56,23 @@ class TrendsDataCleaner(BaseDataCleaner):
     def _process_comparisons(self, comparison_files):
         """Traite les comparaisons technologiques"""
         logger.info(f"Fichiers tech_comparisons: {len(comparison_files)}")
-        all_data = []
-        
-        for file in comparison_files:
-            try:
-                df = pd.read_csv(file)
-                df['source_file'] = file.name
-                df['trends_data_type'] = 'tech_comparisons'
-                logger.info(f"{file.name}: {len(df)} lignes (tech_comparisons)")
-                all_data.append(df)
-            except Exception as e:
-                logger.error(f"[NOK] Erreur lecture {file.name}: {e}")
-        
-        if not all_data:
-            return None
-        
-        df_consolidated = pd.concat(all_data, ignore_index=True)
         
-        # Normalisation des pays et technologies
-        if 'country' in df_consolidated.columns:
-            df_consolidated['country_normalized'] = df_consolidated['country'].apply(self.normalize_country)
-        if 'technology' in df_consolidated.columns:
-            df_consolidated['technology_normalized'] = df_consolidated['technology'].apply(self.normalize_technology)
+        def read_file(file):
+            df = pd.read_csv(file)
+            df['source_file'] = file.name
+            df['trends_data_type'] = 'tech_comparisons'
+            logger.info(f"{file.name}: {len(df)} lignes (tech_comparisons)")
+            
+            # Normalisation des pays et technologies
+            if 'country' in df.columns:
+                df['country_normalized'] = self.normalize_country_column(df['country'])
+            if 'technology' in df.columns:
+                df['technology_normalized'] = self.normalize_technology_column(df['technology'])
+            return df
+        
+        df_consolidated = self.clean_files(sorted(comparison_files), 'tech_comparisons', read_file)
+        if df_consolidated is None:
+            return None
         
         df_consolidated['source_type'] = 'tech_comparisons'
         df_consolidated['processed_at'] = pd.Timestamp.now()
@@ -89,46 +84,37 @@ class TrendsDataCleaner(BaseDataCleaner):
     
     def _process_country_trends(self, all_country_files, individual_country_files):
         """Traite les tendances par pays"""
-        all_data = []
-        
         if all_country_files:
             logger.info(f"Fichiers trends consolidés (all_countries): {len(all_country_files)}")
-            for file in all_country_files:
-                try:
-                    df = pd.read_csv(file)
-                    df['source_file'] = file.name
-                    df['trends_data_type'] = 'country_trends_consolidated'
-                    logger.info(f"{file.name}: {len(df)} lignes (déjà consolidé)")
-                    all_data.append(df)
-                except Exception as e:
-                    logger.error(f"[NOK] Erreur lecture {file.name}: {e}")
+            files, data_type, label = all_country_files, 'country_trends_consolidated', 'déjà consolidé'
         
         elif individual_country_files:
             logger.info(f"Fichiers trends individuels: {len(individual_country_files)}")
             logger.info("ATTENTION: Consolidation des fichiers individuels (pas de fichier 'all' trouvé)")
+            files, data_type, label = individual_country_files, 'country_trends_individual', 'individuel'
+        
+        else:
+            return None
+        
+        def read_file(file):
+            df = pd.read_csv(file)
+            df['source_file'] = file.name
+            df['trends_data_type'] = data_type
+            logger.info(f"{file.name}: {len(df)} lignes ({label})")
             
-            for file in individual_country_files:
-                try:
-                    df = pd.read_csv(file)
-                    df['source_file'] = file.name
-                    df['trends_data_type'] = 'country_trends_individual'
-                    logger.info(f"{file.name}: {len(df)} lignes (individuel)")
-                    all_data.append(df)
-                except Exception as e:
-                    logger.error(f"[NOK] Erreur lecture {file.name}: {e}")
-        
-        if not all_data:
+            # Normalisation des pays et mots-clés
+            if 'country' in df.columns:
+                df['country_normalized'] = self.normalize_country_column(df['country'])
+            if 'keyword' in df.columns:
+                df['keyword_normalized'] = self.normalize_technology_column(df['keyword'])
+            return df
+        
+        df_consolidated = self.clean_files(sorted(files), 'country_trends', read_file)
+        if df_consolidated is None:
             return None
         
-        df_consolidated = pd.concat(all_data, ignore_index=True)
         logger.info(f"Tendances pays: {len(df_consolidated)} lignes")
         
-        # Normalisation des pays et mots-clés
-        if 'country' in df_consolidated.columns:
-            df_consolidated['country_normalized'] = df_consolidated['country'].apply(self.normalize_country)
-        if 'keyword' in df_consolidated.columns:
-            df_consolidated['keyword_normalized'] = df_consolidated['keyword'].apply(self.normalize_technology)
-        
         df_consolidated['source_type'] = 'country_trends'
         df_consolidated['processed_at'] = pd.Timestamp.now()
         
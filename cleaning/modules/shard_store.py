@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Nettoyage incrémental: shards parquet par fichier brut
+
+Chaque fichier brut nettoyé produit un shard (lignes normalisées de ce
+seul fichier) et une entrée de manifeste (chemin, taille, mtime, hash du
+contenu). Au run suivant, un fichier inchangé est relu depuis son shard
+au lieu d'être renormalisé: seuls les fichiers nouveaux ou modifiés
+sont nettoyés, puis les shards sont fusionnés dans les tables finales.
+
+Un manifeste par table (data/cache/clean_shards/<table>/manifest.json):
+chaque source est nettoyée par un seul processus, sans écriture
+concurrente. Les shards sont invalidés si les dictionnaires de
+normalisation ou SHARD_FORMAT_VERSION changent.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter quand la normalisation par fichier change (invalide tous les shards)
+SHARD_FORMAT_VERSION = 2
+
+
+def write_parquet(df, output_path):
+    """
+    Écrit un DataFrame en parquet (snappy, sans index)
+
+    Les colonnes liste Arrow (parse_skills_column) sont déclarées comme
+    colonnes objet dans les métadonnées pandas : le fichier se relit avec
+    un simple pd.read_parquet (listes → tableaux numpy, comme avant).
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = json.loads(table.schema.metadata[b'pandas'])
+    for column in metadata['columns']:
+        if column['pandas_type'].startswith('list') and column['numpy_type'].endswith('[pyarrow]'):
+            column['numpy_type'] = 'object'
+    table = table.replace_schema_metadata({**table.schema.metadata, b'pandas': json.dumps(metadata).encode()})
+    pq.write_table(table, output_path, compression='snappy')
+
+
+def read_parquet(path):
+    """Relit un fichier de write_parquet en gardant les colonnes liste en listes Arrow"""
+    table = pq.read_table(path)
+    for i, field in enumerate(table.schema):
+        if pa.types.is_list(field.type):
+            # Même type que parse_skills_column (list<item: string>)
+            table = table.set_column(i, field.name, table.column(i).cast(pa.list_(field.type.value_type)))
+    return table.to_pandas(types_mapper=lambda dtype: pd.ArrowDtype(dtype) if pa.types.is_list(dtype) else None)
+
+
+def file_sha1(path):
+    """Hash du contenu d'un fichier (lecture par blocs)"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ShardStore:
+    """Manifeste des fichiers bruts nettoyés et shards parquet associés"""
+
+    def __init__(self, root, project_root, dictionaries):
+        self.root = Path(root)
+        self.project_root = Path(project_root)
+        payload = json.dumps(dictionaries, sort_keys=True) + f"#{SHARD_FORMAT_VERSION}"
+        self.signature = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+        self.manifests = {}
+
+    def _key(self, path):
+        path = Path(path)
+        try:
+            return path.resolve().relative_to(self.project_root.resolve()).as_posix()
+        except ValueError:
+            return path.resolve().as_posix()
+
+    def _table_dir(self, table):
+        return self.root / table
+
+    def _manifest(self, table):
+        if table not in self.manifests:
+            manifest_path = self._table_dir(table) / "manifest.json"
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    self.manifests[table] = json.load(f)
+            except (OSError, ValueError):
+                self.manifests[table] = {}
+        return self.manifests[table]
+
+    def load(self, table, path):
+        """Shard du fichier s'il est à jour, sinon None (fichier à nettoyer)"""
+        entry = self._manifest(table).get(self._key(path))
+        if entry is None or entry.get('signature') != self.signature:
+            return None
+
+        shard_path = self._table_dir(table) / entry['shard']
+        if not shard_path.exists():
+            return None
+
+        stat = os.stat(path)
+        if stat.st_size != entry['size']:
+            return None
+        if stat.st_mtime != entry['mtime']:
+            # mtime modifié (copie, checkout): contenu comparé par hash
+            if file_sha1(path) != entry['sha1']:
+                return None
+            entry['mtime'] = stat.st_mtime
+
+        try:
+            return read_parquet(shard_path)
+        except Exception as e:
+            logger.warning(f"[ATTENTION] Shard illisible {shard_path.name}, renettoyage: {e}")
+            return None
+
+    def save(self, table, path, df):
+        """Enregistre le shard d'un fichier brut et son entrée de manifeste"""
+        key = self._key(path)
+        table_dir = self._table_dir(table)
+        table_dir.mkdir(parents=True, exist_ok=True)
+
+        shard_name = f"{Path(key).stem}.parquet"
+        shard_path = table_dir / shard_name
+        tmp_path = table_dir / f"{shard_name}.{os.getpid()}.tmp"
+        write_parquet(df, tmp_path)
+        os.replace(tmp_path, shard_path)
+
+        stat = os.stat(path)
+        self._manifest(table)[key] = {
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'sha1': file_sha1(path),
+            'shard': shard_name,
+            'rows': len(df),
+            'signature': self.signature,
+            'cleaned_at': pd.Timestamp.now().isoformat(),
+        }
+
+    def prune(self, table, paths):
+        """Oublie les fichiers bruts absents de `paths` (supprimés ou plus sélectionnés)"""
+        manifest = self._manifest(table)
+        keep = {self._key(path) for path in paths}
+        for key in [key for key in manifest if key not in keep]:
+            shard_path = self._table_dir(table) / manifest.pop(key)['shard']
+            if shard_path.exists():
+                shard_path.unlink()
+
+    def flush(self, table):
+        """Écrit le manifeste de la table (écriture atomique)"""
+        table_dir = self._table_dir(table)
+        table_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = table_dir / "manifest.json"
+        tmp_path = table_dir / f"manifest.json.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._manifest(table), f, indent=2)
+        os.replace(tmp_path, manifest_path)
+
+    def clear(self):
+        """Supprime tous les shards et manifestes (prochain run complet)"""
+        if self.root.exists():
+            shutil.rmtree(self.root)
+        self.manifests = {}
@@ -0,0 +1,152 @@
+"""
+Blocage géographique des candidats SIRENE
+
+La localisation d'une offre ("Lyon, Rhône", "Rangueuil, Toulouse",
+"Gironde, Nouvelle-Aquitaine") ou un code postal donne un bloc: un
+département, ou les départements d'une région si seule la région est
+connue. Le fuzzy matching cherche d'abord parmi les établissements dont
+le code postal est dans le bloc, puis sur toute la base si aucun n'y
+atteint le seuil (repli national).
+
+Dictionnaire: dictionaries/departements.json (départements, régions,
+villes → département).
+"""
+
+import hashlib
+import json
+import logging
+import re
+import unicodedata
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+logger = logging.getLogger(__name__)
+
+# Suffixes de canton des localisations Adzuna ("Thionville-Est", "Toulouse 14e Canton")
+CANTON_SUFFIX = re.compile(r'(\s+(\d+(ER|E|EME)?|CANTON|NORD|SUD|EST|OUEST|VILLE|CENTRE))+$')
+
+POSTAL_CODE = re.compile(r'\b(\d{5})\b')
+
+
+def normalize_place(name):
+    """Nom de lieu comparable: majuscules, sans accents ni ponctuation"""
+    text = unicodedata.normalize('NFKD', str(name))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    text = re.sub(r'[^0-9A-Z]+', ' ', text.upper().replace('Œ', 'OE'))
+    return text.strip()
+
+
+def departement_from_postal_code(postal_code):
+    """Code département d'un code postal ('75009' → '75', '20090' → '2A', '97400' → '974')"""
+    if postal_code is None:
+        return None
+    postal_code = str(postal_code).strip()
+    if len(postal_code) == 4 and postal_code.isdigit():
+        # Code postal relu en entier (zéro initial perdu)
+        postal_code = '0' + postal_code
+    if len(postal_code) != 5 or not postal_code.isdigit():
+        return None
+    if postal_code.startswith('97') or postal_code.startswith('98'):
+        return postal_code[:3]
+    if postal_code.startswith('20'):
+        return '2A' if postal_code < '20200' else '2B'
+    return postal_code[:2]
+
+
+class LocationBlocker:
+    """Blocs (département ou région) des localisations et codes postaux"""
+
+    def __init__(self, dictionary_file):
+        with open(dictionary_file, 'rb') as f:
+            content = f.read()
+        dictionary = json.loads(content.decode('utf-8'))
+        # Version du dictionnaire: les blocs (et leurs correspondances en cache) en dépendent
+        self.version = hashlib.sha1(content).hexdigest()[:12]
+
+        self.departements = dictionary['departements']
+        self.codes = sorted(self.departements)
+        self.group_ids = {code: i for i, code in enumerate(self.codes)}
+
+        self.regions = {}
+        for code, info in self.departements.items():
+            self.regions.setdefault(info['region'], []).append(code)
+        self.region_names = {normalize_place(region): region for region in self.regions}
+        for alias, region in dictionary.get('regions_alias', {}).items():
+            self.region_names[normalize_place(alias)] = region
+
+        # Villes d'abord, puis noms de départements (prioritaires en cas d'homonymie)
+        self.places = {normalize_place(city): code for city, code in dictionary.get('villes', {}).items()}
+        self.places.update({normalize_place(info['nom']): code for code, info in self.departements.items()})
+
+    def _lookup_place(self, part):
+        place = normalize_place(part)
+        if place in self.places:
+            return self.places[place]
+        return self.places.get(CANTON_SUFFIX.sub('', place))
+
+    def block_for_location(self, location):
+        """
+        Bloc d'une localisation d'offre: code département, nom de région ou None
+
+        Code postal explicite, puis ville ou département (de gauche à
+        droite, le plus précis d'abord), puis région.
+        """
+        if location is None or not isinstance(location, str) or not location.strip():
+            return None
+
+        match = POSTAL_CODE.search(location)
+        if match:
+            code = self.block_for_postal_code(match.group(1))
+            if code is not None:
+                return code
+
+        parts = [part for part in location.split(',') if part.strip()]
+        for part in parts:
+            code = self._lookup_place(part)
+            if code is not None:
+                return code
+        for part in parts:
+            region = self.region_names.get(normalize_place(part))
+            if region is not None:
+                return region
+        return None
+
+    def block_for_postal_code(self, postal_code):
+        """Bloc (code département) d'un code postal, None si inconnu"""
+        code = departement_from_postal_code(postal_code)
+        return code if code in self.group_ids else None
+
+    def groups(self, block):
+        """Identifiants de groupe (départements) d'un bloc"""
+        codes = [block] if block in self.group_ids else self.regions.get(block, [])
+        return np.array([self.group_ids[code] for code in codes], dtype=np.int16)
+
+    def label(self, block):
+        """Libellé d'un bloc pour les rapports ('69 Rhône', 'Occitanie')"""
+        if block in self.departements:
+            return f"{block} {self.departements[block]['nom']}"
+        return block
+
+    def row_groups(self, postal_codes):
+        """
+        Groupe (département) de chaque ligne SIRENE, -1 si code postal inconnu
+
+        Args:
+            postal_codes: colonne Arrow des codes postaux (encodée en
+                dictionnaire dans le store: un calcul par code distinct)
+        """
+        if not isinstance(postal_codes.type, pa.DictionaryType):
+            postal_codes = pc.dictionary_encode(postal_codes)
+        groups = np.full(len(postal_codes), -1, dtype=np.int16)
+        start = 0
+        for chunk in postal_codes.chunks:
+            dictionary_groups = np.array(
+                [self.group_ids.get(departement_from_postal_code(value), -1)
+                 for value in chunk.dictionary.to_pylist()] + [-1], dtype=np.int16)
+            # Codes postaux nuls → dernière entrée (-1)
+            indices = chunk.indices.fill_null(len(chunk.dictionary)).to_numpy()
+            groups[start:start + len(chunk)] = dictionary_groups[indices]
+            start += len(chunk)
+        return groups
@@ -0,0 +1,567 @@
+"""
+Index de recherche sur la base SIRENE
+
+Remplace les parcours linéaires de SIRENEValidator:
+- correspondance exacte par nom et par SIRET: hash 64 bits triés
+  (recherche dichotomique, puis vérification de la chaîne)
+- correspondance approximative: index inversé de bigrammes (format CSR)
+  qui fournit un petit ensemble de candidats, seuls scorés avec le
+  même `scorer` (fuzz.ratio) que la version exhaustive. Les bigrammes
+  partagés bornent le score: aucun nom écarté ne peut atteindre le
+  seuil, le meilleur résultat est celui du parcours exhaustif.
+
+Les lignes sont renumérotées par (première lettre, longueur): dans chaque
+liste de bigramme, les noms d'une première lettre et d'une plage de
+longueurs forment un intervalle contigu. Une requête ne lit que les
+intervalles des longueurs pouvant atteindre le seuil (et de sa première
+lettre en version optimisée), pas les listes entières.
+
+L'index se construit par paquets de lignes (seuls des tableaux NumPy
+sont gardés) et se sauvegarde en fichiers .npy relus en mémoire mappée
+(SireneIndex.load, voir sirene_store).
+"""
+
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Taille des n-grammes de caractères de l'index inversé (bigrammes: la borne
+# de score de SireneIndex.score_bound n'est valable que pour 2)
+NGRAM_SIZE = 2
+
+# Lignes traitées par paquet lors de la construction
+BUILD_CHUNK_SIZE = 200_000
+
+# Tableaux de l'index sauvegardés par SireneIndex.save (un fichier .npy chacun)
+INDEX_ARRAYS = ('row_ids', 'lengths', 'partition_keys', 'exact_hashes', 'exact_rows',
+                'siret_hashes', 'siret_rows', 'ngram_sizes', 'offsets', 'postings')
+
+# Bits de la longueur dans la clé de partition (première lettre << LENGTH_BITS | longueur)
+LENGTH_BITS = 16
+
+
+def normalize_name(name):
+    """Nom d'entreprise comparable (même règle que la version exhaustive)"""
+    if isinstance(name, str):
+        return name.upper().strip()
+    if name is None or pd.isna(name):
+        return None
+    return str(name).upper().strip()
+
+
+def name_ngrams(name):
+    """Bigrammes distincts d'un nom normalisé, bordé d'espaces"""
+    padded = f" {name} "
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+def char_masks(query):
+    """Masque de positions de chaque caractère de la requête (pour lcs_length)"""
+    masks = {}
+    for i, char in enumerate(query):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks
+
+
+def lcs_length(masks, query_len, name):
+    """Longueur de la plus longue sous-séquence commune (bit-parallèle, Allison-Dix)"""
+    full = (1 << query_len) - 1
+    vector = full
+    for char in name:
+        matched = vector & masks.get(char, 0)
+        vector = ((vector + matched) | (vector - matched)) & full
+    return query_len - bin(vector).count('1')
+
+
+def lcs_lengths(query, names):
+    """lcs_length de la requête avec chaque nom, calculée pour tous les noms à la fois"""
+    if len(query) > 62:
+        # Vecteur de bits au-delà de 64 bits: calcul nom par nom
+        masks = char_masks(query)
+        return np.array([lcs_length(masks, len(query), name) for name in names], dtype=np.int64)
+    codes = np.array(names, dtype=str)
+    width = codes.dtype.itemsize // 4
+    if not len(names) or not width:
+        return np.zeros(len(names), dtype=np.int64)
+    # Caractères des noms (UTF-32, complétés par des zéros) → masques de positions de la requête
+    codes = codes.view(np.uint32).reshape(len(names), width)
+    masks = char_masks(query)
+    chars = sorted(masks)
+    char_codes = np.array([ord(char) for char in chars], dtype=np.uint32)
+    position_masks = np.array([masks[char] for char in chars], dtype=np.uint64)
+    positions = np.minimum(np.searchsorted(char_codes, codes), len(chars) - 1)
+    bits = np.where(char_codes[positions] == codes, position_masks[positions], np.uint64(0))
+
+    full = np.uint64((1 << len(query)) - 1)
+    vector = np.full(len(names), full, dtype=np.uint64)
+    for column in bits.T:
+        matched = vector & column
+        vector = ((vector + matched) | (vector - matched)) & full
+    return len(query) - np.bitwise_count(vector).astype(np.int64)
+
+
+def exact_key(name):
+    """Clé de correspondance exacte: même clé que `company_name.str.upper()` (sans strip)"""
+    if name is None or pd.isna(name):
+        return None
+    return str(name).upper()
+
+
+def normalize_siret(siret):
+    """SIRET en chaîne de chiffres (les CSV le relisent souvent en entier)"""
+    if siret is None or pd.isna(siret):
+        return None
+    if isinstance(siret, (float, np.floating)) and float(siret).is_integer():
+        siret = int(siret)
+    return str(siret).strip()
+
+
+def partition_key(first_chars, lengths):
+    """Clé de partition (première lettre, longueur), croissante dans l'ordre des identifiants"""
+    return (np.asarray(first_chars, dtype=np.int64) << LENGTH_BITS) | np.clip(lengths, 0, (1 << LENGTH_BITS) - 1)
+
+
+def hash_keys(keys):
+    """Hash uint64 d'une liste de clés texte (None → hash de '')"""
+    values = np.array(['' if key is None else key for key in keys], dtype=object)
+    return pd.util.hash_array(values, categorize=False)
+
+
+class MappedSequence:
+    """Vue `func(valeur)` sur une séquence de valeurs brutes, calculée à l'accès"""
+
+    def __init__(self, values, func):
+        self.values = values
+        self.func = func
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self.func(value) for value in self.values[item]]
+        return self.func(self.values[item])
+
+    def take(self, rows):
+        """Valeurs des lignes `rows` (lecture groupée si la séquence brute sait le faire)"""
+        if hasattr(self.values, 'take'):
+            values = self.values.take(rows)
+        else:
+            values = [self.values[row] for row in rows]
+        return [self.func(value) for value in values]
+
+
+class SireneIndex:
+    """Index exact (nom, SIRET) et index de bigrammes sur les noms SIRENE"""
+
+    def __init__(self, names, sirets=None, postings_file=None):
+        """
+        Args:
+            names: noms d'entreprise, dans l'ordre des lignes SIRENE
+                (liste, Series ou toute séquence acceptant les tranches)
+            sirets: SIRET correspondants (optionnel)
+            postings_file: fichier .npy où écrire les listes de lignes par
+                bigramme (mémoire mappée, pour les très grandes bases)
+        """
+        self._set_columns(names, sirets)
+
+        lengths = np.empty(len(self.names), dtype=np.int32)
+        first_chars = np.empty(len(self.names), dtype=np.int32)
+        for start, chunk in self._chunks(self.names):
+            lengths[start:start + len(chunk)] = [len(name) if name is not None else -1 for name in chunk]
+            first_chars[start:start + len(chunk)] = [ord(name[0]) if name else 0 for name in chunk]
+
+        # Identifiant de ligne dans l'index: rang par (première lettre, longueur, ligne)
+        self.row_ids = np.lexsort((lengths, first_chars)).astype(np.int64)
+        self.lengths = lengths[self.row_ids]
+        self.partition_keys = partition_key(first_chars[self.row_ids], self.lengths)
+        ids = np.empty(len(self.names), dtype=np.int32)
+        ids[self.row_ids] = np.arange(len(self.names), dtype=np.int32)
+        del lengths, first_chars
+
+        self.exact_hashes, self.exact_rows = self._sorted_hashes(self.exact_keys)
+        self.siret_hashes, self.siret_rows = self._sorted_hashes(self.sirets)
+
+        self._build_ngram_index(ids, postings_file)
+        logger.info(f"Index SIRENE: {len(self.names)} noms, {len(self.ngram_ids)} bigrammes")
+
+    def _set_columns(self, names, sirets):
+        """Noms normalisés, clés exactes et SIRET: vues calculées à l'accès sur les colonnes brutes"""
+        if hasattr(names, 'tolist'):
+            names = names.tolist()
+        if hasattr(sirets, 'tolist'):
+            sirets = sirets.tolist()
+        self.raw_names = names
+        self.names = MappedSequence(names, normalize_name)
+        self.exact_keys = MappedSequence(names, exact_key)
+        self.sirets = MappedSequence(sirets, normalize_siret) if sirets is not None else []
+        # Groupe de chaque ligne (département, voir sirene_blocking), renseigné par l'appelant
+        self.row_groups = None
+        self._max_length = None
+        self._first_char_values = None
+
+    @staticmethod
+    def _chunks(values):
+        """(première ligne, valeurs) par paquets de BUILD_CHUNK_SIZE lignes"""
+        for start in range(0, len(values), BUILD_CHUNK_SIZE):
+            yield start, values[start:start + BUILD_CHUNK_SIZE]
+
+    @classmethod
+    def _sorted_hashes(cls, keys):
+        """Hashes triés et lignes associées (tri stable: première ligne d'abord)"""
+        hashes, rows = [np.empty(0, dtype=np.uint64)], [np.empty(0, dtype=np.int64)]
+        for start, chunk in cls._chunks(keys):
+            present = [key for key in chunk if key is not None]
+            rows.append(start + np.flatnonzero([key is not None for key in chunk]).astype(np.int64))
+            hashes.append(hash_keys(present))
+        hashes, rows = np.concatenate(hashes), np.concatenate(rows)
+        order = np.argsort(hashes, kind='stable')
+        return hashes[order], rows[order]
+
+    def _ngram_chunks(self, ids):
+        """(ids de bigramme, identifiants de ligne) par paquet de noms; bigrammes numérotés par apparition"""
+        for start, chunk in self._chunks(self.names):
+            ngram_column, row_column = [], []
+            for row, name in enumerate(chunk, start):
+                if not name:
+                    continue
+                for ngram in name_ngrams(name):
+                    ngram_column.append(self.ngram_ids.setdefault(ngram, len(self.ngram_ids)))
+                    row_column.append(row)
+            yield np.array(ngram_column, dtype=np.int64), ids[np.array(row_column, dtype=np.int64)]
+
+    def _build_ngram_index(self, ids, postings_file=None):
+        """
+        Listes d'identifiants de ligne par bigramme (offsets + identifiants triés)
+
+        Tri par comptage en deux passes: tailles des listes, puis
+        placement de chaque paquet à la suite des précédents; chaque
+        liste est enfin triée par identifiant.
+        """
+        self.ngram_ids = {}
+        sizes = np.zeros(0, dtype=np.int64)
+        for ngram_column, _ in self._ngram_chunks(ids):
+            counts = np.bincount(ngram_column, minlength=len(self.ngram_ids))
+            counts[:len(sizes)] += sizes
+            sizes = counts
+        self.ngram_sizes = sizes
+        self.offsets = np.concatenate([[0], np.cumsum(self.ngram_sizes)]).astype(np.int64)
+
+        total = int(self.offsets[-1])
+        if postings_file is not None:
+            self.postings = np.lib.format.open_memmap(postings_file, mode='w+', dtype=np.int32, shape=(total,))
+        else:
+            self.postings = np.empty(total, dtype=np.int32)
+
+        cursor = self.offsets[:-1].copy()
+        for ngram_column, row_column in self._ngram_chunks(ids):
+            order = np.argsort(ngram_column, kind='stable')
+            ngram_column, row_column = ngram_column[order], row_column[order]
+            counts = np.bincount(ngram_column, minlength=len(cursor))
+            group_starts = np.cumsum(counts) - counts
+            ranks = np.arange(len(ngram_column)) - group_starts[ngram_column]
+            self.postings[cursor[ngram_column] + ranks] = row_column
+            cursor += counts
+        for ngram in range(len(self.ngram_sizes)):
+            self.postings[self.offsets[ngram]:self.offsets[ngram + 1]].sort()
+
+    def save(self, directory):
+        """Sauvegarde les tableaux de l'index (.npy) et les bigrammes"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in INDEX_ARRAYS:
+            array, path = getattr(self, name), directory / f"{name}.npy"
+            if isinstance(array, np.memmap) and Path(array.filename) == path.resolve():
+                # Déjà écrit en place (postings_file)
+                array.flush()
+                continue
+            np.save(path, array)
+        ngrams = np.array(sorted(self.ngram_ids, key=self.ngram_ids.get), dtype=f'<U{NGRAM_SIZE}')
+        np.save(directory / "ngrams.npy", ngrams)
+
+    @classmethod
+    def load(cls, directory, names, sirets=None):
+        """
+        Index sauvegardé par `save`, tableaux en mémoire mappée (lecture seule)
+
+        Args:
+            names, sirets: colonnes brutes dans l'ordre des lignes de l'index
+                (par exemple les colonnes Arrow du store SIRENE)
+        """
+        directory = Path(directory)
+        index = cls.__new__(cls)
+        index._set_columns(names, sirets)
+        for name in INDEX_ARRAYS:
+            setattr(index, name, np.load(directory / f"{name}.npy", mmap_mode='r'))
+        ngrams = np.load(directory / "ngrams.npy")
+        index.ngram_ids = {ngram: i for i, ngram in enumerate(ngrams.tolist())}
+        return index
+
+    def _lookup(self, hashes, rows, keys, key):
+        key_hash = hash_keys([key])[0]
+        start = np.searchsorted(hashes, key_hash, side='left')
+        end = np.searchsorted(hashes, key_hash, side='right')
+        # Collision de hash possible: vérification de la clé
+        for row in rows[start:end]:
+            if keys[row] == key:
+                return int(row)
+        return -1
+
+    def _lookup_many(self, hashes, rows, keys, query_keys):
+        """Version vectorisée de _lookup: une recherche dichotomique pour toutes les clés"""
+        result = np.full(len(query_keys), -1, dtype=np.int64)
+        present = np.array([bool(key) for key in query_keys], dtype=bool)
+        if not present.any() or not len(hashes):
+            return result
+
+        positions = np.flatnonzero(present)
+        query_hashes = hash_keys([query_keys[i] for i in positions])
+        found = np.minimum(np.searchsorted(hashes, query_hashes, side='left'), len(hashes) - 1)
+        hit = hashes[found] == query_hashes
+        for i, row in zip(positions[hit], rows[found[hit]]):
+            # Première ligne de même hash; si la clé diffère (collision), recherche complète
+            result[i] = row if keys[row] == query_keys[i] else self._lookup(hashes, rows, keys, query_keys[i])
+        return result
+
+    def lookup_names(self, company_names):
+        """lookup_name pour une liste de noms (lignes, -1 si absent)"""
+        return self._lookup_many(self.exact_hashes, self.exact_rows, self.exact_keys,
+                                 [normalize_name(name) for name in company_names])
+
+    def lookup_sirets(self, sirets):
+        """lookup_siret pour une liste de SIRET (lignes, -1 si absent)"""
+        if not self.sirets:
+            return np.full(len(sirets), -1, dtype=np.int64)
+        return self._lookup_many(self.siret_hashes, self.siret_rows, self.sirets,
+                                 [normalize_siret(siret) for siret in sirets])
+
+    def lookup_name(self, company_name):
+        """Ligne du premier nom SIRENE égal (insensible à la casse), -1 sinon"""
+        key = normalize_name(company_name)
+        if not key:
+            return -1
+        return self._lookup(self.exact_hashes, self.exact_rows, self.exact_keys, key)
+
+    def lookup_siret(self, siret):
+        """Ligne du SIRET, -1 sinon"""
+        key = normalize_siret(siret)
+        if not key or not self.sirets:
+            return -1
+        return self._lookup(self.siret_hashes, self.siret_rows, self.sirets, key)
+
+    @property
+    def max_length(self):
+        """Longueur du plus long nom de la base"""
+        if self._max_length is None:
+            self._max_length = int(self.lengths.max()) if len(self.lengths) else 0
+        return self._max_length
+
+    @property
+    def first_char_values(self):
+        """Premières lettres distinctes des noms (croissantes)"""
+        if self._first_char_values is None:
+            chars = np.asarray(self.partition_keys) >> LENGTH_BITS
+            starts = np.concatenate([[0], np.flatnonzero(np.diff(chars)) + 1]) if len(chars) else []
+            self._first_char_values = chars[starts]
+        return self._first_char_values
+
+    @staticmethod
+    def score_bound(shared, query_len, lengths, repeated=0):
+        """
+        Score maximal (0-100) de fuzz.ratio selon les bigrammes partagés
+
+        fuzz.ratio = 2*M/(la+lb) avec M au plus la plus longue sous-séquence
+        commune. Ses caractères (plus les deux espaces de bordure) forment
+        r blocs contigus dans les deux noms, séparés par au moins un
+        caractère retiré ou ajouté: r - 1 <= la + lb - 2*M. Un bloc de w
+        caractères donne w - 1 bigrammes communs, d'où
+        bigrammes communs >= M + 2 - r >= 3*M + 1 - (la + lb).
+
+        Args:
+            shared: bigrammes distincts de la requête présents dans le nom
+            query_len, lengths: longueurs de la requête et des noms
+            repeated: bigrammes répétés de la requête (les communs comptés
+                avec répétition sont au plus shared + repeated)
+        """
+        total = query_len + lengths
+        matches = np.minimum(np.minimum(query_len, lengths), (shared + repeated + total - 1) // 3)
+        return 100 * (2.0 * matches / np.maximum(total, 1))
+
+    def _shared_ngrams(self, ids, ngram_ids):
+        """Nombre de bigrammes de `ngram_ids` présents dans chaque identifiant de `ids` (triés)"""
+        shared = np.zeros(len(ids), dtype=np.int64)
+        if not len(ids):
+            return shared
+        for ngram in ngram_ids:
+            postings = self.postings[self.offsets[ngram]:self.offsets[ngram + 1]]
+            # Recherche limitée à la tranche des identifiants candidats
+            postings = postings[np.searchsorted(postings, ids[0]):np.searchsorted(postings, ids[-1], side='right')]
+            if not len(postings):
+                continue
+            positions = np.minimum(np.searchsorted(postings, ids), len(postings) - 1)
+            shared += postings[positions] == ids
+        return shared
+
+    def _id_ranges(self, allowed, first_char=None):
+        """
+        Intervalles [début, fin) d'identifiants des noms de longueur permise
+
+        Args:
+            allowed: booléen par longueur (0 à max_length)
+            first_char: code de la première lettre imposée (toutes sinon)
+        """
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], allowed.astype(np.int8), [0]])))
+        lows, highs = edges[0::2], edges[1::2] - 1
+        chars = self.first_char_values if first_char is None else np.array([first_char])
+        bases = np.asarray(chars, dtype=np.int64)[:, None] << LENGTH_BITS
+        starts = np.searchsorted(self.partition_keys, (bases + lows).ravel(), side='left')
+        ends = np.searchsorted(self.partition_keys, (bases + highs).ravel(), side='right')
+        keep = ends > starts
+        return starts[keep], ends[keep]
+
+    @staticmethod
+    def _gather(values, starts, ends):
+        """Concaténation des tranches values[début:fin] (intervalles croissants)"""
+        if len(starts) == 1:
+            return np.asarray(values[starts[0]:ends[0]])
+        sizes = ends - starts
+        positions = np.arange(int(sizes.sum())) + np.repeat(starts - (np.cumsum(sizes) - sizes), sizes)
+        return np.asarray(values[positions])
+
+    def _count_postings(self, ngram_ids, starts, ends):
+        """Identifiants des intervalles présents dans les listes de `ngram_ids`, et leur nombre de listes"""
+        found = []
+        for ngram in ngram_ids:
+            postings = self.postings[self.offsets[ngram]:self.offsets[ngram + 1]]
+            found.append(self._gather(postings, np.searchsorted(postings, starts), np.searchsorted(postings, ends)))
+        found = np.concatenate(found).astype(np.int64)
+        sizes = ends - starts
+        if int(sizes.sum()) > 16 * len(found):
+            # Intervalles bien plus grands que les identifiants lus: comptage par tri
+            found.sort()
+            firsts = np.concatenate([[0], np.flatnonzero(np.diff(found)) + 1]) if len(found) else found
+            return found[firsts], np.diff(np.append(firsts, len(found)))
+        # Identifiants rendus contigus (intervalles mis bout à bout) pour bincount
+        shifts = starts - (np.cumsum(sizes) - sizes)
+        counts = np.bincount(found - shifts[np.searchsorted(starts, found, side='right') - 1],
+                             minlength=int(sizes.sum()))
+        compact = np.flatnonzero(counts)
+        ids = compact + shifts[np.searchsorted(np.cumsum(sizes) - sizes, compact, side='right') - 1]
+        return ids, counts[compact]
+
+    def candidates(self, query, min_score=0, same_first_char=False, max_length_gap=None, groups=None):
+        """
+        Lignes pouvant atteindre min_score pour un nom normalisé
+
+        Toute ligne écartée a une borne de score (score_bound) sous
+        min_score, ou est exclue par les pré-filtres de la version
+        optimisée (première lettre, écart de longueur). Une ligne doit
+        partager au moins `s` bigrammes (selon sa longueur): elle figure
+        alors dans l'une des listes des k - s + 1 bigrammes les plus rares
+        de la requête, seules lues en entier. `groups` restreint les
+        candidats aux lignes de ces groupes (blocage géographique,
+        `row_groups` requis). Les listes ne sont lues que sur les
+        intervalles d'identifiants des longueurs permises (et de la
+        première lettre de la requête avec same_first_char).
+
+        Returns:
+            (lignes, bornes): par borne de score décroissante, puis ordre
+            des lignes (voir best_of)
+        """
+        empty = np.empty(0, dtype=np.int64), np.empty(0, dtype=float)
+        query_ngrams = name_ngrams(query)
+        repeated = len(query) + 3 - NGRAM_SIZE - len(query_ngrams)
+        ngram_ids = np.array([self.ngram_ids[ngram] for ngram in query_ngrams if ngram in self.ngram_ids],
+                             dtype=np.int64)
+        ngram_ids = ngram_ids[np.argsort(self.ngram_sizes[ngram_ids], kind='stable')]
+        query_len = len(query)
+
+        # Bigrammes partagés nécessaires selon la longueur du nom (len(ngram_ids) + 1: impossible)
+        name_lengths = np.arange(self.max_length + 1)
+        bounds = self.score_bound(np.arange(len(ngram_ids) + 1)[:, None], query_len, name_lengths[None, :],
+                                  repeated)
+        reachable = bounds + 0.5 + 1e-9 >= min_score
+        required = np.where(reachable.any(axis=0), reachable.argmax(axis=0), len(ngram_ids) + 1)
+        required[0] = len(ngram_ids) + 1
+        if max_length_gap is not None:
+            gap_ok = np.abs(name_lengths - query_len) <= np.maximum(name_lengths, query_len) * max_length_gap
+            required[~gap_ok] = len(ngram_ids) + 1
+        min_required = int(required.min())
+        if min_required > len(ngram_ids):
+            return empty
+        starts, ends = self._id_ranges(required <= len(ngram_ids), ord(query[0]) if same_first_char else None)
+        if not len(starts):
+            return empty
+
+        if min_required == 0:
+            # Noms sans bigramme commun possibles (requête très courte ou seuil bas): tous les intervalles
+            prefix, rest = ngram_ids[:0], ngram_ids
+            ids = self._gather(np.arange(int(ends[-1])), starts, ends)
+            shared = np.zeros(len(ids), dtype=np.int64)
+        else:
+            prefix, rest = ngram_ids[:len(ngram_ids) - min_required + 1], ngram_ids[len(ngram_ids) - min_required + 1:]
+            ids, shared = self._count_postings(prefix, starts, ends)
+
+        if groups is not None:
+            in_block = np.isin(self.row_groups[self.row_ids[ids]], groups)
+            ids, shared = ids[in_block], shared[in_block]
+        lengths = self.lengths[ids]
+        # Écartés même s'ils contenaient tous les bigrammes restants
+        keep = shared + len(rest) >= required[lengths]
+        ids, lengths, shared = ids[keep], lengths[keep], shared[keep]
+
+        shared += self._shared_ngrams(ids, rest)
+        keep = shared >= required[lengths]
+        rows, bounds = self.row_ids[ids[keep]], self.score_bound(shared[keep], query_len, lengths[keep], repeated)
+        order = np.lexsort((rows, -bounds))
+        return rows[order], bounds[order]
+
+    def best_match(self, company_name, scorer, min_score=0, **candidate_options):
+        """
+        Meilleur nom SIRENE pour `company_name` selon `scorer`
+
+        Returns:
+            (ligne, score): ligne -1 si aucun candidat. À score égal, la
+            première ligne (comme le parcours exhaustif).
+        """
+        query = normalize_name(company_name)
+        if not query:
+            return -1, 0
+        rows, bounds = self.candidates(query, min_score=min_score, **candidate_options)
+        return self.best_of(query, rows, scorer, bounds, min_score=min_score)
+
+    def best_of(self, query, rows, scorer, bounds=None, min_score=0):
+        """
+        Meilleure ligne parmi `rows` pour un nom normalisé: (ligne, score)
+
+        Les noms sont bornés par leur plus longue sous-séquence commune
+        avec la requête (fuzz.ratio <= 2 * sous-séquence / longueurs,
+        calculée pour tous les candidats à la fois) et par les bornes de
+        `candidates`, puis scorés par borne décroissante jusqu'à ce
+        qu'aucun nom restant ne puisse égaler le meilleur score. Le
+        résultat n'est exact qu'à partir de min_score (en dessous, le nom
+        est de toute façon rejeté).
+        """
+        if not len(rows):
+            return -1, 0
+        rows = np.asarray(rows)
+        names = self.names.take(rows)
+        lengths = np.array([len(name) for name in names], dtype=np.int64)
+        name_bounds = 200.0 * lcs_lengths(query, names) / (len(query) + lengths)
+        if bounds is not None:
+            name_bounds = np.minimum(name_bounds, bounds)
+
+        best_row, best_score = -1, 0
+        for i in np.lexsort((rows, -name_bounds)):
+            floor = max(best_score, min_score)
+            if name_bounds[i] + 0.5 + 1e-9 < floor:
+                break
+            row, score = rows[i], scorer(query, names[i])
+            # À score égal, la première ligne (comme le parcours exhaustif)
+            if score > best_score or (score == best_score and score > 0 and row < best_row):
+                best_row, best_score = int(row), score
+        return best_row, best_score
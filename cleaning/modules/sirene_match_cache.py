@@ -0,0 +1,99 @@
+"""
+Cache persistant des correspondances SIRENE (SQLite)
+
+Une ligne par (nom normalisé, version de la base SIRENE, seuil, mode):
+les runs quotidiens ne relancent le fuzzy matching que pour les
+entreprises jamais vues. La clé de version est le hash du fichier
+SIRENE (figé dans le manifeste du store) plus MATCH_CACHE_VERSION, ajouté
+à l'ouverture du cache: rafraîchir la base ou changer l'algorithme
+invalide le cache, les entrées d'une autre version sont purgées à
+l'ouverture.
+"""
+
+import hashlib
+import logging
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter quand l'algorithme de correspondance change (invalide le cache)
+MATCH_CACHE_VERSION = 2
+
+# Limite SQLite du nombre de paramètres par requête
+SQLITE_MAX_PARAMS = 900
+
+
+def snapshot_version(sirene_file):
+    """Version de la base SIRENE: hash du contenu du fichier (sans MATCH_CACHE_VERSION)"""
+    digest = hashlib.sha1()
+    with open(sirene_file, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SireneMatchCache:
+    """Résultats de fuzzy matching (valide, score) par nom normalisé"""
+
+    def __init__(self, path, snapshot):
+        """
+        Args:
+            path: fichier SQLite
+            snapshot: version de la base SIRENE (snapshot_version)
+        """
+        self.path = Path(path)
+        # Clé construite à l'ouverture: un changement de MATCH_CACHE_VERSION suffit à invalider
+        self.snapshot = f"{snapshot}#v{MATCH_CACHE_VERSION}"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.path))
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS matches (
+                name TEXT NOT NULL,
+                snapshot TEXT NOT NULL,
+                min_score INTEGER NOT NULL,
+                mode TEXT NOT NULL,
+                is_valid INTEGER NOT NULL,
+                score REAL NOT NULL,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (name, snapshot, min_score, mode)
+            )
+        """)
+        purged = self.connection.execute("DELETE FROM matches WHERE snapshot != ?", (self.snapshot,)).rowcount
+        self.connection.commit()
+        if purged:
+            logger.info(f"Cache SIRENE: {purged} correspondances d'une ancienne base supprimées")
+
+    def get_many(self, names, min_score, mode):
+        """Résultats connus pour `names`: {nom: (valide, score)}"""
+        found = {}
+        names = list(names)
+        for start in range(0, len(names), SQLITE_MAX_PARAMS):
+            chunk = names[start:start + SQLITE_MAX_PARAMS]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.connection.execute(
+                f"SELECT name, is_valid, score FROM matches "
+                f"WHERE snapshot = ? AND min_score = ? AND mode = ? AND name IN ({placeholders})",
+                [self.snapshot, min_score, mode] + chunk)
+            found.update((name, (bool(is_valid), score)) for name, is_valid, score in rows)
+        return found
+
+    def put_many(self, results, min_score, mode):
+        """Enregistre {nom: (valide, score)}"""
+        if not results:
+            return
+        now = pd.Timestamp.now().isoformat()
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO matches (name, snapshot, min_score, mode, is_valid, score, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(name, self.snapshot, min_score, mode, int(is_valid), float(score), now)
+             for name, (is_valid, score) in results.items()])
+        self.connection.commit()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,331 @@
+"""
+Store colonnaire de la base SIRENE (Arrow IPC + index NumPy)
+
+Conversion unique du CSV SIRENE (échantillon ou stock national) en:
+- sirene.arrow: colonnes siret, siren, company_name, postal_code, status
+  (fichier Arrow IPC non compressé, postal_code et status encodés en
+  dictionnaire), lu en mémoire mappée
+- index/*.npy: tableaux de SireneIndex (hashes, bigrammes), relus en
+  mémoire mappée
+- manifest.json: taille, mtime et hash du CSV source
+
+Stock national INSEE: StockEtablissement ne porte le nom de l'entreprise
+que pour une minorité d'établissements (dénomination usuelle, enseigne);
+la dénomination légale vient de StockUniteLegale, jointe par SIREN
+(LegalUnitNames). Le statut A/F est traduit en Actif/Fermé comme dans
+l'échantillon.
+
+L'ouverture ne lit aucune donnée: les pages sont chargées à l'accès et
+partagées entre processus (cache du système), ce qui rend le démarrage
+des workers quasi instantané même sur ~30M d'établissements.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+
+from .shard_store import file_sha1
+from .sirene_index import SireneIndex
+from .sirene_match_cache import snapshot_version
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter quand le format du store change (reconversion au prochain chargement)
+STORE_FORMAT_VERSION = 3
+
+# Colonnes conservées, dans l'ordre du fichier Arrow
+STORE_COLUMNS = ('siret', 'siren', 'company_name', 'postal_code', 'status')
+
+# Colonnes à faible cardinalité encodées en dictionnaire
+DICTIONARY_COLUMNS = ('postal_code', 'status')
+
+# Correspondance pour le stock des établissements INSEE (StockEtablissement_utf8.csv);
+# un tuple donne des colonnes de repli, la première non vide est retenue
+INSEE_STOCK_COLUMNS = {
+    'siret': 'siret',
+    'siren': 'siren',
+    'company_name': ('denominationUsuelleEtablissement', 'enseigne1Etablissement'),
+    'postal_code': 'codePostalEtablissement',
+    'status': 'etatAdministratifEtablissement',
+}
+
+# Statut administratif INSEE → libellé de l'échantillon
+INSEE_STATUS_LABELS = {'A': 'Actif', 'F': 'Fermé'}
+
+# Colonnes lues dans le stock des unités légales (StockUniteLegale_utf8.csv)
+LEGAL_UNIT_COLUMNS = ('siren', 'denominationUniteLegale')
+
+
+class ArrowColumn:
+    """Colonne Arrow vue comme une séquence Python (valeurs converties à l'accès)"""
+
+    def __init__(self, column):
+        self.column = column
+
+    def __len__(self):
+        return len(self.column)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, _ = item.indices(len(self.column))
+            return self.column.slice(start, max(stop - start, 0)).to_pylist()
+        return self.column[int(item)].as_py()
+
+    def take(self, rows):
+        """Valeurs des lignes `rows` (une seule lecture Arrow)"""
+        return self.column.take(pa.array(np.asarray(rows, dtype=np.int64))).to_pylist()
+
+
+class LegalUnitNames:
+    """Dénomination des unités légales (StockUniteLegale) par SIREN, triée pour recherche dichotomique"""
+
+    def __init__(self, path, block_size=64 << 20):
+        sirens, names = [], []
+        for table in _read_csv(path, LEGAL_UNIT_COLUMNS, block_size):
+            # Personnes physiques: pas de dénomination
+            table = table.filter(pc.is_valid(table['denominationUniteLegale']))
+            sirens.append(_siren_numbers(table['siren']))
+            names.append(table['denominationUniteLegale'])
+        sirens = np.concatenate(sirens) if sirens else np.empty(0, dtype=np.int64)
+        order = np.argsort(sirens, kind='stable')
+        self.sirens = sirens[order]
+        self.names = pa.chunked_array(names, type=pa.string()).take(pa.array(order)).combine_chunks()
+        logger.info(f"Unités légales: {len(self.sirens)} dénominations")
+
+    def names_for(self, sirens):
+        """Dénomination de chaque SIREN (colonne Arrow), nulle si inconnue"""
+        keys = _siren_numbers(sirens)
+        if not len(self.sirens):
+            return pa.nulls(len(keys), type=pa.string())
+        positions = np.minimum(np.searchsorted(self.sirens, keys), len(self.sirens) - 1)
+        found = self.sirens[positions] == keys
+        return self.names.take(pa.array(positions, mask=~found))
+
+
+def _siren_numbers(sirens):
+    """SIREN en entiers (-1 si absent ou non numérique)"""
+    sirens = pc.if_else(pc.match_substring_regex(sirens, r'^[0-9]{1,18}$'), sirens, None)
+    return np.asarray(pc.fill_null(pc.cast(sirens, pa.int64()), -1))
+
+
+def _read_csv(path, columns, block_size):
+    """Tables Arrow du CSV `path`, colonnes `columns` en texte (vide → nul)"""
+    reader = pv.open_csv(
+        path,
+        read_options=pv.ReadOptions(block_size=block_size),
+        convert_options=pv.ConvertOptions(
+            include_columns=list(columns),
+            include_missing_columns=True,
+            column_types={column: pa.string() for column in columns},
+            strings_can_be_null=True))
+    for batch in reader:
+        yield pa.Table.from_batches([batch])
+
+
+def _source_columns(columns):
+    """Colonnes CSV de chaque colonne du store (plusieurs: repli dans l'ordre)"""
+    sources = {}
+    for name in STORE_COLUMNS:
+        source = columns.get(name, name)
+        sources[name] = (source,) if isinstance(source, str) else tuple(source)
+    return sources
+
+
+def _map_labels(column, labels):
+    """Remplace les codes de `labels` par leur libellé (autres valeurs inchangées)"""
+    codes = pa.array(list(labels), type=pa.string())
+    mapped = pa.array(list(labels.values()), type=pa.string()).take(pc.index_in(column, value_set=codes))
+    return pc.coalesce(mapped, column)
+
+
+def _csv_batches(source, columns, status_labels=None, legal_units=None, block_size=64 << 20):
+    """
+    Tables du CSV source aux colonnes du store, en texte
+
+    Args:
+        columns: nom du store → colonne(s) CSV
+        status_labels: libellés des codes de statut ({'A': 'Actif'})
+        legal_units: LegalUnitNames, dénomination prioritaire sur les noms du CSV
+    """
+    sources = _source_columns(columns)
+    read_columns = list(dict.fromkeys(column for names in sources.values() for column in names))
+    for table in _read_csv(source, read_columns, block_size):
+        arrays = []
+        for name in STORE_COLUMNS:
+            candidates = [table[column] for column in sources[name]]
+            if name == 'company_name' and legal_units is not None:
+                candidates.insert(0, legal_units.names_for(table[sources['siren'][0]]))
+            array = candidates[0] if len(candidates) == 1 else pc.coalesce(*candidates)
+            if name == 'status' and status_labels:
+                array = _map_labels(array, status_labels)
+            arrays.append(array)
+        yield pa.Table.from_arrays(arrays, names=list(STORE_COLUMNS))
+
+
+def _dictionaries(source, columns, status_labels=None):
+    """Premier passage: valeurs distinctes des colonnes encodées en dictionnaire"""
+    values = {name: set() for name in DICTIONARY_COLUMNS}
+    for table in _csv_batches(source, columns, status_labels):
+        for name in DICTIONARY_COLUMNS:
+            values[name].update(value for value in pc.unique(table[name]).to_pylist() if value is not None)
+    # Un seul dictionnaire par colonne pour tout le fichier (format IPC)
+    return {name: pa.array(sorted(values[name]), type=pa.string()) for name in DICTIONARY_COLUMNS}
+
+
+def build_sirene_store(source, store_dir, columns=None, status_labels=None, legal_units=None):
+    """
+    Convertit un CSV SIRENE en store colonnaire (remplace le store existant)
+
+    Args:
+        source: CSV SIRENE
+        store_dir: dossier du store
+        columns: noms des colonnes dans le CSV s'ils diffèrent ({'company_name': ...};
+            un tuple de colonnes: la première non vide)
+        status_labels: libellés des codes de statut (INSEE_STATUS_LABELS)
+        legal_units: CSV StockUniteLegale, dénomination jointe par SIREN
+            (prioritaire sur les noms de l'établissement)
+
+    Returns:
+        Nombre d'établissements convertis
+    """
+    source, store_dir = Path(source), Path(store_dir)
+    columns = columns or {}
+    start = time.perf_counter()
+    logger.info(f"Conversion SIRENE {source.name} → {store_dir}...")
+
+    tmp_dir = store_dir.with_name(f"{store_dir.name}.{os.getpid()}.tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    (tmp_dir / "index").mkdir(parents=True)
+
+    dictionaries = _dictionaries(source, columns, status_labels)
+    legal_names = LegalUnitNames(legal_units) if legal_units is not None else None
+    schema = pa.schema([(name, pa.dictionary(pa.int32(), pa.string()) if name in dictionaries else pa.string())
+                        for name in STORE_COLUMNS])
+
+    rows = 0
+    with pa.ipc.new_file(tmp_dir / "sirene.arrow", schema) as writer:
+        for table in _csv_batches(source, columns, status_labels, legal_names):
+            arrays = []
+            for name in STORE_COLUMNS:
+                if name in dictionaries:
+                    indices = pc.index_in(table[name], value_set=dictionaries[name]).cast(pa.int32())
+                    arrays.append(pa.chunked_array(
+                        [pa.DictionaryArray.from_arrays(chunk, dictionaries[name]) for chunk in indices.chunks],
+                        type=schema.field(name).type))
+                else:
+                    arrays.append(table[name])
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            rows += len(table)
+    del legal_names
+    # Blocs de lecture CSV gardés par l'allocateur Arrow: rendus avant l'index
+    pa.default_memory_pool().release_unused()
+
+    # Index construit sur le fichier Arrow mappé (les noms ne sont jamais tous en mémoire)
+    table = _open_table(tmp_dir / "sirene.arrow")
+    index = SireneIndex(ArrowColumn(table['company_name']), ArrowColumn(table['siret']),
+                        postings_file=tmp_dir / "index" / "postings.npy")
+    index.save(tmp_dir / "index")
+    del index, table
+
+    stat = os.stat(source)
+    snapshot = snapshot_version(source)
+    if legal_units is not None:
+        # Une nouvelle dénomination change les correspondances: nouvelle version
+        snapshot = hashlib.sha1(f"{snapshot}#{snapshot_version(legal_units)}".encode('utf-8')).hexdigest()
+    manifest = {
+        'format_version': STORE_FORMAT_VERSION,
+        'source': {
+            'name': source.name,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'sha1': file_sha1(source),
+        },
+        'legal_units': Path(legal_units).name if legal_units is not None else None,
+        'snapshot': snapshot,
+        'rows': rows,
+        'built_at': pd.Timestamp.now().isoformat(),
+    }
+    with open(tmp_dir / "manifest.json", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    if store_dir.exists():
+        shutil.rmtree(store_dir)
+    os.replace(tmp_dir, store_dir)
+    logger.info(f"[OK] Store SIRENE: {rows} établissements en {time.perf_counter() - start:.1f}s")
+    return rows
+
+
+def _open_table(path):
+    """Table Arrow adossée au fichier mappé (aucune copie)"""
+    return pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+
+
+class SireneStore:
+    """Store SIRENE converti: table Arrow et index en mémoire mappée"""
+
+    def __init__(self, store_dir):
+        self.store_dir = Path(store_dir)
+        self.manifest = None
+        self.table = None
+        self.index = None
+
+    def _read_manifest(self):
+        if self.manifest is None:
+            try:
+                with open(self.store_dir / "manifest.json", 'r', encoding='utf-8') as f:
+                    self.manifest = json.load(f)
+            except (OSError, ValueError):
+                return None
+        return self.manifest
+
+    def exists(self):
+        """Store converti présent et au format courant"""
+        manifest = self._read_manifest()
+        return manifest is not None and manifest.get('format_version') == STORE_FORMAT_VERSION
+
+    def is_current(self, source):
+        """Store à jour pour le CSV `source` (taille et mtime, sinon hash du contenu)"""
+        if not self.exists():
+            return False
+        entry = self.manifest['source']
+        stat = os.stat(source)
+        if stat.st_size != entry['size']:
+            return False
+        if stat.st_mtime != entry['mtime']:
+            # mtime modifié (copie, checkout): contenu comparé par hash
+            return file_sha1(source) == entry['sha1']
+        return True
+
+    @property
+    def snapshot(self):
+        """Version des données de la base (hash brut, MATCH_CACHE_VERSION ajouté par le cache)"""
+        return self._read_manifest()['snapshot']
+
+    def open(self):
+        """Mappe la table et l'index (aucune donnée lue avant le premier accès)"""
+        if self.table is None:
+            if not self.exists():
+                raise FileNotFoundError(f"Store SIRENE absent ou obsolète: {self.store_dir}")
+            self.table = _open_table(self.store_dir / "sirene.arrow")
+            self.index = SireneIndex.load(self.store_dir / "index",
+                                          ArrowColumn(self.table['company_name']),
+                                          ArrowColumn(self.table['siret']))
+        return self
+
+    def column(self, name):
+        """Colonne Arrow du store (siret, siren, company_name, postal_code, status)"""
+        return self.open().table[name]
+
+    def __len__(self):
+        return self._read_manifest()['rows']
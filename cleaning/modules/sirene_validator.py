@@ -3,21 +3,60 @@ Module de validation des entreprises via base SIRENE
 Permet de détecter les entreprises fictives ou douteuses
 """
 
+import numpy as np
 import pandas as pd
 import requests
 import logging
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from fuzzywuzzy import fuzz
 import json
+from .sirene_blocking import LocationBlocker
+from .sirene_match_cache import SireneMatchCache
+from .sirene_store import SireneStore, build_sirene_store
 
 logger = logging.getLogger(__name__)
 
+# Validateur propre à chaque worker du pool de fuzzy matching (base chargée une fois)
+_worker_validator = None
+
+def _init_fuzzy_worker():
+    """Initialisation d'un worker: charge la base SIRENE et son index"""
+    global _worker_validator
+    _worker_validator = SIRENEValidator(use_match_cache=False)
+    _worker_validator.load_sirene_data()
+
+def _fuzzy_chunk(items):
+    """Fuzzy matching optimisé d'un lot de (nom, bloc) distincts dans le worker courant"""
+    _worker_validator.block_stats = {}
+    results = [_worker_validator.validate_company_fuzzy_optimized(name, min_score=75, block=block)
+               for name, block in items]
+    return results, _worker_validator.block_stats
+
 class SIRENEValidator:
     """Validateur d'entreprises via base SIRENE"""
     
-    def __init__(self):
+    # Patterns d'entreprises fictives ou de test
+    SUSPICIOUS_PATTERNS = [
+        'fake', 'test', 'example', 'demo', 'xxxxx',
+        'entreprise fictive', 'société test', 'company test'
+    ]
+    
+    def __init__(self, use_match_cache=True):
         self.sirene_data = None
+        self.sirene_index = None
         self.sirene_file = Path(__file__).parent.parent.parent / "dictionaries" / "sirene_sample.csv"
+        # Store colonnaire converti depuis sirene_file (Arrow + index, mémoire mappée)
+        self.sirene_store = SireneStore(Path(__file__).parent.parent.parent / "dictionaries" / "sirene_store")
+        # Cache persistant des correspondances fuzzy (entre runs du pipeline)
+        self.use_match_cache = use_match_cache
+        self.match_cache = None
+        self.match_cache_file = Path(__file__).parent.parent.parent / "dictionaries" / "sirene_match_cache.sqlite"
+        # Blocage géographique des candidats (département de l'offre)
+        self.blocker = None
+        self.departements_file = Path(__file__).parent.parent.parent / "dictionaries" / "departements.json"
+        self.block_stats = {}
         
     def download_sirene_sample(self):
         """Télécharge un échantillon étendu de la base SIRENE"""
@@ -85,20 +124,61 @@ class SIRENEValidator:
         return df_sample
     
     def load_sirene_data(self):
-        """Charge les données SIRENE"""
-        if not self.sirene_file.exists():
-            logger.info("Fichier SIRENE non trouvé, création de l'échantillon...")
-            self.sirene_data = self.download_sirene_sample()
-        else:
-            try:
-                self.sirene_data = pd.read_csv(self.sirene_file)
-                logger.info(f"Base SIRENE chargée: {len(self.sirene_data)} entreprises")
-            except Exception as e:
-                logger.error(f"Erreur chargement SIRENE: {e}")
-                return False
+        """
+        Ouvre le store SIRENE en mémoire mappée (une seule fois)
+        
+        Le CSV est converti en store colonnaire au premier chargement, puis
+        à chaque modification; un store déjà converti sans CSV (stock
+        national, voir build_sirene_store.py) est utilisé tel quel.
+        """
+        if self.sirene_index is not None:
+            return True
         
+        if not self.sirene_file.exists() and not self.sirene_store.exists():
+            logger.info("Fichier SIRENE non trouvé, création de l'échantillon...")
+            self.download_sirene_sample()
+        
+        try:
+            if self.sirene_file.exists() and not self.sirene_store.is_current(self.sirene_file):
+                build_sirene_store(self.sirene_file, self.sirene_store.store_dir)
+                self.sirene_store = SireneStore(self.sirene_store.store_dir)
+            self.sirene_store.open()
+        except Exception as e:
+            logger.error(f"Erreur chargement SIRENE: {e}")
+            return False
+        
+        self.sirene_data = self.sirene_store.table
+        self.sirene_index = self.sirene_store.index
+        logger.info(f"Base SIRENE chargée: {len(self.sirene_store)} entreprises (mémoire mappée)")
+        self.open_match_cache()
+        self.load_blocker()
         return True
     
+    def load_blocker(self):
+        """Charge le dictionnaire des départements (sans lui, recherche nationale uniquement)"""
+        try:
+            self.blocker = LocationBlocker(self.departements_file)
+        except Exception as e:
+            logger.warning(f"[ATTENTION] Blocage géographique désactivé: {e}")
+            self.blocker = None
+    
+    def block_groups(self, block):
+        """Groupes (départements) d'un bloc; groupes des lignes SIRENE calculés au premier appel"""
+        if self.sirene_index.row_groups is None:
+            self.sirene_index.row_groups = self.blocker.row_groups(self.sirene_store.column('postal_code'))
+        return self.blocker.groups(block)
+    
+    def open_match_cache(self):
+        """Ouvre le cache persistant pour la version courante de la base SIRENE"""
+        if not self.use_match_cache:
+            return
+        try:
+            self.match_cache = SireneMatchCache(self.match_cache_file, self.sirene_store.snapshot)
+            logger.info(f"Cache de correspondances SIRENE: {len(self.match_cache)} noms connus")
+        except Exception as e:
+            logger.warning(f"[ATTENTION] Cache de correspondances SIRENE indisponible: {e}")
+            self.match_cache = None
+    
     def validate_company_exact(self, company_name, siret=None):
         """Validation exacte par SIRET ou nom"""
         if self.sirene_data is None:
@@ -106,15 +186,12 @@ class SIRENEValidator:
         
         # Validation par SIRET (le plus fiable)
         if siret and not pd.isna(siret):
-            match = self.sirene_data[self.sirene_data['siret'] == str(siret)]
-            if not match.empty:
+            if self.sirene_index.lookup_siret(siret) >= 0:
                 return True, 1.0
         
         # Validation par nom exact
         if company_name and not pd.isna(company_name):
-            company_clean = str(company_name).upper().strip()
-            match = self.sirene_data[self.sirene_data['company_name'].str.upper() == company_clean]
-            if not match.empty:
+            if self.sirene_index.lookup_name(company_name) >= 0:
                 return True, 1.0
         
         return False, 0.0
@@ -124,25 +201,20 @@ class SIRENEValidator:
         if self.sirene_data is None or pd.isna(company_name):
             return False, 0.0
         
-        company_clean = str(company_name).upper().strip()
-        best_score = 0
-        
-        for sirene_name in self.sirene_data['company_name']:
-            if pd.isna(sirene_name):
-                continue
-                
-            sirene_clean = str(sirene_name).upper().strip()
-            
-            # Calcul similarité
-            score = fuzz.ratio(company_clean, sirene_clean)
-            if score > best_score:
-                best_score = score
+        # Candidats de l'index de bigrammes: même meilleur score que le parcours exhaustif
+        _, best_score = self.sirene_index.best_match(company_name, fuzz.ratio, min_score=min_score)
         
         is_valid = best_score >= min_score
         return is_valid, best_score / 100.0
     
-    def validate_company_fuzzy_optimized(self, company_name, min_score=75):
-        """Validation approximative optimisée par similarité de nom"""
+    def validate_company_fuzzy_optimized(self, company_name, min_score=75, block=None):
+        """
+        Validation approximative optimisée par similarité de nom
+        
+        Avec un bloc (département ou région, voir sirene_blocking), seuls
+        les établissements du bloc sont scorés; repli sur la recherche
+        nationale si aucun n'atteint le seuil.
+        """
         if self.sirene_data is None or pd.isna(company_name):
             return False, 0.0
         
@@ -152,39 +224,54 @@ class SIRENEValidator:
         if not hasattr(self, '_similarity_cache'):
             self._similarity_cache = {}
         
-        cache_key = company_clean
+        if block is not None and self.blocker is None:
+            block = None
+        cache_key = company_clean if block is None else (company_clean, block)
         if cache_key in self._similarity_cache:
             return self._similarity_cache[cache_key]
         
-        # Optimisation: pré-filtrage par longueur et premiers caractères
-        best_score = 0
-        company_len = len(company_clean)
-        
-        for sirene_name in self.sirene_data['company_name']:
-            if pd.isna(sirene_name):
-                continue
-                
-            sirene_clean = str(sirene_name).upper().strip()
-            sirene_len = len(sirene_clean)
-            
-            # Pré-filtrage rapide par longueur (évite calculs inutiles)
-            if abs(company_len - sirene_len) > max(company_len, sirene_len) * 0.5:
-                continue
-            
-            # Pré-filtrage par premiers caractères
-            if company_clean and sirene_clean and company_clean[0] != sirene_clean[0]:
-                continue
-            
-            # Calcul similarité uniquement si pré-filtrages passés
-            score = fuzz.ratio(company_clean, sirene_clean)
-            if score > best_score:
-                best_score = score
+        stats = self.block_stats.setdefault(block, Counter())
+        if block is None:
+            result, candidates = self._fuzzy_search(company_clean, min_score)
+        else:
+            result, candidates = self._fuzzy_search(company_clean, min_score, self.block_groups(block))
+            if not result[0]:
+                # Repli national, compté dans les statistiques du bloc d'origine seulement
+                stats['replis'] += 1
+                if company_clean in self._similarity_cache:
+                    result = self._similarity_cache[company_clean]
+                else:
+                    result, fallback_candidates = self._fuzzy_search(company_clean, min_score)
+                    candidates += fallback_candidates
+                    self._similarity_cache[company_clean] = result
+                stats['trouvés_repli'] += int(result[0])
+            else:
+                stats['trouvés_bloc'] += 1
+        stats['noms'] += 1
+        stats['candidats'] += candidates
         
-        result = (best_score >= min_score, best_score / 100.0)
         self._similarity_cache[cache_key] = result
         
         return result
     
+    def _fuzzy_search(self, company_clean, min_score, groups=None):
+        """Meilleur score de l'index (limité aux groupes d'un bloc): (résultat, nombre de candidats)"""
+        if not company_clean:
+            return (False, 0.0), 0
+        # Mêmes pré-filtres qu'avant (premier caractère, écart de longueur <= 50%),
+        # appliqués aux seuls candidats de l'index
+        rows, bounds = self.sirene_index.candidates(company_clean, min_score=min_score, same_first_char=True,
+                                                    max_length_gap=0.5, groups=groups)
+        _, best_score = self.sirene_index.best_of(company_clean, rows, fuzz.ratio, bounds, min_score=min_score)
+        return (best_score >= min_score, best_score / 100.0), len(rows)
+    
+    def is_suspicious(self, company_name):
+        """Nom contenant un pattern d'entreprise fictive ou de test"""
+        if not company_name or pd.isna(company_name):
+            return False
+        company_str = str(company_name).lower()
+        return any(pattern in company_str for pattern in self.SUSPICIOUS_PATTERNS)
+    
     def validate_company(self, company_name, siret=None, postal_code=None):
         """Validation complète d'une entreprise"""
         
@@ -200,18 +287,8 @@ class SIRENEValidator:
         
         # 3. Vérifications supplémentaires
         # Détecter des patterns suspects
-        if company_name and not pd.isna(company_name):
-            company_str = str(company_name).lower()
-            
-            # Patterns suspects
-            suspicious_patterns = [
-                'fake', 'test', 'example', 'demo', 'xxxxx',
-                'entreprise fictive', 'société test', 'company test'
-            ]
-            
-            for pattern in suspicious_patterns:
-                if pattern in company_str:
-                    return False, 0.0, "suspicious_pattern"
+        if self.is_suspicious(company_name):
+            return False, 0.0, "suspicious_pattern"
         
         return False, 0.0, "not_found"
     
@@ -223,24 +300,15 @@ class SIRENEValidator:
         if is_valid_exact:
             return True, score_exact, "exact_match"
         
-        # 2. Validation approximative optimisée
-        is_valid_fuzzy, score_fuzzy = self.validate_company_fuzzy_optimized(company_name, min_score=75)
+        # 2. Validation approximative optimisée (bloquée sur le département du code postal)
+        block = self.blocker.block_for_postal_code(postal_code) if self.blocker and postal_code else None
+        is_valid_fuzzy, score_fuzzy = self.validate_company_fuzzy_optimized(company_name, min_score=75, block=block)
         if is_valid_fuzzy:
             return True, score_fuzzy, "fuzzy_match_optimized"
         
         # 3. Vérifications supplémentaires
-        if company_name and not pd.isna(company_name):
-            company_str = str(company_name).lower()
-            
-            # Patterns suspects
-            suspicious_patterns = [
-                'fake', 'test', 'example', 'demo', 'xxxxx',
-                'entreprise fictive', 'société test', 'company test'
-            ]
-            
-            for pattern in suspicious_patterns:
-                if pattern in company_str:
-                    return False, 0.0, "suspicious_pattern"
+        if self.is_suspicious(company_name):
+            return False, 0.0, "suspicious_pattern"
         
         return False, 0.0, "not_found"
     
@@ -334,3 +402,198 @@ class SIRENEValidator:
         logger.info(f"   - Performance: {len(df)/chunk_size:.1f} chunks traités")
         
         return df_validated
+    
+    def validate_dataframe_batch(self, df, company_col='company', siret_col=None, workers=None, chunk_size=200,
+                                 location_col=None, postal_code_col=None):
+        """
+        Valide un DataFrame entier par noms distincts (même résultat que validate_dataframe_optimized)
+        
+        1. SIRET puis noms exacts: une recherche vectorisée dans l'index
+           pour toutes les valeurs distinctes
+        2. Fuzzy matching uniquement pour les couples (nom, bloc) distincts
+           non résolus (pool de `workers` processus si demandé). Le bloc
+           est le département tiré de `postal_code_col` ou `location_col`
+           (recherche nationale sans ces colonnes ou si le lieu est inconnu)
+        3. Résultats redéployés sur les lignes
+        
+        Le coût dépend du nombre d'entreprises distinctes, pas du nombre de lignes.
+        """
+        logger.info(f"Validation SIRENE par lot de {len(df)} lignes...")
+        
+        if not self.load_sirene_data():
+            logger.error("Impossible de charger la base SIRENE")
+            return df
+        
+        if not hasattr(self, '_similarity_cache'):
+            self._similarity_cache = {}
+        self.block_stats = {}
+        
+        n = len(df)
+        is_valid = np.zeros(n, dtype=bool)
+        scores = np.zeros(n, dtype=float)
+        methods = np.full(n, 'not_found', dtype=object)
+        resolved = np.zeros(n, dtype=bool)
+        
+        # 1a. SIRET (le plus fiable)
+        if siret_col and siret_col in df.columns:
+            siret_codes, siret_values = pd.factorize(df[siret_col])
+            siret_found = self.sirene_index.lookup_sirets([siret if siret else None for siret in siret_values]) >= 0
+            resolved = (siret_codes >= 0) & siret_found[siret_codes]
+        
+        # 1b. Noms exacts, par valeur distincte
+        name_codes, names = pd.factorize(df[company_col])
+        names = list(names)
+        exact = self.sirene_index.lookup_names([name if name else None for name in names]) >= 0
+        resolved |= (name_codes >= 0) & exact[name_codes]
+        is_valid[resolved] = True
+        scores[resolved] = 1.0
+        methods[resolved] = 'exact_match'
+        
+        # 2. Fuzzy sur les couples (nom distinct, bloc) restants (cache par nom normalisé et bloc)
+        block_codes, blocks = self._row_blocks(df, location_col, postal_code_col)
+        has_name = name_codes >= 0
+        located_codes, pairs = pd.factorize(name_codes[has_name].astype(np.int64) * (len(blocks) + 1)
+                                            + block_codes[has_name] + 1)
+        pair_codes = np.full(n, -1, dtype=np.int64)
+        pair_codes[has_name] = located_codes
+        pair_names = pairs // (len(blocks) + 1)
+        pair_blocks = [blocks[code - 1] if code > 0 else None for code in pairs % (len(blocks) + 1)]
+        pair_keys = [self._fuzzy_key(names[name_code], block) for name_code, block in zip(pair_names, pair_blocks)]
+        
+        pending_codes = np.unique(pair_codes[~resolved & has_name])
+        pending_keys = list(dict.fromkeys(pair_keys[code] for code in pending_codes))
+        to_score = [key for key in pending_keys if key not in self._similarity_cache]
+        from_disk = 0
+        if self.match_cache is not None and to_score:
+            # Couples déjà scorés lors d'un run précédent (même base SIRENE)
+            by_block = {}
+            for key in to_score:
+                name, block = key if isinstance(key, tuple) else (key, None)
+                by_block.setdefault(block, []).append(name)
+            for block, block_names in by_block.items():
+                known = self.match_cache.get_many(block_names, 75, self._cache_mode(block))
+                self._similarity_cache.update((self._fuzzy_key(name, block), result) for name, result in known.items())
+                from_disk += len(known)
+            to_score = [key for key in to_score if key not in self._similarity_cache]
+        logger.info(f"   - {len(names)} noms distincts, {int(exact.sum())} exacts, "
+                    f"{len(to_score)} à scorer en fuzzy ({len(pending_keys) - len(to_score)} en cache "
+                    f"dont {from_disk} du cache persistant)")
+        
+        items = [key if isinstance(key, tuple) else (key, None) for key in to_score]
+        if workers and workers > 1 and len(items) > chunk_size:
+            chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_fuzzy_worker) as executor:
+                for chunk, (results, stats) in zip(chunks, executor.map(_fuzzy_chunk, chunks)):
+                    for (name, block), result in zip(chunk, results):
+                        self._similarity_cache[self._fuzzy_key(name, block)] = result
+                    for block, counts in stats.items():
+                        self.block_stats.setdefault(block, Counter()).update(counts)
+        else:
+            for name, block in items:
+                self.validate_company_fuzzy_optimized(name, min_score=75, block=block)
+        
+        if self.match_cache is not None:
+            by_block = {}
+            for name, block in items:
+                by_block.setdefault(block, {})[name] = self._similarity_cache[self._fuzzy_key(name, block)]
+            for block, results in by_block.items():
+                self.match_cache.put_many(results, 75, self._cache_mode(block))
+        
+        # 3. Redéploiement par code de couple distinct
+        distinct_valid = np.zeros(len(pairs), dtype=bool)
+        distinct_scores = np.zeros(len(pairs), dtype=float)
+        distinct_methods = np.full(len(pairs), 'not_found', dtype=object)
+        for code, (name_code, key) in enumerate(zip(pair_names, pair_keys)):
+            fuzzy_valid, fuzzy_score = self._similarity_cache.get(key, (False, 0.0))
+            if fuzzy_valid:
+                distinct_valid[code], distinct_scores[code] = True, fuzzy_score
+                distinct_methods[code] = 'fuzzy_match_optimized'
+            elif self.is_suspicious(names[name_code]):
+                distinct_methods[code] = 'suspicious_pattern'
+        
+        rows = ~resolved & has_name
+        is_valid[rows] = distinct_valid[pair_codes[rows]]
+        scores[rows] = distinct_scores[pair_codes[rows]]
+        methods[rows] = distinct_methods[pair_codes[rows]]
+        
+        results_df = pd.DataFrame({
+            'is_verified_company': is_valid,
+            'sirene_match_score': scores,
+            'sirene_match_method': methods
+        })
+        df_validated = pd.concat([df.reset_index(drop=True), results_df], axis=1)
+        
+        verified_count = int(is_valid.sum())
+        logger.info(f"Validation par lot terminée:")
+        logger.info(f"   - Entreprises vérifiées: {verified_count}/{n} ({verified_count/n*100 if n else 0:.1f}%)")
+        logger.info(f"   - Score moyen: {scores.mean() if n else 0:.3f}")
+        if len(blocks):
+            self._log_blocking_report(block_codes)
+        
+        return df_validated
+    
+    @staticmethod
+    def _fuzzy_key(name, block):
+        """Clé du cache de similarité: nom normalisé, et bloc s'il y en a un"""
+        name = str(name).upper().strip()
+        return name if block is None else (name, block)
+    
+    def _cache_mode(self, block):
+        """Mode du cache persistant (un résultat par nom, par bloc et par version du dictionnaire de blocage)"""
+        return 'optimized' if block is None else f'optimized@{block}#{self.blocker.version}'
+    
+    def _row_blocks(self, df, location_col=None, postal_code_col=None):
+        """
+        Bloc de chaque ligne, par valeur distincte de lieu ou code postal
+        
+        Returns:
+            (codes, blocs): codes -1 pour la recherche nationale, sinon
+            position dans `blocs`
+        """
+        codes = np.full(len(df), -1, dtype=np.int64)
+        column = postal_code_col if postal_code_col in df.columns else location_col
+        if self.blocker is None or column is None or column not in df.columns:
+            return codes, []
+        
+        value_codes, values = pd.factorize(df[column])
+        if column == postal_code_col:
+            value_blocks = [self.blocker.block_for_postal_code(value) for value in values]
+        else:
+            value_blocks = [self.blocker.block_for_location(value) for value in values]
+        
+        block_codes, blocks = pd.factorize(pd.Series(value_blocks, dtype=object))
+        located = value_codes >= 0
+        codes[located] = block_codes[value_codes[located]]
+        return codes, list(blocks)
+    
+    def blocking_report(self):
+        """Tailles des ensembles de candidats et taux de réussite par bloc (dernière validation)"""
+        rows = []
+        for block, stats in self.block_stats.items():
+            names = stats['noms']
+            if not names:
+                continue
+            rows.append({
+                'bloc': self.blocker.label(block) if block is not None and self.blocker else 'national',
+                'noms_scores': names,
+                'candidats_moyens': stats['candidats'] / names,
+                'taux_trouves_bloc': stats['trouvés_bloc'] / names if block is not None else np.nan,
+                'replis_national': stats['replis'],
+                'taux_trouves_repli': stats['trouvés_repli'] / stats['replis'] if stats['replis'] else np.nan,
+            })
+        columns = ['bloc', 'noms_scores', 'candidats_moyens', 'taux_trouves_bloc',
+                   'replis_national', 'taux_trouves_repli']
+        return pd.DataFrame(rows, columns=columns).sort_values('noms_scores', ascending=False, ignore_index=True)
+    
+    def _log_blocking_report(self, block_codes, top=10):
+        """Résumé du blocage géographique dans les logs"""
+        blocked = int((block_codes >= 0).sum())
+        logger.info(f"   - Blocage géographique: {blocked}/{len(block_codes)} lignes localisées")
+        report = self.blocking_report()
+        for row in report.head(top).itertuples(index=False):
+            if row.bloc == 'national':
+                logger.info(f"     {row.bloc}: {row.noms_scores} noms scorés, "
+                            f"{row.candidats_moyens:.1f} candidats/nom")
+            else:
+                logger.info(f"     {row.bloc}: {row.noms_scores} noms scorés, {row.candidats_moyens:.1f} candidats/nom, "
+                            f"{row.taux_trouves_bloc:.0%} trouvés dans le bloc, {row.replis_national} replis national")
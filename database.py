@@ -3,20 +3,29 @@ PostgreSQL Database Creator with Parquet Data Loader
 This script creates a new PostgreSQL database and loads data from parquet files.
 """
 
+import io
+import itertools
 import os
 import sys
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
 import json
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Set
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Rows per parquet record batch streamed with COPY (bounds memory per table)
+COPY_BATCH_ROWS = 50_000
+
 class PostgreSQLParquetLoader:
     def __init__(self, host: str = 'localhost', port: int = 5432, 
                  user: str = 'postgres', password: str = 'password'):
@@ -237,17 +246,24 @@ class PostgreSQLParquetLoader:
             logger.error(f"Failed to create table '{table_name}': {e}")
             return False
     
-    def load_parquet_to_table(self, parquet_file: str, table_name: str = None) -> bool:
+    def load_parquet_to_table(self, parquet_file: str, table_name: str = None,
+                              method: str = 'copy', batch_size: int = COPY_BATCH_ROWS) -> bool:
         """
         Load data from parquet file to PostgreSQL table
         
         Args:
             parquet_file: Path to the parquet file
             table_name: Name of the table (if None, uses filename without extension)
+            method: 'copy' to stream record batches with COPY FROM STDIN,
+                    'insert' for the pandas to_sql / executemany path
+            batch_size: Rows per record batch in 'copy' mode
             
         Returns:
             bool: True if data loaded successfully, False otherwise
         """
+        if method == 'copy':
+            return self.copy_parquet_to_table(parquet_file, table_name, batch_size)
+        
         try:
             # Read parquet file
             df = pd.read_parquet(parquet_file)
@@ -298,6 +314,226 @@ class PostgreSQLParquetLoader:
             logger.error(f"Failed to load parquet file '{parquet_file}': {e}")
             return False
     
+    def copy_parquet_to_table(self, parquet_file: str, table_name: str = None,
+                              batch_size: int = COPY_BATCH_ROWS) -> bool:
+        """
+        Stream a parquet file into a PostgreSQL table with COPY FROM STDIN
+        
+        Record batches are read one at a time, rendered to CSV by Arrow
+        (list columns converted with Arrow kernels, no Python loop per row)
+        and sent through the open psycopg2 connection, so memory is bounded
+        by batch_size rather than by the file size. Tables get the same
+        schema and values as with the insert path.
+        
+        Args:
+            parquet_file: Path to the parquet file
+            table_name: Name of the table (if None, uses filename without extension)
+            batch_size: Rows per record batch
+            
+        Returns:
+            bool: True if data loaded successfully, False otherwise
+        """
+        try:
+            parquet = pq.ParquetFile(parquet_file)
+            logger.info(f"Streaming parquet file: {parquet_file} ({parquet.metadata.num_rows} rows)")
+            
+            # Generate table name if not provided
+            if table_name is None:
+                table_name = os.path.splitext(os.path.basename(parquet_file))[0]
+            
+            # Clean table and column names
+            table_name = table_name.replace(' ', '_').replace('-', '_').replace('.', '_')
+            columns = [col.replace(' ', '_').replace('-', '_').replace('.', '_')
+                       for col in parquet.schema_arrow.names]
+            
+            # Create table from the first batch, preprocessed like the insert path
+            # (list columns become TEXT)
+            batches = parquet.iter_batches(batch_size=batch_size)
+            first_batch = next(batches, None)
+            sample = first_batch if first_batch is not None else parquet.schema_arrow.empty_table()
+            if not self.create_table_from_dataframe(self._preprocess_dataframe(sample.to_pandas()), table_name):
+                return False
+            # Array columns only exist in tables created outside this loader
+            array_columns = self._get_array_columns(table_name)
+            
+            column_list = ', '.join([f'"{col}"' for col in columns])
+            copy_sql = f'COPY "{table_name}" ({column_list}) FROM STDIN WITH (FORMAT csv)'
+            
+            copied_rows = 0
+            for batch in itertools.chain([first_batch] if first_batch is not None else [], batches):
+                buffer = io.BytesIO()
+                pv.write_csv(self.prepare_batch_for_copy(batch, columns, array_columns), buffer,
+                             pv.WriteOptions(include_header=False))
+                buffer.seek(0)
+                self.cursor.copy_expert(copy_sql, buffer)
+                copied_rows += batch.num_rows
+            
+            self.conn.commit()
+            logger.info(f"Copied {copied_rows} rows into table '{table_name}'")
+            return True
+            
+        except Exception as e:
+            if self.conn:
+                self.conn.rollback()
+            logger.error(f"Failed to copy parquet file '{parquet_file}': {e}")
+            return False
+    
+    def _get_array_columns(self, table_name: str) -> Set[str]:
+        """
+        Get the array-typed columns of an existing table
+        
+        Args:
+            table_name: Name of the table
+            
+        Returns:
+            Set of column names declared as PostgreSQL arrays
+        """
+        self.cursor.execute("""
+            SELECT column_name
+            FROM information_schema.columns
+            WHERE table_schema = 'public'
+            AND table_name = %s
+            AND data_type = 'ARRAY'
+        """, (table_name,))
+        return {row[0] for row in self.cursor.fetchall()}
+    
+    def prepare_batch_for_copy(self, batch: pa.RecordBatch, columns: List[str],
+                               array_columns: Set[str]) -> pa.Table:
+        """
+        Prepare a parquet record batch for CSV COPY, column by column
+        
+        Args:
+            batch: Arrow record batch read from the parquet file
+            columns: Cleaned column names, in batch order
+            array_columns: Columns declared as arrays in the target table
+            
+        Returns:
+            Arrow table ready for pyarrow.csv.write_csv
+        """
+        arrays = []
+        for col, array in zip(columns, batch.columns):
+            arrays.append(self._format_column_for_copy(array, col in array_columns))
+        return pa.Table.from_arrays(arrays, names=columns)
+    
+    def _format_column_for_copy(self, array: pa.Array, as_array_literal: bool) -> pa.Array:
+        """
+        Convert one Arrow column to values PostgreSQL accepts in CSV COPY
+        
+        Args:
+            array: Arrow column
+            as_array_literal: Render list values as array literals (array
+                              column) rather than as their text form (TEXT column)
+            
+        Returns:
+            Arrow column writable by pyarrow.csv.write_csv
+        """
+        if pa.types.is_dictionary(array.type):
+            array = array.cast(array.type.value_type)
+        
+        if pa.types.is_list(array.type) or pa.types.is_large_list(array.type):
+            if as_array_literal:
+                return self._format_array_column_for_postgres(array)
+            return self._format_list_column_as_text(array)
+        
+        if pa.types.is_struct(array.type) or pa.types.is_map(array.type):
+            return pa.array([None if value is None else json.dumps(value, default=str)
+                             for value in array.to_pylist()], type=pa.string())
+        
+        if pa.types.is_floating(array.type):
+            # NaN is loaded as NULL, like the insert path
+            return pc.if_else(pc.is_nan(array), pa.scalar(None, array.type), array)
+        
+        if pa.types.is_timestamp(array.type) and array.type.unit == 'ns':
+            # PostgreSQL timestamps stop at microseconds
+            return array.cast(pa.timestamp('us', array.type.tz), safe=False)
+        
+        return array
+    
+    def _format_array_column_for_postgres(self, array: pa.Array) -> pa.Array:
+        """
+        Format a whole list column as PostgreSQL array literals with Arrow kernels
+        
+        Vectorised equivalent of _format_array_for_postgres: items are quoted
+        and escaped, null items become NULL, null lists stay NULL.
+        
+        Args:
+            array: Arrow list column
+            
+        Returns:
+            Arrow string column of array literals ('{"Python","SQL"}')
+        """
+        items = array.values
+        if not pa.types.is_string(items.type):
+            items = items.cast(pa.string())
+        
+        escaped = pc.replace_substring(items, '\\', '\\\\')
+        escaped = pc.replace_substring(escaped, '"', '\\"')
+        quoted = pc.fill_null(pc.binary_join_element_wise('"', escaped, '"', ''), 'NULL')
+        
+        return self._join_list_items(array, quoted, ',', '{', '}')
+    
+    def _format_list_column_as_text(self, array: pa.Array) -> pa.Array:
+        """
+        Format a whole list column as the text the insert path stores
+        
+        Vectorised equivalent of str(x.tolist()) in _preprocess_dataframe
+        ("['Python', 'SQL']"). Strings are quoted like Python's repr; the
+        few items with characters outside ASCII/Latin letters (where repr
+        may escape) are rendered by repr itself.
+        
+        Args:
+            array: Arrow list column
+            
+        Returns:
+            Arrow string column of Python list representations
+        """
+        items = array.values
+        if pa.types.is_large_string(items.type):
+            items = items.cast(pa.string())
+        if pa.types.is_string(items.type):
+            escaped = pc.replace_substring(items, '\\', '\\\\')
+            # repr uses double quotes only when the item has ' and no "
+            double_quoted = pc.and_(pc.match_substring(items, "'"),
+                                    pc.invert(pc.match_substring(items, '"')))
+            rendered = pc.if_else(
+                double_quoted,
+                pc.binary_join_element_wise('"', escaped, '"', ''),
+                pc.binary_join_element_wise("'", pc.replace_substring(escaped, "'", "\\'"), "'", ''))
+            
+            needs_repr = pc.fill_null(
+                pc.match_substring_regex(items, '[^\x20-\x7e\u00a1-\u00ac\u00ae-\u024f]'), False)
+            if pc.any(needs_repr).as_py():
+                unusual = pc.filter(items, needs_repr).to_pylist()
+                rendered = pc.replace_with_mask(rendered, needs_repr,
+                                                pa.array([repr(item) for item in unusual], type=pa.string()))
+        elif pa.types.is_integer(items.type):
+            rendered = items.cast(pa.string())
+        else:
+            rendered = pa.array([repr(item) for item in items.to_pylist()], type=pa.string())
+        rendered = pc.fill_null(rendered, 'None')
+        
+        return self._join_list_items(array, rendered, ', ', '[', ']')
+    
+    def _join_list_items(self, array: pa.Array, items: pa.Array, separator: str,
+                         opening: str, closing: str) -> pa.Array:
+        """
+        Join converted items back into one string per list (null lists stay null)
+        
+        Args:
+            array: Original list or large_list column
+            items: Converted string values, aligned with array.values
+            separator: Separator between items
+            opening: Text before the first item
+            closing: Text after the last item
+            
+        Returns:
+            Arrow string column
+        """
+        list_class = pa.LargeListArray if pa.types.is_large_list(array.type) else pa.ListArray
+        joined = pc.binary_join(list_class.from_arrays(array.offsets, items), separator)
+        joined = pc.binary_join_element_wise(opening, joined, closing, '')
+        return pc.if_else(array.is_null(), pa.scalar(None, pa.string()), joined)
+    
     def _preprocess_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Pre-process DataFrame to handle problematic columns before insertion
@@ -625,8 +861,16 @@ def main():
         'interactive': 'Ask for confirmation before resetting'
     }
     
-    # Set your preferred option here
-    RESET_MODE = 'interactive'  # Change this to 'skip', 'drop', 'clear', or 'interactive'
+    # Set your preferred option here (or via DB_RESET_MODE)
+    RESET_MODE = os.getenv('DB_RESET_MODE', 'interactive')  # 'skip', 'drop', 'clear', or 'interactive'
+    
+    # No terminal when chained by the orchestrator: never prompt
+    if RESET_MODE == 'interactive' and os.getenv('TALENTINSIGHT_NON_INTERACTIVE', '0') in ('1', 'true', 'True'):
+        logger.info("Non-interactive run: existing tables are kept (set DB_RESET_MODE to override)")
+        RESET_MODE = 'skip'
+    
+    # 'copy' (COPY FROM STDIN, streamed) or 'insert' (pandas to_sql)
+    LOAD_METHOD = os.getenv('DB_LOAD_METHOD', 'copy')
     
     # Create loader instance
     loader = PostgreSQLParquetLoader(
@@ -710,7 +954,7 @@ def main():
         # Load each parquet file
         success_count = 0
         for parquet_file in parquet_files:
-            if loader.load_parquet_to_table(parquet_file):
+            if loader.load_parquet_to_table(parquet_file, method=LOAD_METHOD):
                 success_count += 1
         
         logger.info(f"Successfully loaded {success_count}/{len(parquet_files)} parquet files")
@@ -1,12 +1,19 @@
 import os
 import sys
-import requests
+import json
+import argparse
 import pandas as pd
 from datetime import datetime
 from typing import List, Dict
-import time
-import random
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config import (ADZUNA_BASE_URL, MAX_REQUESTS_PER_MINUTE, MAX_CONCURRENT_REQUESTS,
+                    ADZUNA_STATE_FILE, ADZUNA_SEEN_IDS_MAX, NON_INTERACTIVE)
+from http_session import get_client
+from skill_matcher import extract_skills
+from checkpoint import Checkpoint
 
 # Configuration encodage pour Windows
 if sys.platform == "win32":
@@ -18,7 +25,7 @@ if sys.platform == "win32":
 ADZUNA_APP_ID = os.getenv('ADZUNA_APP_ID')
 ADZUNA_API_KEY = os.getenv('ADZUNA_API_KEY')
 
-if not ADZUNA_APP_ID:
+if not ADZUNA_APP_ID and not NON_INTERACTIVE:
     print("Configuration manuelle des cles Adzuna:")
     ADZUNA_APP_ID = input("ADZUNA_APP_ID: ").strip()
     ADZUNA_API_KEY = input("ADZUNA_API_KEY: ").strip()
@@ -31,19 +38,9 @@ COUNTRIES = {
     'IT': 'it'
 }
 
-TECH_SKILLS = [
-    'Python', 'JavaScript', 'Java', 'C++', 'C#', 'PHP', 'Ruby', 'Go',
-    'React', 'Vue.js', 'Angular', 'Node.js', 'Django', 'Flask',
-    'PostgreSQL', 'MySQL', 'MongoDB', 'Redis',
-    'Docker', 'Kubernetes', 'AWS', 'Azure', 'GCP',
-    'Machine Learning', 'AI', 'DevOps', 'Scrum', 'Agile'
-]
-
 def extract_skills_from_text(text):
-    if not text:
-        return []
-    text_lower = text.lower()
-    return [skill for skill in TECH_SKILLS if skill.lower() in text_lower]
+    # Automate partage (config.TECH_SKILLS + alias), limites de mots respectees
+    return extract_skills(text)
 
 def clean_salary(salary_value):
     try:
@@ -51,76 +48,331 @@ def clean_salary(salary_value):
     except:
         return None
 
-def scrape_adzuna_country(country_code, max_pages=10):
-    print(f"\n=== SCRAPING ADZUNA POUR {country_code.upper()} ===")
-    all_jobs = []
-    search_terms = ['developer', 'software engineer', 'programmeur', 'ingenieur logiciel']
-
-    for search_term in search_terms:
-        print(f"Recherche: '{search_term}'")
-
-        for page in range(1, max_pages + 1):
-            print(f"  Page {page}/{max_pages}")
-            url = f"https://api.adzuna.com/v1/api/jobs/{country_code}/search/{page}"
-
-            params = {
-                'app_id': ADZUNA_APP_ID,
-                'app_key': ADZUNA_API_KEY,
-                'what': search_term,
-                # 'category': '15',  # désactivé pour test
-                'results_per_page': 50,
-                'sort_by': 'date'
-            }
+SEARCH_TERMS = ['developer', 'software engineer', 'programmeur', 'ingenieur logiciel']
 
-            try:
-                response = requests.get(url, params=params, timeout=30)
-                if response.status_code == 200:
-                    data = response.json()
-                    jobs = data.get('results', [])
-
-                    if not jobs:
-                        print(f"    Aucun resultat page {page}, arret")
-                        break
+class AdzunaAuthError(Exception):
+    """Cles API refusees (401): inutile de continuer la collecte"""
 
-                    for job in jobs:
-                        processed_job = process_job(job, country_code)
-                        if processed_job:
-                            all_jobs.append(processed_job)
+def parse_created(value):
+    """Date `created` Adzuna (ISO 8601, suffixe Z) -> datetime, None si invalide"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
 
-                    print(f"    OK: {len(jobs)} emplois")
+class WatermarkStore:
+    """
+    High-water marks persistants par (pays, terme)
+
+    - created: date de l'offre la plus recente deja collectee
+    - seen_ids: derniers ids collectes (borne a ADZUNA_SEEN_IDS_MAX)
+
+    Les resultats d'une execution restent en attente jusqu'a commit(),
+    appele apres la sauvegarde des CSV: un echec d'ecriture ne fait pas
+    avancer les marques.
+    """
+
+    def __init__(self, path=ADZUNA_STATE_FILE, max_ids=ADZUNA_SEEN_IDS_MAX):
+        self.path = path
+        self.max_ids = max_ids
+        self.lock = threading.Lock()
+        self.marks = {}
+        self.pending = {}
+        self.load()
+
+    @staticmethod
+    def key(country_code, search_term):
+        return f"{country_code}|{search_term}"
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.marks = json.load(f)
+            print(f"High-water marks Adzuna: {len(self.marks)} couples (pays, terme)")
+        except Exception as e:
+            print(f"High-water marks illisibles ({e}), collecte complete")
+            self.marks = {}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self.lock:
+            snapshot = dict(self.marks)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def get_created(self, country_code, search_term):
+        """Date de la derniere offre collectee pour ce couple (datetime ou None)"""
+        mark = self.marks.get(self.key(country_code, search_term))
+        return parse_created(mark['created']) if mark else None
+
+    def known_ids(self, country_code):
+        """Ids deja collectes pour le pays, tous termes confondus"""
+        prefix = f"{country_code}|"
+        ids = set()
+        for key, mark in self.marks.items():
+            if key.startswith(prefix):
+                ids.update(mark['seen_ids'])
+        return ids
+
+    def stage(self, country_code, search_term, created, ids, advance):
+        """
+        Enregistre le resultat d'un terme en attente du commit
+
+        Args:
+            created: `created` brut de l'offre la plus recente vue
+            ids: ids des nouvelles offres
+            advance: False si la pagination a ete interrompue (erreur):
+                     les ids sont retenus mais la date n'avance pas, pour
+                     ne pas sauter les offres des pages non lues
+        """
+        with self.lock:
+            self.pending[self.key(country_code, search_term)] = {
+                'created': created if advance else None,
+                'ids': [str(job_id) for job_id in ids]
+            }
 
-                elif response.status_code == 401:
-                    print(f"    ERREUR 401: Cles API invalides")
-                    return []
+    def commit(self):
+        """Fusionne les resultats en attente et ecrit le fichier d'etat"""
+        with self.lock:
+            for key, update in self.pending.items():
+                mark = self.marks.get(key, {'created': None, 'seen_ids': []})
+
+                new_created = parse_created(update['created'])
+                old_created = parse_created(mark['created'])
+                if new_created and (old_created is None or new_created > old_created):
+                    mark['created'] = update['created']
+
+                # Ordre d'insertion conserve: les ids les plus anciens sortent en premier
+                seen_ids = list(dict.fromkeys(mark['seen_ids'] + update['ids']))
+                mark['seen_ids'] = seen_ids[-self.max_ids:]
+                self.marks[key] = mark
+            self.pending = {}
+
+        self.save()
+
+def fetch_adzuna_page(country_code, search_term, page):
+    """
+    Recupere une page de resultats Adzuna via le client HTTP partage
+
+    Le client applique le token bucket de l'hote et rejoue les 429
+    en respectant Retry-After.
+
+    Returns:
+        Liste brute des offres (vide si fin de pagination), None si erreur
+    """
+    url = f"{ADZUNA_BASE_URL}/{country_code}/search/{page}"
+    params = {
+        'app_id': ADZUNA_APP_ID,
+        'app_key': ADZUNA_API_KEY,
+        'what': search_term,
+        # 'category': '15',  # désactivé pour test
+        'results_per_page': 50,
+        'sort_by': 'date'
+    }
 
-                elif response.status_code == 429:
-                    print(f"    ERREUR 429: Trop de requetes, pause...")
-                    time.sleep(60)
-                    continue
+    try:
+        response = get_client().get(url, params=params, timeout=30)
+    except Exception as e:
+        print(f"    [{country_code}/{search_term}] Exception page {page}: {e}")
+        return None
 
-                else:
-                    print(f"    ERREUR {response.status_code}")
-                    break
+    if response.status_code == 200:
+        return response.json().get('results', [])
+
+    if response.status_code == 401:
+        raise AdzunaAuthError("Cles API invalides")
+
+    print(f"    [{country_code}/{search_term}] ERREUR {response.status_code} page {page}")
+    return None
+
+def process_adzuna_page(jobs, country_code, high_water=None, known_ids=frozenset()):
+    """
+    Filtre et transforme une page de resultats
+
+    Returns:
+        (offres nouvelles, infos de page: nombre brut, offres ignorees,
+        `created` le plus recent, high-water mark atteint)
+    """
+    page_jobs = []
+    latest_created = None
+    latest_date = None
+    skipped = 0
+    reached_mark = False
+
+    for job in jobs:
+        created = parse_created(job.get('created'))
+        if created and (latest_date is None or created > latest_date):
+            latest_date = created
+            latest_created = job.get('created')
+
+        if high_water and created and created < high_water:
+            reached_mark = True
+            skipped += 1
+            continue
 
-                time.sleep(random.uniform(1, 3))
+        if str(job.get('id')) in known_ids:
+            skipped += 1
+            continue
 
-            except Exception as e:
-                print(f"    Exception: {e}")
-                continue
+        processed_job = process_job(job, country_code)
+        if processed_job:
+            page_jobs.append(processed_job)
 
-        time.sleep(5)
+    return page_jobs, {
+        'raw_count': len(jobs),
+        'skipped': skipped,
+        'latest_created': latest_created,
+        'reached_mark': reached_mark
+    }
 
+def scrape_adzuna_term(country_code, search_term, max_pages, stop_event=None, watermarks=None,
+                       checkpoint=None):
+    """
+    Parcourt les pages d'un terme et s'arrete a la premiere page vide
+
+    Avec `watermarks`, les offres sont triees par date: la pagination
+    s'arrete des qu'une page atteint la derniere offre deja collectee,
+    et seules les offres dont l'id est inconnu sont retournees.
+
+    Avec `checkpoint`, chaque page est ecrite des sa reception: apres un
+    crash, les pages deja recues sont relues au lieu d'etre redemandees.
+    """
+    jobs_found = []
+
+    high_water = watermarks.get_created(country_code, search_term) if watermarks else None
+    known_ids = watermarks.known_ids(country_code) if watermarks else set()
+    latest_created = None
+    skipped = 0
+    complete = True
+    resumed_pages = 0
+
+    for page in range(1, max_pages + 1):
+        if stop_event is not None and stop_event.is_set():
+            complete = False
+            break
+
+        unit = f"{country_code}|{search_term}|{page}"
+        if checkpoint is not None and checkpoint.is_done(unit):
+            page_jobs, info = checkpoint.load(unit), checkpoint.meta(unit)
+            resumed_pages += 1
+        else:
+            jobs = fetch_adzuna_page(country_code, search_term, page)
+            if jobs is None:
+                complete = False
+                break
+
+            page_jobs, info = process_adzuna_page(jobs, country_code, high_water, known_ids)
+            if checkpoint is not None:
+                checkpoint.save(unit, page_jobs, info)
+
+            if info['raw_count']:
+                print(f"    [{country_code}/{search_term}] Page {page}/{max_pages}: {info['raw_count']} emplois")
+
+        if not info['raw_count']:
+            print(f"    [{country_code}/{search_term}] Aucun resultat page {page}, arret")
+            break
+
+        jobs_found.extend(page_jobs)
+        skipped += info['skipped']
+        page_latest = parse_created(info['latest_created'])
+        if page_latest and (latest_created is None or page_latest > parse_created(latest_created)):
+            latest_created = info['latest_created']
+
+        if info['reached_mark']:
+            print(f"    [{country_code}/{search_term}] Offres deja collectees atteintes page {page}, arret")
+            break
+
+    if resumed_pages:
+        print(f"    [{country_code}/{search_term}] {resumed_pages} page(s) reprise(s) du checkpoint")
+
+    if watermarks is not None:
+        if skipped:
+            print(f"    [{country_code}/{search_term}] {len(jobs_found)} nouvelles, {skipped} deja collectees")
+        watermarks.stage(country_code, search_term, latest_created,
+                         [job['id'] for job in jobs_found], advance=complete)
+
+    return jobs_found
+
+def deduplicate_jobs(jobs):
+    """Supprime les offres deja vues (meme id Adzuna)"""
     seen_ids = set()
     unique_jobs = []
-    for job in all_jobs:
+    for job in jobs:
         job_id = job.get('id')
         if job_id not in seen_ids:
             seen_ids.add(job_id)
             unique_jobs.append(job)
+    return unique_jobs
 
+def scrape_adzuna_country(country_code, max_pages=10, watermarks=None, checkpoint=None):
+    print(f"\n=== SCRAPING ADZUNA POUR {country_code.upper()} ===")
+    all_jobs = []
+
+    try:
+        for search_term in SEARCH_TERMS:
+            print(f"Recherche: '{search_term}'")
+            all_jobs.extend(scrape_adzuna_term(country_code, search_term, max_pages,
+                                               watermarks=watermarks, checkpoint=checkpoint))
+    except AdzunaAuthError:
+        print(f"    ERREUR 401: Cles API invalides")
+        return []
+
+    unique_jobs = deduplicate_jobs(all_jobs)
     print(f"TOTAL {country_code.upper()}: {len(unique_jobs)} emplois uniques")
     return unique_jobs
 
+def scrape_adzuna_concurrent(country_codes, max_pages=10, max_workers=MAX_CONCURRENT_REQUESTS,
+                             watermarks=None, checkpoint=None):
+    """
+    Collecte tous les couples (pays, terme) en parallele
+
+    Les pages d'un meme terme restent sequentielles (arret sur page vide
+    ou sur high-water mark), le debit global est borne par le token bucket
+    partage de l'hote Adzuna.
+
+    Returns:
+        dict code pays -> liste d'offres uniques
+    """
+    print(f"\n=== SCRAPING ADZUNA CONCURRENT ({len(country_codes)} pays x {len(SEARCH_TERMS)} termes) ===")
+    print(f"Debit max: {MAX_REQUESTS_PER_MINUTE} req/min, {max_workers} workers")
+
+    stop_event = threading.Event()
+    jobs_by_country = {code: [] for code in country_codes}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(scrape_adzuna_term, code, term, max_pages, stop_event, watermarks,
+                            checkpoint): code
+            for code in country_codes
+            for term in SEARCH_TERMS
+        }
+
+        for future in as_completed(futures):
+            code = futures[future]
+            try:
+                jobs_by_country[code].extend(future.result())
+            except AdzunaAuthError:
+                if not stop_event.is_set():
+                    print("ERREUR 401: Cles API invalides, arret de la collecte")
+                stop_event.set()
+            except Exception as e:
+                print(f"ERREUR {code}: {e}")
+
+    if stop_event.is_set():
+        return {}
+
+    for code in country_codes:
+        jobs_by_country[code] = deduplicate_jobs(jobs_by_country[code])
+        print(f"TOTAL {code.upper()}: {len(jobs_by_country[code])} emplois uniques")
+
+    return jobs_by_country
+
 def process_job(job_data, country_code):
     job_id = job_data.get('id')
     title = job_data.get('title', '').strip()
@@ -180,6 +432,11 @@ def save_data(jobs_data, country_code):
     return filename
 
 def main():
+    parser = argparse.ArgumentParser(description="Scraper Adzuna Jobs API")
+    parser.add_argument('--full', action='store_true',
+                        help="Ignore les high-water marks (collecte complete, marques recalculees)")
+    args = parser.parse_args()
+
     print("SCRAPER ADZUNA JOBS API")
     print("=" * 40)
     print("OBJECTIF: Collecter des offres d'emploi tech europeennes")
@@ -199,16 +456,28 @@ def main():
     all_jobs = []
     success_countries = []
 
+    watermarks = WatermarkStore()
+    if args.full:
+        print("Mode complet: high-water marks ignores")
+        watermarks.marks = {}
+
+    # Pages deja recues lors d'une execution interrompue
+    checkpoint = Checkpoint('adzuna_full' if args.full else 'adzuna')
+
+    jobs_by_country = scrape_adzuna_concurrent(list(COUNTRIES.values()), max_pages=5,
+                                               watermarks=watermarks, checkpoint=checkpoint)
+
     for country_name, country_code in COUNTRIES.items():
-        try:
-            jobs = scrape_adzuna_country(country_code, max_pages=5)
-            if jobs:
-                save_data(jobs, country_code)
-                all_jobs.extend(jobs)
-                success_countries.append(country_name)
-        except Exception as e:
-            print(f"ERREUR {country_name}: {e}")
-            continue
+        jobs = jobs_by_country.get(country_code)
+        if jobs:
+            save_data(jobs, country_code)
+            all_jobs.extend(jobs)
+            success_countries.append(country_name)
+
+    # Les marques n'avancent qu'une fois les nouvelles offres ecrites
+    if jobs_by_country:
+        watermarks.commit()
+        checkpoint.clear()
 
     if all_jobs:
         timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M')
@@ -237,9 +506,13 @@ def main():
             print(f"\nTop competences:")
             for skill, count in top_skills:
                 print(f"  {skill}: {count} mentions")
+    elif jobs_by_country:
+        print("\nAUCUNE NOUVELLE OFFRE depuis la derniere collecte")
     else:
         print("\nAUCUNE DONNEE COLLECTEE")
         print("Verifiez vos cles API et votre connexion")
 
+    get_client().print_stats()
+
 if __name__ == "__main__":
     main()
@@ -5,7 +5,8 @@ SCRAPER 3: GITHUB TRENDING REPOSITORIES
 QUE FAIT CE SCRAPER:
 - Collecte les repositories GitHub tendance via l'API REST GitHub
 - Identifie les langages de programmation populaires
-- Analyse la localisation des proprietaires de projets
+- Analyse la localisation des proprietaires de projets (GraphQL par lots,
+  store local proprietaire -> localisation avec TTL de rafraichissement)
 - Mesure la popularite des technologies (stars, forks)
 
 DONNEES COLLECTEES:
@@ -22,12 +23,19 @@ SORTIE: fichiers CSV des repos tendance + statistiques langages
 
 import os
 import sys
-import requests
+import json
+import threading
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
-import time
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config import (GITHUB_OWNER_STORE, GITHUB_OWNER_TTL_DAYS, GITHUB_GRAPHQL_BATCH_SIZE,
+                    GITHUB_MAX_WORKERS, GITHUB_REPOS_PER_LANGUAGE, NON_INTERACTIVE)
+from http_session import RETRYABLE_STATUSES, get_client
+from checkpoint import Checkpoint
+from rate_limiter import parse_retry_after
 
 # Configuration encodage pour Windows
 if sys.platform == "win32":
@@ -39,7 +47,7 @@ if sys.platform == "win32":
 GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
 
 # Si pas de token, demander (optionnel mais recommande)
-if not GITHUB_TOKEN:
+if not GITHUB_TOKEN and not NON_INTERACTIVE:
     print("Token GitHub non trouve dans .env")
     token_input = input("GITHUB_TOKEN (optionnel, Entree pour ignorer): ").strip()
     if token_input:
@@ -75,23 +83,125 @@ def get_github_headers():
     
     return headers
 
-def make_github_request(url, params=None):
-    """Fait une requete a l'API GitHub avec gestion des erreurs"""
-    
+# Nombre max d'attentes de fenetre de quota pour une meme requete
+MAX_RATE_LIMIT_WAITS = 3
+
+# L'API de recherche plafonne a 100 resultats par page et 1000 au total
+SEARCH_PAGE_SIZE = 100
+SEARCH_MAX_RESULTS = 1000
+
+class GitHubRateBudget:
+    """
+    Budget de quota partage entre threads
+
+    Alimente par les en-tetes X-RateLimit-* de chaque reponse, par ressource
+    (core, search, graphql). Quand une ressource est epuisee, seuls les
+    threads qui en ont besoin attendent sa remise a zero.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.resources = {}
+
+    def acquire(self, resource):
+        """Reserve une requete sur `resource`, attend la remise a zero si epuisee"""
+        with self.condition:
+            while True:
+                state = self.resources.get(resource)
+                if state is None or state['remaining'] > 0:
+                    if state is not None:
+                        state['remaining'] -= 1
+                    return
+
+                wait_time = state['reset'] - datetime.now().timestamp()
+                if wait_time <= 0:
+                    # Nouvelle fenetre: le prochain en-tete donnera le vrai solde
+                    del self.resources[resource]
+                    continue
+
+                print(f"Quota GitHub '{resource}' epuise, reprise dans {wait_time:.0f}s")
+                self.condition.wait(timeout=wait_time + 1)
+
+    def update(self, headers):
+        """Met a jour le solde depuis les en-tetes d'une reponse"""
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        if remaining is None or reset is None:
+            return
+
+        resource = headers.get('X-RateLimit-Resource', 'core')
+        with self.condition:
+            self.resources[resource] = {'remaining': int(remaining), 'reset': int(reset)}
+            self.condition.notify_all()
+
+    def block(self, resource, seconds):
+        """Limite secondaire (Retry-After): suspend la ressource"""
+        with self.condition:
+            self.resources[resource] = {
+                'remaining': 0,
+                'reset': int(datetime.now().timestamp() + max(seconds, 1))
+            }
+
+def github_resource(url):
+    """Ressource de quota GitHub correspondant a une URL"""
+    if '/search/' in url:
+        return 'search'
+    if url.endswith('/graphql'):
+        return 'graphql'
+    return 'core'
+
+RATE_BUDGET = GitHubRateBudget()
+
+# Le client HTTP ne rejoue pas les 429: le quota est gere par ressource
+# (RATE_BUDGET), une pause de l'hote bloquerait search, core et graphql ensemble
+GITHUB_RETRY_STATUSES = RETRYABLE_STATUSES - {429}
+
+def send_github_request(method, url, params=None, json_body=None, cache_ttl=None):
+    """
+    Envoie une requete GitHub sous le budget de quota partage
+
+    Sur 403/429 de quota, la ressource est marquee epuisee et la requete
+    rejouee apres sa remise a zero (sans bloquer les autres ressources).
+    """
+    resource = github_resource(url)
     headers = get_github_headers()
+
+    for attempt in range(MAX_RATE_LIMIT_WAITS + 1):
+        RATE_BUDGET.acquire(resource)
+
+        if method == 'POST':
+            response = get_client().post(url, json=json_body, headers=headers, timeout=30,
+                                         retry_statuses=GITHUB_RETRY_STATUSES)
+        else:
+            response = get_client().get(url, headers=headers, params=params, timeout=30,
+                                        cache_ttl=cache_ttl, retry_statuses=GITHUB_RETRY_STATUSES)
+
+        if getattr(response, 'from_cache', False):
+            return response
+
+        RATE_BUDGET.update(response.headers)
+
+        if response.status_code in (403, 429):
+            if response.headers.get('Retry-After'):
+                RATE_BUDGET.block(resource, parse_retry_after(response.headers['Retry-After']))
+                continue
+            if response.headers.get('X-RateLimit-Remaining') == '0':
+                # update() a deja enregistre le solde nul et la remise a zero
+                continue
+            if response.status_code == 429:
+                # Limite secondaire sans en-tete: attente par defaut sur cette ressource
+                RATE_BUDGET.block(resource, parse_retry_after(None))
+                continue
+
+        return response
+
+    return response
+
+def make_github_request(url, params=None, cache_ttl=None):
+    """Fait une requete a l'API GitHub avec gestion des erreurs"""
     
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=30)
-        
-        # Gestion rate limiting
-        if response.status_code == 403:
-            rate_limit_remaining = response.headers.get('X-RateLimit-Remaining', '0')
-            if rate_limit_remaining == '0':
-                reset_time = int(response.headers.get('X-RateLimit-Reset', 0))
-                wait_time = max(reset_time - int(datetime.now().timestamp()), 60)
-                print(f"Rate limit atteint, attente {wait_time}s...")
-                time.sleep(wait_time)
-                return make_github_request(url, params)
+        response = send_github_request('GET', url, params=params, cache_ttl=cache_ttl)
         
         if response.status_code == 200:
             return response.json()
@@ -103,14 +213,11 @@ def make_github_request(url, params=None):
         print(f"Exception requete GitHub: {e}")
         return None
 
-def search_trending_repositories(language=None, days=30, max_repos=100):
+def fetch_trending_items(language=None, days=30, max_repos=100):
     """
-    Recherche les repositories tendance
-    
-    Args:
-        language: Langage a filtrer (optionnel)
-        days: Periode en jours pour definir "tendance"
-        max_repos: Nombre max de repos a recuperer
+    Recupere les repositories bruts de la recherche, page par page
+
+    Au-dela de 100 repos, plusieurs pages sont demandees (plafond API: 1000).
     """
     
     print(f"\nRecherche repos tendance: {language or 'tous langages'}")
@@ -130,20 +237,70 @@ def search_trending_repositories(language=None, days=30, max_repos=100):
     query = ' '.join(query_parts)
     
     url = f"{GITHUB_API_BASE}/search/repositories"
-    params = {
-        'q': query,
-        'sort': 'stars',
-        'order': 'desc',
-        'per_page': min(100, max_repos)
-    }
+    max_repos = min(max_repos, SEARCH_MAX_RESULTS)
+    per_page = min(SEARCH_PAGE_SIZE, max_repos)
+    repositories = []
+    page = 1
+    
+    while len(repositories) < max_repos:
+        params = {
+            'q': query,
+            'sort': 'stars',
+            'order': 'desc',
+            'per_page': per_page,
+            'page': page
+        }
+        
+        data = make_github_request(url, params)
+        if not data:
+            break
+        
+        items = data.get('items', [])
+        repositories.extend(items)
+        
+        # Derniere page atteinte
+        if len(items) < per_page or len(repositories) >= data.get('total_count', 0):
+            break
+        page += 1
+    
+    repositories = repositories[:max_repos]
+    print(f"  {language or 'tous langages'}: {len(repositories)} repositories ({page} page(s))")
+    return repositories
+
+def fetch_trending_items_resumable(language=None, days=30, max_repos=100, checkpoint=None):
+    """
+    fetch_trending_items avec reprise sur checkpoint
+
+    Les repos bruts d'une recherche terminee sont relus du checkpoint au
+    lieu d'etre redemandes. Une recherche vide (erreur ou quota) n'est pas
+    marquee terminee: elle sera retentee.
+    """
+    unit = f"search|{language or 'all'}|{days}|{max_repos}"
+    if checkpoint is not None and checkpoint.is_done(unit):
+        items = checkpoint.load(unit)
+        print(f"  {language or 'tous langages'}: {len(items)} repositories (checkpoint)")
+        return items
+    
+    items = fetch_trending_items(language, days, max_repos)
+    if checkpoint is not None and items:
+        checkpoint.save(unit, items)
+    return items
+
+def search_trending_repositories(language=None, days=30, max_repos=100, checkpoint=None):
+    """
+    Recherche les repositories tendance
     
-    data = make_github_request(url, params)
+    Args:
+        language: Langage a filtrer (optionnel)
+        days: Periode en jours pour definir "tendance"
+        max_repos: Nombre max de repos a recuperer (>100: plusieurs pages)
+        checkpoint: Checkpoint de reprise (optionnel)
+    """
     
-    if not data:
-        return []
+    repositories = fetch_trending_items_resumable(language, days, max_repos, checkpoint)
     
-    repositories = data.get('items', [])
-    print(f"  Trouve: {len(repositories)} repositories")
+    # Localisations des proprietaires: une resolution groupee pour tout le lot
+    OWNER_STORE.resolve(repo.get('owner', {}).get('login', '') for repo in repositories)
     
     # Traiter chaque repository
     processed_repos = []
@@ -152,9 +309,6 @@ def search_trending_repositories(language=None, days=30, max_repos=100):
         processed_repo = process_repository(repo)
         if processed_repo:
             processed_repos.append(processed_repo)
-            
-        # Petite pause pour eviter le rate limiting
-        time.sleep(0.1)
     
     return processed_repos
 
@@ -185,7 +339,7 @@ def process_repository(repo_data):
     owner_login = owner.get('login', '') if owner else ''
     owner_type = owner.get('type', '') if owner else ''  # User ou Organization
     
-    # Recuperer la localisation du proprietaire (requete supplementaire)
+    # Localisation du proprietaire (store local, resolue par lots en amont)
     owner_location, owner_country = get_owner_location(owner_login)
     
     # Topics/tags
@@ -224,6 +378,141 @@ def process_repository(repo_data):
         'collected_at': datetime.now().isoformat()
     }
 
+class OwnerLocationStore:
+    """
+    Store persistant login -> (localisation, code pays)
+
+    - Deduplique les proprietaires sur toute l'execution
+    - Resout les manquants par lots via GraphQL (50 logins par requete)
+    - Rafraichit les entrees plus vieilles que GITHUB_OWNER_TTL_DAYS
+    - Un login dont la resolution a echoue n'est plus interroge pendant
+      l'execution (pas de requete par repo si l'API GraphQL est indisponible)
+    """
+
+    def __init__(self, path=GITHUB_OWNER_STORE, ttl_days=GITHUB_OWNER_TTL_DAYS):
+        self.path = path
+        self.ttl_seconds = ttl_days * 24 * 3600
+        self.lock = threading.Lock()
+        self.owners = {}
+        # Echecs de resolution de cette execution (non persistes: reessayes au prochain run)
+        self.failed = set()
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.owners = json.load(f)
+            print(f"Store proprietaires: {len(self.owners)} logins connus")
+        except Exception as e:
+            print(f"Store proprietaires illisible ({e}), reconstruction")
+            self.owners = {}
+
+    def save(self):
+        """Ecrit le store s'il a change depuis la derniere sauvegarde"""
+        with self.lock:
+            if not self.dirty:
+                return
+            snapshot = dict(self.owners)
+            self.dirty = False
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def is_fresh(self, login):
+        entry = self.owners.get(login)
+        return entry is not None and datetime.now().timestamp() - entry['fetched_at'] < self.ttl_seconds
+
+    def get(self, login):
+        entry = self.owners.get(login)
+        if entry is None:
+            return None
+        return entry['location'], entry['country']
+
+    def set(self, login, location):
+        location = location or ''
+        with self.lock:
+            self.owners[login] = {
+                'location': location,
+                'country': detect_country_from_location(location),
+                'fetched_at': datetime.now().timestamp()
+            }
+            self.dirty = True
+
+    def resolve(self, logins, persist=True):
+        """
+        Resout en lots les logins absents ou perimes
+
+        Args:
+            logins: logins des proprietaires
+            persist: ecrire le store ensuite (sinon a la prochaine sauvegarde)
+        """
+        with self.lock:
+            missing = sorted({login for login in logins
+                              if login and login not in self.failed and not self.is_fresh(login)})
+
+        if not missing:
+            return 0
+
+        print(f"  Resolution localisation: {len(missing)} proprietaires a interroger")
+
+        if GITHUB_TOKEN:
+            # L'API GraphQL exige un token
+            for i in range(0, len(missing), GITHUB_GRAPHQL_BATCH_SIZE):
+                self._resolve_graphql(missing[i:i + GITHUB_GRAPHQL_BATCH_SIZE])
+        else:
+            for login in missing:
+                user_data = make_github_request(f"{GITHUB_API_BASE}/users/{login}")
+                if user_data is not None:
+                    self.set(login, user_data.get('location'))
+                else:
+                    with self.lock:
+                        self.failed.add(login)
+
+        if persist:
+            self.save()
+        return len(missing)
+
+    def _resolve_graphql(self, batch):
+        """Une requete GraphQL avec un alias par login"""
+        fields = ' '.join(
+            f'u{i}: repositoryOwner(login: {json.dumps(login)}) '
+            f'{{ login ... on User {{ location }} ... on Organization {{ location }} }}'
+            for i, login in enumerate(batch)
+        )
+        data = make_github_graphql_request(f"query {{ {fields} }}")
+        if data is None:
+            print(f"  Resolution GraphQL echouee: {len(batch)} proprietaires ignores pour cette execution")
+            with self.lock:
+                self.failed.update(batch)
+            return
+
+        for i, login in enumerate(batch):
+            owner = data.get(f'u{i}')
+            # Proprietaire supprime/renomme: memorise vide pour ne pas reinterroger
+            self.set(login, owner.get('location') if owner else '')
+
+def make_github_graphql_request(query):
+    """Execute une requete GraphQL GitHub, retourne le champ `data` ou None"""
+    try:
+        response = send_github_request('POST', f"{GITHUB_API_BASE}/graphql",
+                                       json_body={'query': query})
+    except Exception as e:
+        print(f"Exception requete GraphQL GitHub: {e}")
+        return None
+
+    if response.status_code != 200:
+        print(f"Erreur GraphQL GitHub {response.status_code}: {response.text[:200]}")
+        return None
+
+    payload = response.json()
+    # Les logins introuvables remontent en `errors` avec des donnees partielles
+    return payload.get('data') or None
+
 def get_owner_location(username):
     """
     Recupere la localisation d'un utilisateur GitHub
@@ -235,21 +524,13 @@ def get_owner_location(username):
     if not username:
         return '', ''
     
-    url = f"{GITHUB_API_BASE}/users/{username}"
-    user_data = make_github_request(url)
-    
-    if not user_data:
-        return '', ''
-    
-    location = user_data.get('location', '')
-    
-    if not location:
-        return '', ''
-    
-    # Detecter le pays depuis la localisation
-    country_code = detect_country_from_location(location)
+    cached = OWNER_STORE.get(username)
+    if cached is None or not OWNER_STORE.is_fresh(username):
+        # Login hors des lots deja resolus: persiste avec la sauvegarde suivante
+        OWNER_STORE.resolve([username], persist=False)
+        cached = OWNER_STORE.get(username)
     
-    return location, country_code
+    return cached if cached is not None else ('', '')
 
 def detect_country_from_location(location_str):
     """Detecte le code pays depuis une string de localisation"""
@@ -266,18 +547,51 @@ def detect_country_from_location(location_str):
     
     return ''
 
-def analyze_language_popularity():
-    """Analyse la popularite des langages de programmation"""
+# Store partage par toutes les recherches de l'execution
+OWNER_STORE = OwnerLocationStore()
+
+def analyze_language_popularity(days=60, repos_per_language=GITHUB_REPOS_PER_LANGUAGE,
+                                max_workers=GITHUB_MAX_WORKERS, checkpoint=None):
+    """
+    Analyse la popularite des langages de programmation
+
+    Les recherches par langage tournent en parallele sous le budget de quota
+    partage, puis les proprietaires de tous les langages sont resolus en un lot.
+    Avec `checkpoint`, chaque langage termine est conserve pour la reprise.
+    """
     
     print(f"\n=== ANALYSE POPULARITE LANGAGES ===")
+    print(f"{len(PROGRAMMING_LANGUAGES)} langages, {repos_per_language} repos/langage, {max_workers} workers")
+    
+    items_by_language = {}
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(fetch_trending_items_resumable, language, days, repos_per_language,
+                            checkpoint): language
+            for language in PROGRAMMING_LANGUAGES
+        }
+        for future in as_completed(futures):
+            language = futures[future]
+            try:
+                items_by_language[language] = future.result()
+            except Exception as e:
+                print(f"ERREUR {language}: {e}")
+                items_by_language[language] = []
+    
+    # Une seule resolution des proprietaires pour tous les langages
+    OWNER_STORE.resolve(
+        repo.get('owner', {}).get('login', '')
+        for items in items_by_language.values()
+        for repo in items
+    )
     
     language_stats = []
     
     for language in PROGRAMMING_LANGUAGES:
         print(f"Analyse: {language}")
         
-        # Rechercher repos tendance pour ce langage
-        repos = search_trending_repositories(language=language, days=60, max_repos=30)
+        repos = [process_repository(repo) for repo in items_by_language.get(language, [])]
         
         if repos:
             # Calculer statistiques
@@ -310,9 +624,6 @@ def analyze_language_popularity():
             print(f"  Repos: {len(repos)}, Stars moy: {avg_stars:.1f}, EU: {european_count}")
         else:
             print(f"  Aucun repo trouve")
-        
-        # Pause entre langages
-        time.sleep(2)
     
     return language_stats
 
@@ -362,15 +673,21 @@ def main():
     else:
         print("Pas de token GitHub (limite: 60 req/h)")
     
+    # Recherches deja terminees lors d'une execution interrompue
+    checkpoint = Checkpoint('github')
+    
     # 1. Collecte repositories tendance generaux
     print(f"\n=== COLLECTE REPOS TENDANCE GENERAUX ===")
-    general_repos = search_trending_repositories(days=30, max_repos=150)
+    general_repos = search_trending_repositories(days=30, max_repos=150, checkpoint=checkpoint)
     
     # 2. Analyse par langage
-    language_stats = analyze_language_popularity()
+    language_stats = analyze_language_popularity(checkpoint=checkpoint)
     
     # 3. Sauvegarde
+    OWNER_STORE.save()
     main_file = save_github_data(general_repos, language_stats)
+    if main_file:
+        checkpoint.clear()
     
     # 4. Statistiques finales
     print(f"\n=== RESUME GITHUB ===")
@@ -414,5 +731,7 @@ def main():
         print(f"\nATTENTION: Peu ou pas de donnees collectees")
         print("Possible cause: Rate limiting GitHub ou probleme reseau")
 
+    get_client().print_stats()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,10 +1,12 @@
 import os
 import sys
-import requests
 import pandas as pd
 from datetime import datetime
 import random
 
+from http_session import get_client
+from skill_matcher import SkillMatcher, extract_skills
+
 # Configuration encodage pour Windows
 if sys.platform == "win32":
     import codecs
@@ -54,6 +56,9 @@ SKILLS_BY_ROLE = {
     'Machine Learning Engineer': ['Python', 'TensorFlow', 'PyTorch', 'MLflow', 'Docker']
 }
 
+# Rôles reconnus dans les intitulés (le premier rôle du dictionnaire l'emporte)
+ROLE_MATCHER = SkillMatcher({role: role for role in SKILLS_BY_ROLE})
+
 def download_glassdoor_dataset(dataset_name, url):
     """
     Télécharge un dataset Glassdoor
@@ -62,7 +67,7 @@ def download_glassdoor_dataset(dataset_name, url):
     print(f"URL: {url}")
     
     try:
-        response = requests.get(url, timeout=60)
+        response = get_client().get(url, timeout=60)
         response.raise_for_status()
         
         print(f"Téléchargement réussi: {len(response.content):,} bytes")
@@ -177,6 +182,7 @@ def process_glassdoor_data(df, dataset_name):
     company_cols = [col for col in df.columns if any(k in col.lower() for k in ['company', 'employer'])]
     location_cols = [col for col in df.columns if any(k in col.lower() for k in ['location', 'city', 'country'])]
     salary_cols = [col for col in df.columns if any(k in col.lower() for k in ['salary', 'pay', 'compensation'])]
+    description_cols = [col for col in df.columns if 'description' in col.lower()]
     
     print(f"Colonnes détectées - Job: {job_cols}, Company: {company_cols}, Location: {location_cols}, Salary: {salary_cols}")
     
@@ -218,12 +224,16 @@ def process_glassdoor_data(df, dataset_name):
                 salary_raw = row[salary_cols[0]]
                 salary_min, salary_max, currency = extract_salary_info(salary_raw)
             
-            # Skills basées sur le job title
+            # Skills extraites de la description si disponible
             skills = []
-            for role, role_skills in SKILLS_BY_ROLE.items():
-                if role.lower() in str(job_title).lower():
-                    skills = role_skills[:3]  # Top 3 skills
-                    break
+            if description_cols:
+                skills = extract_skills(row[description_cols[0]])
+            
+            # Sinon basées sur le job title
+            if not skills:
+                roles = ROLE_MATCHER.find(job_title)
+                if roles:
+                    skills = SKILLS_BY_ROLE[roles[0]][:3]  # Top 3 skills
             
             if not skills:
                 skills = ['Programming', 'Problem Solving', 'Teamwork']
@@ -418,5 +428,7 @@ def main():
     else:
         print(f"\nECHEC: Aucune donnée collectée")
 
+    get_client().print_stats()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
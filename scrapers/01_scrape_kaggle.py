@@ -1,10 +1,11 @@
 import os
 import sys
-import requests
 import pandas as pd
 from datetime import datetime
 import re
 
+from http_session import get_client
+
 # Configuration encodage pour Windows
 if sys.platform == "win32":
     import codecs
@@ -34,7 +35,7 @@ def download_kaggle_survey():
     
     try:
         print("\nTéléchargement en cours...")
-        response = requests.get(KAGGLE_SURVEY_URL, timeout=120)
+        response = get_client().get(KAGGLE_SURVEY_URL, timeout=120)
         response.raise_for_status()
         
         print(f"Téléchargement réussi: {len(response.content):,} bytes")
@@ -251,6 +252,7 @@ def main():
     print(f"\nSUCCES KAGGLE!")
     print(f"Fichier généré: {filename}")
     print(f"Données européennes collectées: {len(processed_data)}")
+    get_client().print_stats()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -23,12 +23,17 @@ AVANTAGE: Pas d'API necessaire, donnees tres fiables
 
 import os
 import sys
-import requests
+import time
+import argparse
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
 import pandas as pd
 import zipfile
 from datetime import datetime
 from typing import List, Dict
-import io
+
+from http_session import get_client
 
 # Configuration encodage pour Windows
 if sys.platform == "win32":
@@ -46,21 +51,36 @@ TARGET_COUNTRIES = {
     'Italy': 'IT'
 }
 
-# URLs des enquetes Stack Overflow (plusieurs annees pour robustesse)
-SURVEY_URLS = {
-    2023: "https://info.stackoverflowsolutions.com/rs/719-EMH-566/images/stack-overflow-developer-survey-2023.zip",
-    2022: "https://info.stackoverflowsolutions.com/rs/719-EMH-566/images/stack-overflow-developer-survey-2022.zip"
+# URLs des enquetes Stack Overflow (meme motif pour chaque annee publiee)
+SURVEY_URL_TEMPLATE = "https://info.stackoverflowsolutions.com/rs/719-EMH-566/images/stack-overflow-developer-survey-{year}.zip"
+SURVEY_YEARS = range(2017, 2025)
+SURVEY_URLS = {year: SURVEY_URL_TEMPLATE.format(year=year) for year in SURVEY_YEARS}
+
+SURVEY_DIR = '../data/raw/stackoverflow'
+
+# Taille des blocs lus dans le CSV: borne la memoire, pas la taille de l'enquete
+SURVEY_CHUNK_SIZE = 20000
+
+CURRENCY_MAP = {
+    'FR': 'EUR',
+    'DE': 'EUR',
+    'NL': 'EUR',
+    'IT': 'EUR',
+    'GB': 'GBP'
 }
 
 def download_stackoverflow_survey(year=2023):
     """
-    Telecharge l'enquete Stack Overflow pour une annee donnee
+    Telecharge l'archive de l'enquete Stack Overflow pour une annee donnee
+    
+    L'archive est ecrite sur disque au fil du telechargement et conservee:
+    les enquetes sont figees, un second passage ne retelecharge rien.
     
     Args:
         year: Annee de l'enquete (2023, 2022)
     
     Returns:
-        Chemin vers le fichier CSV extrait ou None si echec
+        Chemin vers l'archive ZIP ou None si echec
     """
     
     print(f"\n=== TELECHARGEMENT STACK OVERFLOW SURVEY {year} ===")
@@ -70,72 +90,111 @@ def download_stackoverflow_survey(year=2023):
         print(f"ERREUR: URL non disponible pour {year}")
         return None
     
+    zip_path = f'{SURVEY_DIR}/survey_{year}.zip'
+    if os.path.exists(zip_path) and zipfile.is_zipfile(zip_path):
+        print(f"Archive deja presente: {zip_path}")
+        return zip_path
+    
     try:
         # Creer le dossier de destination
-        os.makedirs('../data/raw/stackoverflow', exist_ok=True)
+        os.makedirs(SURVEY_DIR, exist_ok=True)
         
         print("Telechargement en cours...")
-        response = requests.get(url, stream=True, timeout=120)
+        # Pas de cache HTTP: l'archive est deja conservee ici
+        response = get_client().get(url, stream=True, timeout=120, cache=False)
         response.raise_for_status()
         
-        # Sauvegarder le ZIP en memoire
-        zip_content = io.BytesIO()
+        tmp_path = f'{zip_path}.part'
         total_size = 0
+        next_report = 1024 * 1024
+        
+        with open(tmp_path, 'wb') as target:
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                if chunk:
+                    target.write(chunk)
+                    total_size += len(chunk)
+                    
+                    # Afficher progression tous les MB
+                    if total_size >= next_report:
+                        print(f"  Telecharge: {total_size // (1024*1024)} MB")
+                        next_report += 1024 * 1024
+        
+        if not zipfile.is_zipfile(tmp_path):
+            print("ERREUR: Le fichier telecharge n'est pas une archive ZIP")
+            os.remove(tmp_path)
+            return None
         
-        for chunk in response.iter_content(chunk_size=8192):
-            if chunk:
-                zip_content.write(chunk)
-                total_size += len(chunk)
-                
-                # Afficher progression tous les MB
-                if total_size % (1024*1024) == 0:
-                    print(f"  Telecharge: {total_size // (1024*1024)} MB")
-        
-        print(f"Telechargement termine: {total_size} bytes")
-        
-        # Extraire le ZIP
-        zip_content.seek(0)
-        
-        with zipfile.ZipFile(zip_content, 'r') as zip_ref:
-            # Lister les fichiers dans le ZIP
-            file_list = zip_ref.namelist()
-            print(f"Fichiers dans l'archive: {len(file_list)}")
-            
-            # Chercher le fichier CSV principal (le plus gros)
-            csv_files = [f for f in file_list if f.endswith('.csv')]
-            
-            if not csv_files:
-                print("ERREUR: Aucun fichier CSV trouve dans l'archive")
-                return None
-            
-            # Prendre le fichier CSV le plus gros (generalement survey_results_public.csv)
-            main_csv = None
-            max_size = 0
-            
-            for csv_file in csv_files:
-                file_info = zip_ref.getinfo(csv_file)
-                if file_info.file_size > max_size:
-                    max_size = file_info.file_size
-                    main_csv = csv_file
-            
-            if main_csv:
-                print(f"Fichier principal: {main_csv} ({max_size} bytes)")
-                
-                # Extraire le fichier CSV
-                extract_path = f'../data/raw/stackoverflow/survey_{year}.csv'
-                
-                with zip_ref.open(main_csv) as source, open(extract_path, 'wb') as target:
-                    target.write(source.read())
-                
-                print(f"SUCCES: Fichier extrait vers {extract_path}")
-                return extract_path
-            
-        return None
+        os.replace(tmp_path, zip_path)
+        print(f"Telechargement termine: {total_size} bytes -> {zip_path}")
+        return zip_path
         
     except Exception as e:
         print(f"ERREUR telechargement: {e}")
         return None
 
+def find_main_csv(zip_ref):
+    """Fichier CSV principal de l'archive (le plus gros), ou (None, 0)"""
+    
+    csv_files = [f for f in zip_ref.namelist() if f.endswith('.csv')]
+    if not csv_files:
+        return None, 0
+    
+    # Generalement survey_results_public.csv
+    main_csv = max(csv_files, key=lambda name: zip_ref.getinfo(name).file_size)
+    return main_csv, zip_ref.getinfo(main_csv).file_size
+
+def extract_survey_csv(zip_path, year):
+    """
+    Extrait le CSV principal de l'archive sur disque
+    
+    Seulement pour le chargement complet (process_stackoverflow_data);
+    le traitement par blocs lit directement dans l'archive.
+    """
+    
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        main_csv, size = find_main_csv(zip_ref)
+        if not main_csv:
+            print("ERREUR: Aucun fichier CSV trouve dans l'archive")
+            return None
+        
+        print(f"Fichier principal: {main_csv} ({size} bytes)")
+        extract_path = f'{SURVEY_DIR}/survey_{year}.csv'
+        
+        with zip_ref.open(main_csv) as source, open(extract_path, 'wb') as target:
+            while True:
+                block = source.read(1024 * 1024)
+                if not block:
+                    break
+                target.write(block)
+        
+        print(f"SUCCES: Fichier extrait vers {extract_path}")
+        return extract_path
+
+def detect_column_mapping(columns):
+    """Identifie les colonnes utiles de l'enquete (les noms varient selon l'annee)"""
+    
+    column_mapping = {}
+    
+    for col in columns:
+        col_lower = col.lower()
+        if 'country' in col_lower:
+            column_mapping['country'] = col
+        elif any(term in col_lower for term in ['compensation', 'salary', 'convertedcomp']):
+            column_mapping['salary'] = col
+        elif any(term in col_lower for term in ['yearscode', 'years_code', 'experience']):
+            column_mapping['experience'] = col
+        elif any(term in col_lower for term in ['language', 'tech']):
+            if 'worked' in col_lower or 'have' in col_lower:
+                column_mapping['languages'] = col
+        elif any(term in col_lower for term in ['devtype', 'developer']):
+            column_mapping['dev_type'] = col
+        elif any(term in col_lower for term in ['edlevel', 'education']):
+            column_mapping['education'] = col
+        elif any(term in col_lower for term in ['orgsize', 'company']):
+            column_mapping['company_size'] = col
+    
+    return column_mapping
+
 def process_stackoverflow_data(csv_path):
     """
     Traite les donnees Stack Overflow
@@ -166,26 +225,7 @@ def process_stackoverflow_data(csv_path):
         print(f"Premieres colonnes: {columns[:10]}")
         
         # Mapping des colonnes (peut varier selon l'annee)
-        column_mapping = {}
-        
-        # Chercher les colonnes importantes
-        for col in columns:
-            col_lower = col.lower()
-            if 'country' in col_lower:
-                column_mapping['country'] = col
-            elif any(term in col_lower for term in ['compensation', 'salary', 'convertedcomp']):
-                column_mapping['salary'] = col
-            elif any(term in col_lower for term in ['yearscode', 'years_code', 'experience']):
-                column_mapping['experience'] = col
-            elif any(term in col_lower for term in ['language', 'tech']):
-                if 'worked' in col_lower or 'have' in col_lower:
-                    column_mapping['languages'] = col
-            elif any(term in col_lower for term in ['devtype', 'developer']):
-                column_mapping['dev_type'] = col
-            elif any(term in col_lower for term in ['edlevel', 'education']):
-                column_mapping['education'] = col
-            elif any(term in col_lower for term in ['orgsize', 'company']):
-                column_mapping['company_size'] = col
+        column_mapping = detect_column_mapping(columns)
         
         print(f"Colonnes identifiees: {column_mapping}")
         
@@ -207,13 +247,8 @@ def process_stackoverflow_data(csv_path):
             print(f"Pays disponibles: {df[country_col].value_counts().head(10)}")
             return []
         
-        # Traiter les donnees
-        processed_data = []
-        
-        for _, row in df_europe.iterrows():
-            record = process_survey_response(row, column_mapping)
-            if record:
-                processed_data.append(record)
+        # Traiter les donnees (colonne par colonne)
+        processed_data = transform_survey_responses(df_europe, column_mapping).to_dict('records')
         
         print(f"Enregistrements traites: {len(processed_data)}")
         return processed_data
@@ -222,6 +257,143 @@ def process_stackoverflow_data(csv_path):
         print(f"ERREUR traitement: {e}")
         return []
 
+def stream_stackoverflow_data(zip_path, chunksize=SURVEY_CHUNK_SIZE, raise_errors=False):
+    """
+    Traite l'enquete par blocs, directement depuis l'archive ZIP
+    
+    Seules les colonnes identifiees sont lues, chaque bloc est filtre sur
+    les pays cibles puis transforme colonne par colonne: la memoire depend
+    de `chunksize` et du nombre de reponses europeennes, pas de l'enquete.
+    
+    Args:
+        zip_path: Chemin vers l'archive ZIP de l'enquete
+        chunksize: Nombre de lignes lues par bloc
+        raise_errors: Propage les erreurs de lecture/transformation au lieu
+            de renvoyer une liste vide (traitement multi-annees)
+    
+    Returns:
+        Liste des enregistrements traites
+    """
+    
+    print(f"\n=== TRAITEMENT DONNEES STACK OVERFLOW (PAR BLOCS) ===")
+    
+    try:
+        try:
+            return stream_survey_records(zip_path, chunksize, encoding='utf-8')
+        except UnicodeDecodeError:
+            print("Tentative avec encodage latin-1...")
+            return stream_survey_records(zip_path, chunksize, encoding='latin-1')
+    except Exception as e:
+        if raise_errors:
+            raise
+        print(f"ERREUR traitement: {e}")
+        return []
+
+def stream_survey_records(zip_path, chunksize, encoding):
+    """Lecture par blocs pour un encodage donne (voir stream_stackoverflow_data)"""
+    
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        main_csv, size = find_main_csv(zip_ref)
+        if not main_csv:
+            raise ValueError("Aucun fichier CSV trouve dans l'archive")
+        
+        print(f"Fichier principal: {main_csv} ({size} bytes)")
+        
+        # En-tete seul pour identifier les colonnes
+        with zip_ref.open(main_csv) as source:
+            columns = pd.read_csv(source, encoding=encoding, nrows=0).columns.tolist()
+        
+        column_mapping = detect_column_mapping(columns)
+        print(f"Colonnes identifiees: {column_mapping}")
+        
+        if 'country' not in column_mapping:
+            raise ValueError("Colonne pays non trouvee")
+        
+        country_col = column_mapping['country']
+        usecols = list(dict.fromkeys(column_mapping.values()))
+        
+        # Colonnes texte lues telles quelles: l'inference de type par bloc
+        # transformerait '14' en 14.0 selon le contenu du bloc
+        dtype = {col: str for col in usecols if col != column_mapping.get('salary')}
+        
+        total_rows = 0
+        frames = []
+        
+        with zip_ref.open(main_csv) as source:
+            reader = pd.read_csv(source, encoding=encoding, usecols=usecols,
+                                 dtype=dtype, chunksize=chunksize)
+            for chunk in reader:
+                total_rows += len(chunk)
+                chunk = chunk[chunk[country_col].isin(TARGET_COUNTRIES.keys())]
+                if len(chunk) > 0:
+                    frames.append(transform_survey_responses(chunk, column_mapping))
+    
+    print(f"Donnees lues: {total_rows} reponses, {len(usecols)}/{len(columns)} colonnes")
+    
+    if not frames:
+        print("ATTENTION: Aucune reponse europeenne trouvee")
+        return []
+    
+    processed_data = pd.concat(frames).to_dict('records')
+    print(f"Reponses europeennes: {len(processed_data)}")
+    print(f"Enregistrements traites: {len(processed_data)}")
+    return processed_data
+
+def transform_survey_responses(df, column_mapping):
+    """
+    Equivalent colonne de process_survey_response
+    
+    Produit les memes enregistrements que l'appel ligne a ligne (a
+    l'horodatage pres) pour des reponses deja filtrees sur les pays cibles.
+    
+    Args:
+        df: Reponses de l'enquete (colonnes d'origine)
+        column_mapping: Resultat de detect_column_mapping
+    
+    Returns:
+        DataFrame avec une ligne par reponse
+    """
+    
+    def text_column(key):
+        # Meme convention que process_survey_response: absent -> '', NaN -> ''
+        if key not in column_mapping:
+            return pd.Series('', index=df.index, dtype=object)
+        return df[column_mapping[key]].astype(object).fillna('').astype(str)
+    
+    country_name = df[column_mapping['country']]
+    country_code = country_name.map(TARGET_COUNTRIES)
+    
+    # Salaire: valeur > 0 sinon manquant
+    if 'salary' in column_mapping:
+        salary = pd.to_numeric(df[column_mapping['salary']], errors='coerce').astype(float)
+        salary = salary.where(salary > 0)
+    else:
+        salary = pd.Series(float('nan'), index=df.index)
+    
+    # Experience: str(NaN) donne 'nan' dans la version ligne a ligne
+    if 'experience' in column_mapping:
+        experience = df[column_mapping['experience']].astype(object)
+        years_experience = experience.where(experience.notna(), 'nan').astype(str)
+        experience_level = categorize_experience_column(experience)
+    else:
+        years_experience = pd.Series('', index=df.index, dtype=object)
+        experience_level = pd.Series('Unknown', index=df.index, dtype=object)
+    
+    return pd.DataFrame({
+        'source': 'stackoverflow',
+        'country': country_code,
+        'country_name': country_name,
+        'salary_yearly': salary,
+        'currency': country_code.map(CURRENCY_MAP).fillna('EUR'),
+        'years_experience': years_experience,
+        'experience_level': experience_level,
+        'languages_worked': text_column('languages').str[:500],  # Limiter la taille
+        'developer_type': text_column('dev_type'),
+        'education_level': text_column('education'),
+        'company_size': text_column('company_size'),
+        'collected_at': datetime.now().isoformat()
+    }, index=df.index)
+
 def process_survey_response(row, column_mapping):
     """Traite une reponse individuelle de l'enquete"""
     
@@ -302,16 +474,33 @@ def categorize_experience(experience_str):
     else:
         return 'Unknown'
 
+# Regles de categorize_experience, dans le meme ordre: '10', '15', '20' et
+# 'less than 1' contiennent deja un chiffre de 0 a 3, 'more than 50' un 5
+EXPERIENCE_RULES = [
+    ('Junior', r'[0-3]|student'),
+    ('Mid-level', r'[4-9]'),
+    ('Senior', r'more than'),
+]
+
+def categorize_experience_column(experience):
+    """
+    Equivalent colonne de categorize_experience
+    
+    Les memes tests de sous-chaines sont evalues une fois par colonne puis
+    combines par np.select (premiere regle vraie gagnante).
+    """
+    
+    exp_str = experience.astype(object).astype(str).str.lower()
+    known = experience.notna().to_numpy()
+    
+    conditions = [known & exp_str.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+                  for _, pattern in EXPERIENCE_RULES]
+    levels = np.select(conditions, [level for level, _ in EXPERIENCE_RULES], default='Unknown')
+    return pd.Series(levels, index=experience.index, dtype=object)
+
 def get_currency_for_country(country_code):
     """Retourne la devise pour un pays"""
-    currency_map = {
-        'FR': 'EUR',
-        'DE': 'EUR', 
-        'NL': 'EUR',
-        'IT': 'EUR',
-        'GB': 'GBP'
-    }
-    return currency_map.get(country_code, 'EUR')
+    return CURRENCY_MAP.get(country_code, 'EUR')
 
 def save_stackoverflow_data(data, year):
     """Sauvegarde les donnees Stack Overflow"""
@@ -343,9 +532,205 @@ def save_stackoverflow_data(data, year):
     
     return global_filename, countries_saved
 
+def measure(label, func):
+    """Execute `func` et mesure duree et pic memoire Python (tracemalloc)"""
+    
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    rate = len(result) / elapsed if elapsed > 0 else 0
+    print(f"  {label}: {elapsed:.1f}s, pic memoire {peak / (1024*1024):.0f} MB, "
+          f"{len(result)} enregistrements ({rate:.0f}/s)")
+    return result
+
+def comparable_frame(records):
+    """DataFrame des enregistrements sans l'horodatage (pour comparer deux chemins)"""
+    df = pd.DataFrame(records)
+    if df.empty:
+        return df
+    return df.drop(columns=['collected_at']).reset_index(drop=True)
+
+def process_rows(df, column_mapping):
+    """Traitement ligne a ligne historique (reference pour le benchmark)"""
+    processed_data = []
+    for _, row in df.iterrows():
+        record = process_survey_response(row, column_mapping)
+        if record:
+            processed_data.append(record)
+    return processed_data
+
+def benchmark_transform(csv_path):
+    """Compare iterrows + process_survey_response au transformateur colonne"""
+    
+    df = pd.read_csv(csv_path, encoding='utf-8', low_memory=False)
+    column_mapping = detect_column_mapping(df.columns.tolist())
+    if 'country' not in column_mapping:
+        print("ERREUR: Colonne pays non trouvee")
+        return
+    
+    df_europe = df[df[column_mapping['country']].isin(TARGET_COUNTRIES.keys())].copy()
+    del df
+    
+    rows = measure("Transformation iterrows",
+                   lambda: process_rows(df_europe, column_mapping))
+    columns = measure("Transformation colonnes",
+                      lambda: transform_survey_responses(df_europe, column_mapping).to_dict('records'))
+    
+    identical = comparable_frame(rows).equals(comparable_frame(columns))
+    print(f"  Resultats identiques: {'OUI' if identical else 'NON'}")
+
+def benchmark_stackoverflow(years=(2023, 2022), chunksize=SURVEY_CHUNK_SIZE):
+    """
+    Benchmarks du traitement de l'enquete
+    
+    - transformation: iterrows + process_survey_response vs colonnes
+    - lecture: chargement complet du CSV vs blocs depuis l'archive
+    """
+    
+    print("\n=== BENCHMARK STACK OVERFLOW ===")
+    
+    for year in years:
+        zip_path = download_stackoverflow_survey(year)
+        if not zip_path:
+            continue
+        
+        csv_path = extract_survey_csv(zip_path, year)
+        if not csv_path:
+            continue
+        
+        print(f"\nEnquete {year} - transformation:")
+        benchmark_transform(csv_path)
+        
+        print(f"\nEnquete {year} - lecture:")
+        full = measure("CSV complet", lambda: process_stackoverflow_data(csv_path))
+        streamed = measure(f"Blocs de {chunksize} lignes",
+                           lambda: stream_stackoverflow_data(zip_path, chunksize))
+        
+        identical = comparable_frame(full).equals(comparable_frame(streamed))
+        print(f"  Resultats identiques: {'OUI' if identical else 'NON'}")
+
+def process_survey_year(year, chunksize=SURVEY_CHUNK_SIZE):
+    """
+    Traitement complet d'une annee (telechargement, lecture, filtre)
+    
+    Execute dans un processus dedie par process_survey_years: les erreurs
+    sont renvoyees dans le resultat pour ne pas interrompre les autres annees.
+    Les donnees reviennent en DataFrame, bien moins couteux a transferer
+    entre processus qu'une liste de dictionnaires.
+    """
+    
+    start = time.perf_counter()
+    result = {'year': year, 'data': pd.DataFrame(), 'elapsed': 0.0, 'error': None}
+    
+    try:
+        zip_path = download_stackoverflow_survey(year)
+        if not zip_path:
+            result['error'] = "telechargement impossible"
+        else:
+            data = pd.DataFrame(stream_stackoverflow_data(zip_path, chunksize, raise_errors=True))
+            if not data.empty:
+                data['survey_year'] = year
+            result['data'] = data
+    except Exception as e:
+        result['error'] = str(e)
+    
+    result['elapsed'] = time.perf_counter() - start
+    return result
+
+def process_survey_years(years, max_workers=None, chunksize=SURVEY_CHUNK_SIZE):
+    """
+    Traite plusieurs annees d'enquete en parallele, un processus par annee
+    
+    La lecture des CSV est limitee par le CPU (GIL): des processus plutot
+    que des threads, pour que la duree totale se rapproche de l'annee la
+    plus lente et non de la somme des annees.
+    
+    Args:
+        years: Annees a traiter
+        max_workers: Nombre de processus (defaut: une par annee, borne par les CPU)
+        chunksize: Lignes lues par bloc dans chaque processus
+    
+    Returns:
+        Enregistrements de toutes les annees (colonne survey_year), tries par annee
+    """
+    
+    years = sorted(set(years))
+    if max_workers is None:
+        max_workers = min(len(years), os.cpu_count() or 1)
+    
+    print(f"\n=== TRAITEMENT MULTI-ANNEES: {years[0]}-{years[-1]} ({max_workers} processus) ===")
+    
+    start = time.perf_counter()
+    results = {}
+    
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(process_survey_year, year, chunksize): year for year in years}
+        for future in as_completed(futures):
+            year = futures[future]
+            try:
+                results[year] = future.result()
+            except Exception as e:
+                # Processus interrompu (memoire, signal...)
+                results[year] = {'year': year, 'data': pd.DataFrame(), 'elapsed': 0.0, 'error': str(e)}
+    
+    wall_time = time.perf_counter() - start
+    
+    print(f"\nDurees par annee:")
+    for year in years:
+        result = results[year]
+        status = f"ERREUR: {result['error']}" if result['error'] else f"{len(result['data'])} reponses"
+        print(f"  {year}: {result['elapsed']:.1f}s - {status}")
+    
+    total_time = sum(result['elapsed'] for result in results.values())
+    slowest = max((result['elapsed'] for result in results.values()), default=0)
+    print(f"Duree totale: {wall_time:.1f}s (somme des annees: {total_time:.1f}s, "
+          f"annee la plus lente: {slowest:.1f}s)")
+    
+    frames = [results[year]['data'] for year in years if not results[year]['data'].empty]
+    if not frames:
+        return []
+    return pd.concat(frames, ignore_index=True).to_dict('records')
+
+def parse_years(value):
+    """Annees depuis la ligne de commande: '2017-2024' ou '2019,2021,2023'"""
+    
+    years = []
+    for part in value.split(','):
+        part = part.strip()
+        if '-' in part:
+            first, last = part.split('-', 1)
+            years.extend(range(int(first), int(last) + 1))
+        elif part:
+            years.append(int(part))
+    
+    unknown = [year for year in years if year not in SURVEY_URLS]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"annees non disponibles: {unknown} (disponibles: {min(SURVEY_URLS)}-{max(SURVEY_URLS)})")
+    return years
+
 def main():
     """Fonction principale du scraper Stack Overflow"""
     
+    parser = argparse.ArgumentParser(description="Scraper Stack Overflow Developer Survey")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="Benchmarks transformation (iterrows vs colonnes) et lecture (complete vs blocs)")
+    parser.add_argument('--chunksize', type=int, default=SURVEY_CHUNK_SIZE,
+                        help="Lignes lues par bloc")
+    parser.add_argument('--years', type=parse_years,
+                        help="Annees a traiter en parallele, ex: 2017-2024 ou 2019,2021")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Nombre de processus pour --years (defaut: une par annee)")
+    args = parser.parse_args()
+    
+    if args.benchmark:
+        benchmark_stackoverflow(chunksize=args.chunksize)
+        return
+    
     print("SCRAPER STACK OVERFLOW DEVELOPER SURVEY")
     print("=" * 45)
     print("OBJECTIF: Collecter donnees salaires et technologies")
@@ -353,27 +738,46 @@ def main():
     print("PAYS: France, Allemagne, Pays-Bas, Royaume-Uni, Italie")
     print("DONNEES: Salaires, experience, langages, types dev")
     
+    if args.years:
+        processed_data = process_survey_years(args.years, args.workers, args.chunksize)
+        
+        if not processed_data:
+            print("ERREUR: Aucune donnee traitee")
+            return
+        
+        year_label = f"{min(args.years)}-{max(args.years)}"
+        global_file, countries = save_stackoverflow_data(processed_data, year_label)
+        print_stackoverflow_summary(processed_data, year_label, global_file, countries)
+        
+        df = pd.DataFrame(processed_data)
+        print(f"\nRepartition par annee:")
+        for year, count in df['survey_year'].value_counts().sort_index().items():
+            print(f"  {year}: {count} reponses")
+        
+        get_client().print_stats()
+        return
+    
     # Essayer de telecharger l'enquete 2023 d'abord, puis 2022
-    csv_path = None
+    zip_path = None
     year_used = None
     
     for year in [2023, 2022]:
         print(f"\nTentative telechargement enquete {year}...")
-        csv_path = download_stackoverflow_survey(year)
+        zip_path = download_stackoverflow_survey(year)
         
-        if csv_path and os.path.exists(csv_path):
+        if zip_path and os.path.exists(zip_path):
             year_used = year
             break
         else:
             print(f"Echec pour {year}, tentative annee suivante...")
     
-    if not csv_path:
+    if not zip_path:
         print("\nERREUR: Impossible de telecharger l'enquete Stack Overflow")
         print("Verifiez votre connexion internet")
         return
     
-    # Traiter les donnees
-    processed_data = process_stackoverflow_data(csv_path)
+    # Traiter les donnees par blocs, directement depuis l'archive
+    processed_data = stream_stackoverflow_data(zip_path, args.chunksize)
     
     if not processed_data:
         print("ERREUR: Aucune donnee traitee")
@@ -381,11 +785,16 @@ def main():
     
     # Sauvegarder
     global_file, countries = save_stackoverflow_data(processed_data, year_used)
+    print_stackoverflow_summary(processed_data, year_used, global_file, countries)
+    
+    get_client().print_stats()
+
+def print_stackoverflow_summary(processed_data, year_label, global_file, countries):
+    """Statistiques finales: pays, salaires, top langages"""
     
-    # Statistiques finales
     df = pd.DataFrame(processed_data)
     
-    print(f"\n=== RESUME STACK OVERFLOW {year_used} ===")
+    print(f"\n=== RESUME STACK OVERFLOW {year_label} ===")
     print(f"Total reponses collectees: {len(processed_data)}")
     print(f"Pays traites: {', '.join(countries)}")
     print(f"Fichier global: {global_file}")
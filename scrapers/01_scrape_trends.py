@@ -26,10 +26,15 @@ LIMITATIONS:
 
 import os
 import sys
+import argparse
 import pandas as pd
 from datetime import datetime, timedelta
-import time
-import random
+
+from config import NON_INTERACTIVE, TRENDS_ANCHOR
+from checkpoint import Checkpoint
+from trends_scheduler import TrendsScheduler
+from trends_store import (to_long, write_series, load_series, summarize_series,
+                          country_trends_view, comparisons_view)
 
 # Configuration encodage pour Windows
 if sys.platform == "win32":
@@ -55,7 +60,7 @@ COUNTRIES = {
     'IT': 'IT'   # Italie
 }
 
-# Technologies a analyser (groupees par 5 max - limitation Google)
+# Technologies a analyser (regroupees en payloads de 5 max par trends_scheduler)
 TECH_GROUPS = [
     # Langages principaux
     ['Python programming', 'JavaScript programming', 'Java programming', 'TypeScript programming', 'C# programming'],
@@ -73,6 +78,13 @@ TECH_GROUPS = [
     ['PostgreSQL', 'MongoDB', 'MySQL', 'Redis database', 'Elasticsearch']
 ]
 
+# Comparaisons interessantes (derivees des payloads des groupes, sans requete dediee)
+COMPARISONS = [
+    ['Python programming', 'JavaScript programming', 'Java programming'],
+    ['React framework', 'Angular framework', 'Vue.js framework'],
+    ['Docker container', 'Kubernetes']
+]
+
 def init_pytrends():
     """Initialise pytrends avec configuration"""
     if not PYTRENDS_AVAILABLE:
@@ -90,82 +102,42 @@ def init_pytrends():
         print(f"Erreur initialisation pytrends: {e}")
         return None
 
-def analyze_tech_group(pytrends, tech_group, country_code, timeframe='today 12-m'):
+def fetch_group_series(scheduler, tech_group, country_code, timeframe='today 12-m'):
     """
-    Analyse un groupe de technologies pour un pays
+    Series hebdomadaires d'un groupe de technologies pour un pays
     
     Args:
-        pytrends: Instance TrendReq
-        tech_group: Liste de mots-cles (max 5)
+        scheduler: TrendsScheduler (payloads groupes + cache)
+        tech_group: Liste de mots-cles
         country_code: Code pays (FR, DE, etc.)
         timeframe: Periode d'analyse
+    
+    Returns:
+        DataFrame long (keyword, geo, date, value...), vide en cas d'erreur
     """
     
     print(f"  Groupe: {', '.join(tech_group)}")
     
     try:
-        # Construire la requete
-        pytrends.build_payload(
-            tech_group,
-            cat=0,           # Toutes categories
-            timeframe=timeframe,
-            geo=country_code,
-            gprop=''         # Web search
-        )
-        
-        # Recuperer donnees d'interet dans le temps
-        interest_data = pytrends.interest_over_time()
+        # Series issues des payloads groupes (cache disque si deja recuperees)
+        interest_data = scheduler.interest_over_time(tech_group, country_code, timeframe)
         
         if interest_data.empty:
             print(f"    Aucune donnee pour ce groupe")
-            return []
-        
-        # Traiter chaque technologie
-        results = []
         
-        for tech in tech_group:
-            if tech in interest_data.columns:
-                tech_series = interest_data[tech]
-                
-                # Calculer statistiques
-                avg_interest = tech_series.mean()
-                max_interest = tech_series.max()
-                min_interest = tech_series.min()
-                
-                # Calculer tendance (debut vs fin)
-                first_quarter = tech_series.head(len(tech_series)//4).mean()
-                last_quarter = tech_series.tail(len(tech_series)//4).mean()
-                
-                if last_quarter > first_quarter * 1.1:
-                    trend_direction = 'increasing'
-                elif last_quarter < first_quarter * 0.9:
-                    trend_direction = 'decreasing'
-                else:
-                    trend_direction = 'stable'
-                
-                trend_strength = abs(last_quarter - first_quarter)
-                
-                results.append({
-                    'keyword': tech,
-                    'country': country_code,
-                    'timeframe': timeframe,
-                    'avg_interest': round(avg_interest, 2),
-                    'max_interest': int(max_interest),
-                    'min_interest': int(min_interest),
-                    'trend_direction': trend_direction,
-                    'trend_strength': round(trend_strength, 2),
-                    'data_points': len(tech_series),
-                    'analysis_date': datetime.now().strftime('%Y-%m-%d'),
-                    'category': categorize_technology(tech)
-                })
-                
-                print(f"    {tech}: {avg_interest:.1f} pts (tendance: {trend_direction})")
-        
-        return results
+        series = to_long(interest_data, tech_group, country_code, timeframe)
+        print(f"    {series['keyword'].nunique()} series, {len(series)} points")
+        return series
         
     except Exception as e:
         print(f"    Erreur groupe: {e}")
-        return []
+        return to_long(pd.DataFrame(), tech_group, country_code, timeframe)
+
+def series_from_checkpoint(checkpoint, unit):
+    """Series d'une unite terminee (dates serialisees en ISO dans le checkpoint)"""
+    series = pd.DataFrame(checkpoint.load(unit))
+    series['date'] = pd.to_datetime(series['date'])
+    return series
 
 def categorize_technology(keyword):
     """Categorise une technologie"""
@@ -184,73 +156,87 @@ def categorize_technology(keyword):
     else:
         return 'Technology'
 
-def analyze_country_trends(pytrends, country_code):
-    """Analyse toutes les technologies pour un pays"""
+def analyze_country_trends(scheduler, country_code, checkpoint=None):
+    """
+    Collecte les series de toutes les technologies pour un pays
+    
+    Avec `checkpoint`, les series de chaque groupe sont conservees: une
+    reprise ne redemande que les groupes manquants.
+    """
     
     print(f"\n=== ANALYSE TENDANCES {country_code} ===")
     
-    all_results = []
+    frames = []
     
     for i, tech_group in enumerate(TECH_GROUPS):
         print(f"Groupe {i+1}/{len(TECH_GROUPS)}")
         
-        group_results = analyze_tech_group(pytrends, tech_group, country_code)
-        all_results.extend(group_results)
+        unit = f"group|{country_code}|{'|'.join(tech_group)}"
+        if checkpoint is not None and checkpoint.is_done(unit):
+            frames.append(series_from_checkpoint(checkpoint, unit))
+            print(f"  Groupe repris du checkpoint")
+            continue
         
-        # Pause entre groupes pour eviter rate limiting
-        if i < len(TECH_GROUPS) - 1:
-            delay = random.uniform(5, 10)
-            print(f"  Pause {delay:.1f}s...")
-            time.sleep(delay)
-    
-    print(f"Total {country_code}: {len(all_results)} technologies analysees")
-    return all_results
+        group_series = fetch_group_series(scheduler, tech_group, country_code)
+        if checkpoint is not None and not group_series.empty:
+            checkpoint.save(unit, group_series.to_dict('records'))
+        frames.append(group_series)
+    
+    series = pd.concat(frames, ignore_index=True)
+    print(f"Total {country_code}: {series['keyword'].nunique()} technologies collectees")
+    return series
 
-def compare_technologies(pytrends, tech_list, countries):
-    """Compare des technologies entre pays"""
+def compare_technologies(scheduler, tech_list, countries, checkpoint=None):
+    """
+    Series de comparaison de technologies par pays
+    
+    Les series sont derivees des payloads deja recuperes (remise a
+    l'echelle sur les seules technologies comparees).
+    """
     
     print(f"\n=== COMPARAISON TECHNOLOGIES ===")
     print(f"Technologies: {', '.join(tech_list)}")
     
-    comparison_results = []
+    comparison_group = ' vs '.join(tech_list)
+    frames = []
     
     for country_code in countries:
         print(f"Comparaison pour {country_code}...")
         
+        unit = f"compare|{country_code}|{'|'.join(tech_list)}"
+        if checkpoint is not None and checkpoint.is_done(unit):
+            frames.append(series_from_checkpoint(checkpoint, unit))
+            print(f"  Comparaison reprise du checkpoint")
+            continue
+        
         try:
-            pytrends.build_payload(
-                tech_list,
-                timeframe='today 12-m',
-                geo=country_code
-            )
-            
-            interest_data = pytrends.interest_over_time()
+            interest_data = scheduler.compare(tech_list, country_code, 'today 12-m')
+            country_series = to_long(interest_data, tech_list, country_code, 'today 12-m', comparison_group)
             
-            if not interest_data.empty:
-                for tech in tech_list:
-                    if tech in interest_data.columns:
-                        avg_interest = interest_data[tech].mean()
-                        
-                        comparison_results.append({
-                            'comparison_group': ' vs '.join(tech_list),
-                            'technology': tech,
-                            'country': country_code,
-                            'avg_interest': round(avg_interest, 2),
-                            'analysis_date': datetime.now().strftime('%Y-%m-%d')
-                        })
-            
-            time.sleep(2)  # Pause entre pays
+            if checkpoint is not None and not country_series.empty:
+                checkpoint.save(unit, country_series.to_dict('records'))
+            frames.append(country_series)
             
         except Exception as e:
             print(f"  Erreur pour {country_code}: {e}")
             continue
     
-    return comparison_results
+    return pd.concat(frames, ignore_index=True) if frames else to_long(pd.DataFrame(), tech_list, '', '')
+
+def build_trends_tables(series):
+    """
+    Tables de tendances et de comparaisons derivees des series
+    
+    Returns:
+        (tendances par pays, comparaisons) en DataFrames
+    """
+    summary = summarize_series(series)
+    return country_trends_view(summary, categorize_technology), comparisons_view(summary)
 
 def save_trends_data(trends_data, country_code=None):
-    """Sauvegarde les donnees de tendances"""
+    """Sauvegarde les donnees de tendances (liste d'enregistrements ou DataFrame)"""
     
-    if not trends_data:
+    if trends_data is None or len(trends_data) == 0:
         return None
 
     os.makedirs('../data/raw/google_trends', exist_ok=True)
@@ -268,8 +254,80 @@ def save_trends_data(trends_data, country_code=None):
     print(f"SAUVEGARDE: {filename} ({len(trends_data)} enregistrements)")
     return filename
 
+def save_trends_tables(series):
+    """
+    Derive et sauvegarde les tables de tendances et de comparaisons
+    
+    Returns:
+        (tendances par pays, comparaisons) en DataFrames
+    """
+    trends_df, comparisons_df = build_trends_tables(series)
+    
+    # Sauvegarder par pays
+    success_countries = []
+    for country_code in COUNTRIES.keys():
+        country_trends = trends_df[trends_df['country'] == country_code]
+        if country_trends.empty:
+            print(f"Aucune donnee pour {country_code}")
+            continue
+        save_trends_data(country_trends, country_code)
+        success_countries.append(country_code)
+    
+    # Sauvegarde globale
+    if not trends_df.empty:
+        global_file = save_trends_data(trends_df)
+        
+        print(f"\n=== RESUME GOOGLE TRENDS ===")
+        print(f"Total analyses: {len(trends_df)}")
+        print(f"Pays reussis: {', '.join(success_countries)}")
+        print(f"Fichier global: {global_file}")
+        
+        # Statistiques par pays
+        by_country = trends_df['country'].value_counts()
+        print(f"\nAnalyses par pays:")
+        for country, count in by_country.items():
+            print(f"  {country}: {count} technologies")
+        
+        # Top technologies par interet moyen
+        top_tech = trends_df.nlargest(10, 'avg_interest')[['keyword', 'country', 'avg_interest']]
+        print(f"\nTop technologies (interet moyen):")
+        for _, row in top_tech.iterrows():
+            print(f"  {row['keyword']} ({row['country']}): {row['avg_interest']} pts")
+        
+        # Technologies croissantes
+        growing = trends_df[trends_df['trend_direction'] == 'increasing'].nlargest(5, 'trend_strength')
+        if not growing.empty:
+            print(f"\nTechnologies en croissance:")
+            for _, row in growing.iterrows():
+                print(f"  {row['keyword']} ({row['country']}): +{row['trend_strength']:.1f}")
+    
+    # Sauvegarder comparaisons
+    if not comparisons_df.empty:
+        comp_file = f"../data/raw/google_trends/tech_comparisons_{datetime.now().strftime('%Y-%m-%d_%H-%M')}.csv"
+        comparisons_df.to_csv(comp_file, index=False, encoding='utf-8')
+        print(f"\nComparaisons sauvegardees: {comp_file}")
+    
+    return trends_df, comparisons_df
+
+def rebuild_trends_tables():
+    """Recalcule les tables depuis les series stockees, sans reseau"""
+    
+    print(f"\n=== RECALCUL DEPUIS LES SERIES STOCKEES ===")
+    series = load_series()
+    if series.empty:
+        print("Aucune serie stockee: lancer d'abord une collecte")
+        return
+    
+    print(f"Series: {series.groupby(['geo', 'comparison_group', 'keyword']).ngroups}, "
+          f"points: {len(series)}, pays: {', '.join(sorted(series['geo'].unique()))}")
+    save_trends_tables(series)
+
 def main():
     """Fonction principale du scraper Google Trends"""
+    parser = argparse.ArgumentParser(description="Scraper Google Trends")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="Recalcule les CSV depuis les series stockees (aucune requete)")
+    args = parser.parse_args()
     
     print("SCRAPER GOOGLE TRENDS (POPULARITE TECHNOLOGIES)")
     print("=" * 50)
@@ -278,6 +336,10 @@ def main():
     print("DONNEES: Tendances recherche langages/frameworks")
     print("PERIODE: 12 derniers mois")
     
+    if args.rebuild:
+        rebuild_trends_tables()
+        return
+    
     if not PYTRENDS_AVAILABLE:
         print("\nERREUR: pytrends non disponible")
         print("Installez avec: pip install pytrends")
@@ -292,97 +354,56 @@ def main():
     print(f"\nConfiguration:")
     print(f"Pays analyses: {', '.join(COUNTRIES.keys())}")
     print(f"Groupes de technologies: {len(TECH_GROUPS)}")
-    print(f"Technologies par groupe: max 5 (limitation Google)")
+    
+    # Payloads de 5 termes max (limitation Google), debit adapte aux 429
+    scheduler = TrendsScheduler(pytrends, TECH_GROUPS + COMPARISONS, anchor=TRENDS_ANCHOR or None)
+    print(f"Payloads par pays: {len(scheduler.payloads)}"
+          f"{' (ancrage: ' + TRENDS_ANCHOR + ')' if TRENDS_ANCHOR else ''}")
     
     # Demander confirmation
-    confirm = input(f"\nLancer l'analyse Google Trends? (o/N): ").strip().lower()
+    confirm = 'o' if NON_INTERACTIVE else input(f"\nLancer l'analyse Google Trends? (o/N): ").strip().lower()
     if confirm not in ['o', 'oui', 'y', 'yes']:
         print("Analyse Google Trends annulee")
         return
     
-    all_trends = []
-    success_countries = []
+    frames = []
+    
+    # Groupes deja analyses lors d'une execution interrompue
+    checkpoint = Checkpoint('google_trends')
     
     # Analyser par pays
     for country_code in COUNTRIES.keys():
         try:
-            country_trends = analyze_country_trends(pytrends, country_code)
-            
-            if country_trends:
-                # Sauvegarder par pays
-                save_trends_data(country_trends, country_code)
-                all_trends.extend(country_trends)
-                success_countries.append(country_code)
-            else:
-                print(f"Aucune donnee pour {country_code}")
-                
+            frames.append(analyze_country_trends(scheduler, country_code, checkpoint))
         except Exception as e:
             print(f"ERREUR {country_code}: {e}")
             continue
-        
-        # Pause entre pays
-        print(f"Pause 10s avant pays suivant...")
-        time.sleep(10)
     
     # Comparaisons interessantes
     print(f"\n=== COMPARAISONS TECHNOLOGIES ===")
     
-    comparisons = [
-        ['Python programming', 'JavaScript programming', 'Java programming'],
-        ['React framework', 'Angular framework', 'Vue.js framework'],
-        ['Docker container', 'Kubernetes']
-    ]
-    
-    comparison_data = []
-    
-    for comparison in comparisons:
+    for comparison in COMPARISONS:
         if len(comparison) <= 5:  # Limite Google
-            comp_results = compare_technologies(pytrends, comparison, list(COUNTRIES.keys()))
-            comparison_data.extend(comp_results)
-    
-    # Sauvegarde globale
-    if all_trends:
-        global_file = save_trends_data(all_trends)
-        
-        print(f"\n=== RESUME GOOGLE TRENDS ===")
-        print(f"Total analyses: {len(all_trends)}")
-        print(f"Pays reussis: {', '.join(success_countries)}")
-        print(f"Fichier global: {global_file}")
-        
-        # Statistiques par pays
-        df = pd.DataFrame(all_trends)
-        by_country = df['country'].value_counts()
-        print(f"\nAnalyses par pays:")
-        for country, count in by_country.items():
-            print(f"  {country}: {count} technologies")
-        
-        # Top technologies par interet moyen
-        top_tech = df.nlargest(10, 'avg_interest')[['keyword', 'country', 'avg_interest']]
-        print(f"\nTop technologies (interet moyen):")
-        for _, row in top_tech.iterrows():
-            print(f"  {row['keyword']} ({row['country']}): {row['avg_interest']} pts")
-        
-        # Technologies croissantes
-        growing = df[df['trend_direction'] == 'increasing'].nlargest(5, 'trend_strength')
-        if not growing.empty:
-            print(f"\nTechnologies en croissance:")
-            for _, row in growing.iterrows():
-                print(f"  {row['keyword']} ({row['country']}): +{row['trend_strength']:.1f}")
+            frames.append(compare_technologies(scheduler, comparison, list(COUNTRIES.keys()), checkpoint))
     
-    # Sauvegarder comparaisons
-    if comparison_data:
-        comp_file = f"../data/raw/google_trends/tech_comparisons_{datetime.now().strftime('%Y-%m-%d_%H-%M')}.csv"
-        df_comp = pd.DataFrame(comparison_data)
-        df_comp.to_csv(comp_file, index=False, encoding='utf-8')
-        print(f"\nComparaisons sauvegardees: {comp_file}")
+    scheduler.print_stats()
     
-    if not all_trends:
+    series = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if series.empty:
         print(f"\n=== AUCUNE DONNEE COLLECTEE ===")
         print("Causes possibles:")
         print("- Rate limiting Google Trends")
         print("- Probleme de connexion")
         print("- Mots-cles non reconnus")
         print("- Restriction geographique")
+        return
+    
+    # Series brutes conservees: nouveaux indicateurs recalculables avec --rebuild
+    paths = write_series(series, datetime.now().strftime('%Y-%m-%d_%H-%M'))
+    print(f"\nSeries sauvegardees: {len(series)} points dans {len(paths)} partitions pays")
+    
+    save_trends_tables(series)
+    checkpoint.clear()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,123 @@
+"""
+Checkpoints reprenables pour les collectes longues
+
+Chaque unite de travail terminee (page Adzuna, langage GitHub, groupe
+Google Trends...) est ecrite immediatement dans data/checkpoints/<nom>/:
+
+- <hash>.jsonl: un enregistrement JSON par ligne
+- manifest.json: unites terminees (fichier, nombre d'enregistrements,
+  metadonnees libres) et date de creation du checkpoint
+
+Ecritures atomiques (fichier temporaire + os.replace): un crash laisse
+au pire une unite a refaire, jamais un fichier tronque. Au redemarrage
+seules les unites absentes du manifeste sont recollectees. Le checkpoint
+est supprime une fois les fichiers finaux sauvegardes, et ignore s'il est
+plus vieux que CHECKPOINT_MAX_AGE_HOURS (donnees perimees).
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from config import CHECKPOINT_DIR, CHECKPOINT_MAX_AGE_HOURS
+
+
+def json_default(value):
+    """Scalaires numpy/pandas -> types Python"""
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"Type non serialisable: {type(value).__name__}")
+
+
+class Checkpoint:
+    """Progression durable d'une collecte, unite par unite"""
+
+    def __init__(self, name: str, root: str = CHECKPOINT_DIR,
+                 max_age_hours: float = CHECKPOINT_MAX_AGE_HOURS):
+        self.name = name
+        self.directory = os.path.join(root, name)
+        self.manifest_path = os.path.join(self.directory, 'manifest.json')
+        self.max_age_seconds = max_age_hours * 3600
+        self.lock = threading.Lock()
+        self.manifest = self._load_manifest()
+
+    def _new_manifest(self) -> Dict[str, Any]:
+        return {'created_at': datetime.now().timestamp(), 'units': {}}
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        if not os.path.exists(self.manifest_path):
+            return self._new_manifest()
+
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except Exception as e:
+            print(f"Checkpoint {self.name} illisible ({e}), collecte complete")
+            self.clear()
+            return self._new_manifest()
+
+        age = datetime.now().timestamp() - manifest.get('created_at', 0)
+        if age > self.max_age_seconds:
+            print(f"Checkpoint {self.name} perime ({age / 3600:.0f}h), collecte complete")
+            self.clear()
+            return self._new_manifest()
+
+        if manifest['units']:
+            print(f"Reprise checkpoint {self.name}: {len(manifest['units'])} unites deja terminees")
+        return manifest
+
+    def _write_atomic(self, path: str, content: str) -> None:
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _shard_name(unit: str) -> str:
+        return hashlib.sha1(unit.encode('utf-8')).hexdigest()[:16] + '.jsonl'
+
+    def is_done(self, unit: str) -> bool:
+        with self.lock:
+            return unit in self.manifest['units']
+
+    def meta(self, unit: str) -> Dict[str, Any]:
+        """Metadonnees enregistrees avec l'unite"""
+        with self.lock:
+            return dict(self.manifest['units'][unit].get('meta', {}))
+
+    def load(self, unit: str) -> List[Dict]:
+        """Enregistrements d'une unite terminee"""
+        with self.lock:
+            shard = self.manifest['units'][unit]['file']
+        with open(os.path.join(self.directory, shard), 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def save(self, unit: str, records: List[Dict], meta: Optional[Dict] = None) -> None:
+        """Ecrit les enregistrements de l'unite puis la marque terminee"""
+        os.makedirs(self.directory, exist_ok=True)
+        shard = self._shard_name(unit)
+        lines = ''.join(json.dumps(record, ensure_ascii=False, default=json_default) + '\n'
+                        for record in records)
+        self._write_atomic(os.path.join(self.directory, shard), lines)
+
+        with self.lock:
+            self.manifest['units'][unit] = {
+                'file': shard,
+                'count': len(records),
+                'completed_at': datetime.now().timestamp(),
+                'meta': meta or {}
+            }
+            snapshot = json.dumps(self.manifest, ensure_ascii=False, default=json_default)
+            # Sous le verrou: deux threads ne peuvent pas ecrire un manifeste plus ancien
+            self._write_atomic(self.manifest_path, snapshot)
+
+    def clear(self) -> None:
+        """Supprime le checkpoint (collecte terminee et sauvegardee)"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        with self.lock:
+            self.manifest = self._new_manifest()
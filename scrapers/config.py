@@ -2,6 +2,7 @@
 Configuration et constantes pour les scrapers TalentInsight
 """
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 # Charger les variables d'environnement
@@ -16,6 +17,65 @@ GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
 MAX_REQUESTS_PER_MINUTE = int(os.getenv('MAX_REQUESTS_PER_MINUTE', 30))
 REQUEST_DELAY_MIN = int(os.getenv('REQUEST_DELAY_MIN', 1))
 REQUEST_DELAY_MAX = int(os.getenv('REQUEST_DELAY_MAX', 3))
+MAX_CONCURRENT_REQUESTS = int(os.getenv('MAX_CONCURRENT_REQUESTS', 8))
+
+# Execution sans terminal (orchestrateur): aucune question posee sur stdin
+NON_INTERACTIVE = os.getenv('TALENTINSIGHT_NON_INTERACTIVE', '0') in ('1', 'true', 'True')
+
+# Couche HTTP partagee (pools keep-alive + retries)
+HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 10))
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 16))
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 4))
+HTTP_BACKOFF_BASE = float(os.getenv('HTTP_BACKOFF_BASE', 1.0))
+HTTP_BACKOFF_MAX = float(os.getenv('HTTP_BACKOFF_MAX', 60.0))
+
+# Debit par hote (req/min), MAX_REQUESTS_PER_MINUTE par defaut
+HOST_REQUESTS_PER_MINUTE = {
+    'api.adzuna.com': MAX_REQUESTS_PER_MINUTE,
+    'api.github.com': int(os.getenv('GITHUB_REQUESTS_PER_MINUTE', 80)),
+}
+
+# Cache HTTP sur disque (ETag / Last-Modified + TTL par hote, eviction LRU)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', '1') not in ('0', 'false', 'False')
+HTTP_CACHE_DIR = os.getenv('HTTP_CACHE_DIR', str(PROJECT_ROOT / 'data' / 'cache' / 'http'))
+HTTP_CACHE_MAX_BYTES = int(os.getenv('HTTP_CACHE_MAX_MB', 1024)) * 1024 * 1024
+HTTP_CACHE_DEFAULT_TTL = 0  # toujours revalider
+HTTP_CACHE_TTL = {
+    'api.adzuna.com': 3600,                      # 1h: preserve le quota mensuel
+    'api.github.com': 3600,
+    'raw.githubusercontent.com': 24 * 3600,      # CSV Kaggle / Glassdoor
+    'info.stackoverflowsolutions.com': 30 * 24 * 3600,  # zip annuels
+    'cdn.stackoverflow.co': 30 * 24 * 3600,
+}
+
+# Checkpoints reprenables des collectes longues (supprimes apres sauvegarde)
+CHECKPOINT_DIR = os.getenv('CHECKPOINT_DIR', str(PROJECT_ROOT / 'data' / 'checkpoints'))
+CHECKPOINT_MAX_AGE_HOURS = float(os.getenv('CHECKPOINT_MAX_AGE_HOURS', 24))
+
+# Collecte incrementale Adzuna: high-water marks par (pays, terme)
+ADZUNA_STATE_FILE = os.getenv('ADZUNA_STATE_FILE', str(PROJECT_ROOT / 'data' / 'state' / 'adzuna_watermarks.json'))
+ADZUNA_SEEN_IDS_MAX = int(os.getenv('ADZUNA_SEEN_IDS_MAX', 2000))
+
+# Localisation des proprietaires GitHub (store persistant + GraphQL par lots)
+GITHUB_OWNER_STORE = os.getenv('GITHUB_OWNER_STORE', str(PROJECT_ROOT / 'data' / 'cache' / 'github_owners.json'))
+GITHUB_OWNER_TTL_DAYS = int(os.getenv('GITHUB_OWNER_TTL_DAYS', 30))
+GITHUB_GRAPHQL_BATCH_SIZE = int(os.getenv('GITHUB_GRAPHQL_BATCH_SIZE', 50))
+
+# Balayage des langages GitHub (>100 repos par langage = plusieurs pages de recherche)
+GITHUB_MAX_WORKERS = int(os.getenv('GITHUB_MAX_WORKERS', 4))
+GITHUB_REPOS_PER_LANGUAGE = int(os.getenv('GITHUB_REPOS_PER_LANGUAGE', 30))
+
+# Google Trends: payloads groupes autour d'un terme d'ancrage ('' = sans ancrage),
+# cache disque par (mots-cles, pays, periode) et debit adaptatif sur 429
+TRENDS_ANCHOR = os.getenv('TRENDS_ANCHOR', 'Python programming')
+TRENDS_CACHE_DIR = os.getenv('TRENDS_CACHE_DIR', str(PROJECT_ROOT / 'data' / 'cache' / 'google_trends'))
+TRENDS_CACHE_TTL_HOURS = float(os.getenv('TRENDS_CACHE_TTL_HOURS', 24))
+TRENDS_MIN_INTERVAL = float(os.getenv('TRENDS_MIN_INTERVAL', 1.0))
+TRENDS_MAX_INTERVAL = float(os.getenv('TRENDS_MAX_INTERVAL', 120.0))
+TRENDS_MAX_RETRIES = int(os.getenv('TRENDS_MAX_RETRIES', 5))
+# Series hebdomadaires brutes (format long, parquet partitionne par pays)
+TRENDS_SERIES_DIR = os.getenv('TRENDS_SERIES_DIR', str(PROJECT_ROOT / 'data' / 'raw' / 'google_trends' / 'series'))
 
 # Pays cibles
 TARGET_COUNTRIES = os.getenv('TARGET_COUNTRIES', 'FR,DE,NL,GB,IT').split(',')
@@ -26,7 +86,7 @@ CLEAN_DATA_DIR = os.getenv('CLEAN_DATA_DIR', 'datasets_clean')
 LOGS_DIR = os.getenv('LOGS_DIR', 'logs')
 
 # URLs de base
-ADZUNA_BASE_URL = "https://api.adzuna.com/v1/api/jobs"
+ADZUNA_BASE_URL = os.getenv('ADZUNA_BASE_URL', "https://api.adzuna.com/v1/api/jobs")
 GITHUB_BASE_URL = "https://api.github.com"
 STACKOVERFLOW_SURVEY_URL = "https://cdn.stackoverflow.co/files/jo7n4k8s/production/49915bfd46d0902c3564fd9a06b509d08a20488c.zip"
 
@@ -56,17 +116,20 @@ TECH_SKILLS = [
     
     # Cloud et DevOps
     'Docker', 'Kubernetes', 'AWS', 'Azure', 'GCP', 'Jenkins', 'GitLab CI',
-    'Terraform', 'Ansible', 'Prometheus', 'Grafana',
+    'Terraform', 'Ansible', 'Prometheus', 'Grafana', 'DevOps',
     
     # Data Science & AI
     'Machine Learning', 'Deep Learning', 'TensorFlow', 'PyTorch', 'Pandas',
-    'NumPy', 'Scikit-learn', 'Jupyter', 'Apache Spark', 'Hadoop',
+    'NumPy', 'Scikit-learn', 'Jupyter', 'Apache Spark', 'Hadoop', 'AI',
     
     # Outils et méthodologies
     'Git', 'Scrum', 'Agile', 'REST API', 'GraphQL', 'Microservices',
     'Linux', 'Bash', 'PowerShell', 'Vim', 'VS Code'
 ]
 
+# Alias de competences -> nom canonique (utilise par skill_matcher)
+TECH_MAPPING_FILE = os.getenv('TECH_MAPPING_FILE', str(PROJECT_ROOT / 'dictionaries' / 'tech_mapping.json'))
+
 # Mapping pays code -> nom
 COUNTRY_MAPPING = {
     'FR': 'France',
@@ -83,4 +146,4 @@ ADZUNA_COUNTRY_CODES = {
     'NL': 'nl', 
     'GB': 'gb',
     'IT': 'it'
-}
\ No newline at end of file
+}
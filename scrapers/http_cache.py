@@ -0,0 +1,185 @@
+"""
+Cache HTTP sur disque pour les scrapers TalentInsight
+
+- Cle = URL + parametres tries (hash SHA-256)
+- Corps stocke dans <cle>.body, metadonnees dans <cle>.json
+  (ETag, Last-Modified, date de stockage, dernier acces, taille)
+- TTL par hote: dans la fenetre le cache repond sans reseau,
+  au-dela la reponse est revalidee (If-None-Match / If-Modified-Since)
+- Taille bornee: eviction LRU sur la date de dernier acces; la taille
+  totale est tenue a jour en memoire, le repertoire n'est parcouru que
+  lorsqu'elle depasse la limite (eviction jusqu'a EVICTION_TARGET)
+
+Un fichier de metadonnees par entree (ecriture atomique) plutot qu'un
+index global: plusieurs scrapers peuvent partager le cache en parallele.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlencode, urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from config import (HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES, HTTP_CACHE_TTL,
+                    HTTP_CACHE_DEFAULT_TTL)
+
+# En-tetes conserves avec le corps (les en-tetes de quota seraient perimes)
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+# L'eviction descend sous cette fraction de max_bytes: un parcours du
+# repertoire pour ~10% de la capacite renouvelee, pas un par ecriture
+EVICTION_TARGET = 0.9
+
+
+class HttpCache:
+    """Cache HTTP conditionnel borne en taille"""
+
+    def __init__(self, cache_dir: str = HTTP_CACHE_DIR, max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Taille des corps en cache (resynchronisee a chaque eviction: d'autres
+        # processus peuvent ecrire dans le meme repertoire)
+        self.total_bytes = sum(self._file_size(path) for path in self.cache_dir.glob('*.body'))
+
+    @staticmethod
+    def _file_size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    @staticmethod
+    def _tmp_suffix(suffix: str) -> str:
+        """Suffixe temporaire propre au processus et au thread (ecritures concurrentes)"""
+        return f"{suffix}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        query = urlencode(sorted((params or {}).items()), doseq=True)
+        return hashlib.sha256(f"{url}?{query}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def ttl_for(url: str) -> float:
+        return HTTP_CACHE_TTL.get(urlparse(url).netloc, HTTP_CACHE_DEFAULT_TTL)
+
+    def _paths(self, key: str):
+        return self.cache_dir / f"{key}.json", self.cache_dir / f"{key}.body"
+
+    def _write_meta(self, meta_path: Path, meta: Dict) -> None:
+        tmp_path = meta_path.with_suffix(self._tmp_suffix('.json'))
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        """Metadonnees de l'entree ou None si absente/incomplete"""
+        meta_path, body_path = self._paths(key)
+        if not meta_path.exists() or not body_path.exists():
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, meta: Dict, ttl: float) -> bool:
+        return time.time() - meta.get('stored_at', 0) < ttl
+
+    def conditional_headers(self, meta: Dict) -> Dict[str, str]:
+        headers = {}
+        stored = meta.get('headers', {})
+        if stored.get('ETag'):
+            headers['If-None-Match'] = stored['ETag']
+        if stored.get('Last-Modified'):
+            headers['If-Modified-Since'] = stored['Last-Modified']
+        return headers
+
+    def build_response(self, key: str, meta: Dict) -> requests.Response:
+        """Reconstruit une reponse 200 depuis le disque et met a jour le LRU"""
+        meta_path, body_path = self._paths(key)
+        with open(body_path, 'rb') as f:
+            body = f.read()
+
+        meta['last_access'] = time.time()
+        self._write_meta(meta_path, meta)
+
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = meta['url']
+        response.encoding = meta.get('encoding')
+        response.headers = CaseInsensitiveDict(meta.get('headers', {}))
+        response._content = body
+        response._content_consumed = True
+        response.from_cache = True
+        return response
+
+    def refresh(self, key: str, meta: Dict) -> requests.Response:
+        """Reponse 304: l'entree redevient fraiche"""
+        meta['stored_at'] = time.time()
+        return self.build_response(key, meta)
+
+    def store(self, key: str, response: requests.Response) -> None:
+        """Enregistre une reponse 200 (corps deja lu)"""
+        meta_path, body_path = self._paths(key)
+        body = response.content
+
+        tmp_body = body_path.with_suffix(self._tmp_suffix('.body'))
+        with open(tmp_body, 'wb') as f:
+            f.write(body)
+        with self.lock:
+            previous_size = self._file_size(body_path)
+            os.replace(tmp_body, body_path)
+            self.total_bytes += len(body) - previous_size
+            over_limit = self.total_bytes > self.max_bytes
+
+        now = time.time()
+        self._write_meta(meta_path, {
+            'url': response.url,
+            'stored_at': now,
+            'last_access': now,
+            'size': len(body),
+            'encoding': response.encoding,
+            'headers': {name: response.headers[name] for name in STORED_HEADERS
+                        if name in response.headers}
+        })
+        if over_limit:
+            self.evict()
+
+    def evict(self) -> int:
+        """Au-dela de max_bytes, supprime les entrees les moins recemment utilisees
+        jusqu'a EVICTION_TARGET * max_bytes (parcours complet)"""
+        with self.lock:
+            entries = []
+            total = 0
+            for meta_path in self.cache_dir.glob('*.json'):
+                try:
+                    with open(meta_path, 'r', encoding='utf-8') as f:
+                        meta = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                entries.append((meta.get('last_access', 0), meta.get('size', 0), meta_path.stem))
+                total += meta.get('size', 0)
+
+            removed = 0
+            target = self.max_bytes * EVICTION_TARGET if total > self.max_bytes else total
+            for _, size, key in sorted(entries):
+                if total <= target:
+                    break
+                for path in self._paths(key):
+                    try:
+                        path.unlink()
+                    except FileNotFoundError:
+                        pass
+                total -= size
+                removed += 1
+
+            self.total_bytes = total
+            return removed
@@ -0,0 +1,213 @@
+"""
+Couche HTTP partagee pour les scrapers TalentInsight
+
+- Une requests.Session unique avec pools keep-alive par hote
+- Debit controle par le token bucket de l'hote (rate_limiter)
+- Retry avec backoff exponentiel + jitter, uniquement sur statuts retryables
+- Cache disque conditionnel (http_cache): TTL par hote puis revalidation
+- Statistiques par hote: latence, retries, octets transferes, hits cache
+"""
+import random
+import threading
+import time
+from typing import Dict, Optional, Set
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_MAX_RETRIES,
+                    HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX, HOST_REQUESTS_PER_MINUTE,
+                    MAX_REQUESTS_PER_MINUTE, HTTP_CACHE_ENABLED)
+from http_cache import HttpCache
+from rate_limiter import get_bucket, parse_retry_after
+
+# Statuts pour lesquels une nouvelle tentative a du sens
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HttpClient:
+    """Client HTTP poole, limite en debit et instrumente"""
+
+    def __init__(self, pool_connections: int = HTTP_POOL_CONNECTIONS,
+                 pool_maxsize: int = HTTP_POOL_MAXSIZE,
+                 max_retries: int = HTTP_MAX_RETRIES,
+                 backoff_base: float = HTTP_BACKOFF_BASE,
+                 backoff_max: float = HTTP_BACKOFF_MAX):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        # Les retries sont geres ici (statuts + Retry-After), pas par urllib3
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize,
+                              max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.cache = HttpCache() if HTTP_CACHE_ENABLED else None
+
+        self.stats: Dict[str, Dict] = {}
+        self.stats_lock = threading.Lock()
+
+    def _bucket_for(self, url: str):
+        host = urlparse(url).netloc
+        rpm = HOST_REQUESTS_PER_MINUTE.get(host, MAX_REQUESTS_PER_MINUTE)
+        return get_bucket(url, rpm)
+
+    def _record(self, host: str, latency: float = 0.0, nbytes: int = 0,
+                retry: bool = False, error: bool = False, cache_event: Optional[str] = None) -> None:
+        with self.stats_lock:
+            host_stats = self.stats.setdefault(host, {
+                'requests': 0, 'retries': 0, 'errors': 0, 'cache_hits': 0,
+                'revalidated': 0, 'bytes': 0, 'total_latency': 0.0, 'max_latency': 0.0
+            })
+            if cache_event:
+                host_stats[cache_event] += 1
+                return
+            if retry:
+                host_stats['retries'] += 1
+                return
+            host_stats['requests'] += 1
+            host_stats['bytes'] += nbytes
+            host_stats['total_latency'] += latency
+            host_stats['max_latency'] = max(host_stats['max_latency'], latency)
+            if error:
+                host_stats['errors'] += 1
+
+    def _backoff(self, attempt: int) -> float:
+        """Backoff exponentiel avec full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+            timeout: int = 30, stream: bool = False, rate_limit: bool = True,
+            cache: bool = True, cache_ttl: Optional[float] = None,
+            retry_statuses: Optional[Set[int]] = None) -> requests.Response:
+        """
+        GET avec cache, limiteur de debit et retries
+
+        Retourne la derniere reponse recue (meme non-2xx) pour laisser
+        l'appelant gerer les statuts metier (401, 403, 404...).
+        Leve l'exception reseau si toutes les tentatives echouent.
+        Une reponse servie par le cache porte l'attribut `from_cache`.
+        `retry_statuses` remplace RETRYABLE_STATUSES (ex: sans 429 quand
+        l'appelant gere lui-meme le quota).
+        """
+        host = urlparse(url).netloc
+
+        cache_key = cache_meta = None
+        if cache and self.cache is not None:
+            cache_key = self.cache.make_key(url, params)
+            cache_meta = self.cache.lookup(cache_key)
+            ttl = self.cache.ttl_for(url) if cache_ttl is None else cache_ttl
+            if cache_meta is not None:
+                if self.cache.is_fresh(cache_meta, ttl):
+                    self._record(host, cache_event='cache_hits')
+                    return self.cache.build_response(cache_key, cache_meta)
+                headers = {**(headers or {}), **self.cache.conditional_headers(cache_meta)}
+
+        return self._send('GET', url, params=params, headers=headers, timeout=timeout,
+                          stream=stream, rate_limit=rate_limit,
+                          cache_key=cache_key, cache_meta=cache_meta, retry_statuses=retry_statuses)
+
+    def post(self, url: str, json: Optional[Dict] = None, headers: Optional[Dict] = None,
+             timeout: int = 30, rate_limit: bool = True,
+             retry_statuses: Optional[Set[int]] = None) -> requests.Response:
+        """POST (jamais mis en cache) avec limiteur de debit et retries"""
+        return self._send('POST', url, json=json, headers=headers, timeout=timeout,
+                          rate_limit=rate_limit, retry_statuses=retry_statuses)
+
+    def _send(self, method: str, url: str, params: Optional[Dict] = None,
+              json: Optional[Dict] = None, headers: Optional[Dict] = None,
+              timeout: int = 30, stream: bool = False, rate_limit: bool = True,
+              cache_key: Optional[str] = None, cache_meta: Optional[Dict] = None,
+              retry_statuses: Optional[Set[int]] = None) -> requests.Response:
+        """Boucle commune: debit, envoi, statistiques, cache, retries"""
+        host = urlparse(url).netloc
+        bucket = self._bucket_for(url) if rate_limit else None
+        if retry_statuses is None:
+            retry_statuses = RETRYABLE_STATUSES
+
+        for attempt in range(self.max_retries + 1):
+            if bucket is not None:
+                bucket.acquire()
+
+            start = time.monotonic()
+            try:
+                response = self.session.request(method, url, params=params, json=json,
+                                                headers=headers, timeout=timeout, stream=stream)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self._record(host, time.monotonic() - start, error=True)
+                if attempt >= self.max_retries:
+                    raise
+                self._record(host, retry=True)
+                time.sleep(self._backoff(attempt))
+                continue
+
+            latency = time.monotonic() - start
+            if stream:
+                nbytes = int(response.headers.get('Content-Length') or 0)
+            else:
+                nbytes = len(response.content)
+            self._record(host, latency, nbytes, error=response.status_code >= 400)
+
+            if response.status_code == 304 and cache_meta is not None:
+                self._record(host, cache_event='revalidated')
+                response.close()
+                return self.cache.refresh(cache_key, cache_meta)
+
+            if response.status_code == 200 and cache_key is not None:
+                # Lit tout le corps (meme en stream) pour l'ecrire sur disque
+                self.cache.store(cache_key, response)
+
+            if response.status_code not in retry_statuses or attempt >= self.max_retries:
+                return response
+
+            self._record(host, retry=True)
+            # Rend la connexion au pool de l'hote (jamais lue en stream)
+            response.close()
+            retry_after = response.headers.get('Retry-After')
+            if retry_after is not None:
+                wait = parse_retry_after(retry_after)
+                if bucket is not None:
+                    # Tous les threads de cet hote attendent la meme fenetre
+                    bucket.pause(wait)
+                else:
+                    time.sleep(wait)
+            else:
+                time.sleep(self._backoff(attempt))
+
+        return response
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Copie des statistiques par hote"""
+        with self.stats_lock:
+            return {host: dict(values) for host, values in self.stats.items()}
+
+    def print_stats(self) -> None:
+        """Affiche ou est passe le temps de collecte, hote par hote"""
+        stats = self.get_stats()
+        if not stats:
+            return
+
+        print("\n=== STATISTIQUES HTTP ===")
+        for host, values in sorted(stats.items(), key=lambda item: -item[1]['total_latency']):
+            avg_latency = values['total_latency'] / values['requests'] if values['requests'] else 0
+            print(f"  {host}: {values['requests']} req, {values['retries']} retries, "
+                  f"{values['errors']} erreurs, {values['cache_hits']} hits cache, "
+                  f"{values['revalidated']} revalidations (304), {values['bytes'] / 1024:.0f} KB, "
+                  f"latence moy {avg_latency * 1000:.0f} ms (max {values['max_latency'] * 1000:.0f} ms)")
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """Client HTTP partage par tous les scrapers du processus"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
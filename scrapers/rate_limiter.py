@@ -0,0 +1,99 @@
+"""
+Limiteur de debit partage pour les scrapers TalentInsight
+
+Token bucket thread-safe par hote: chaque requete consomme un jeton,
+les jetons se rechargent au rythme de MAX_REQUESTS_PER_MINUTE.
+Un en-tete Retry-After suspend le bucket pour tous les threads.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from config import MAX_REQUESTS_PER_MINUTE
+
+
+class TokenBucket:
+    """Token bucket thread-safe (rafale de `burst` requetes max)"""
+
+    def __init__(self, requests_per_minute: float = MAX_REQUESTS_PER_MINUTE, burst: int = 1):
+        self.rate = max(float(requests_per_minute), 0.001) / 60.0
+        self.capacity = max(1, int(burst))
+        self.tokens = float(self.capacity)
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.last_refill
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.last_refill = now
+
+    def acquire(self) -> float:
+        """
+        Reserve un jeton et attend si necessaire
+
+        Returns:
+            Temps d'attente effectif en secondes
+        """
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            # Reservation: le solde peut devenir negatif, chaque thread
+            # attend alors son tour sans reveiller les autres (apres la
+            # pause eventuelle, au rythme du bucket)
+            self.tokens -= 1
+            wait = max(now, self.blocked_until) - now + max(-self.tokens, 0) / self.rate
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """Suspend le bucket (ex: Retry-After recu sur un 429)"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.blocked_until = max(self.blocked_until, now + max(seconds, 0))
+            # Le calendrier repart de la fin de la pause: les requetes en
+            # attente sont espacees au rythme du bucket, pas relancees ensemble
+            self.last_refill = max(self.last_refill, self.blocked_until)
+            self.tokens = min(self.tokens, 0.0)
+
+
+def parse_retry_after(value: Optional[str], default: float = 60.0) -> float:
+    """Convertit un en-tete Retry-After (secondes ou date HTTP) en secondes"""
+    if not value:
+        return default
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(url: str, requests_per_minute: float = MAX_REQUESTS_PER_MINUTE,
+               burst: int = 1) -> TokenBucket:
+    """Retourne le bucket partage de l'hote de `url` (cree au premier appel)"""
+    host = urlparse(url).netloc or url
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(requests_per_minute, burst)
+            _buckets[host] = bucket
+        return bucket
@@ -4,11 +4,42 @@ Version adaptee - 4 scrapers fonctionnels (sans Indeed)
 """
 import os
 import sys
+import argparse
 import subprocess
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 import pandas as pd
 
+SCRAPERS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRAPERS_DIR)
+
+# Timeout par etape (secondes)
+STAGE_TIMEOUT = 1800
+
+# Graphe des etapes: une etape demarre quand toutes ses dependances sont
+# terminees. `needs_success`: ne pas lancer si une dependance a echoue
+# (le nettoyage traite ce qui est disponible, le chargement exige un
+# nettoyage reussi).
+PIPELINE_STAGES = [
+    {'name': 'adzuna', 'script': '01_scrape_adzuna.py', 'description': 'Adzuna Jobs API',
+     'cwd': SCRAPERS_DIR, 'depends_on': []},
+    {'name': 'stackoverflow', 'script': '01_scrape_stackoverflow.py', 'description': 'Stack Overflow Survey',
+     'cwd': SCRAPERS_DIR, 'depends_on': []},
+    {'name': 'github', 'script': '01_scrape_github.py', 'description': 'GitHub Trending',
+     'cwd': SCRAPERS_DIR, 'depends_on': []},
+    {'name': 'trends', 'script': '01_scrape_trends.py', 'description': 'Google Trends',
+     'cwd': SCRAPERS_DIR, 'depends_on': []},
+    {'name': 'clean', 'script': os.path.join('cleaning', '02_clean.py'), 'description': 'Nettoyage',
+     'cwd': PROJECT_ROOT, 'depends_on': ['adzuna', 'stackoverflow', 'github', 'trends']},
+    {'name': 'load', 'script': 'database.py', 'description': 'Chargement PostgreSQL',
+     'cwd': PROJECT_ROOT, 'depends_on': ['clean'], 'needs_success': True},
+]
+
+print_lock = threading.Lock()
+
 def setup_directories():
     """Cree la structure de dossiers necessaire"""
     directories = [
@@ -83,81 +114,196 @@ TARGET_COUNTRIES=FR,DE,NL,GB,IT
     print("Fichier .env cree avec succes")
     return adzuna_id, adzuna_key, github_token
 
-def run_scraper(script_name, description):
-    """Execute un scraper specifique"""
-    print(f"\n{'='*50}")
-    print(f"LANCEMENT: {description}")
-    print(f"Script: {script_name}")
-    print(f"Debut: {datetime.now().strftime('%H:%M:%S')}")
-    print('='*50)
-    
+def stream_stage(stage, timeout=STAGE_TIMEOUT):
+    """
+    Execute une etape dans un sous-processus en relayant sa sortie en direct
+
+    Chaque ligne est prefixee du nom de l'etape (sorties entrelacees des
+    etapes paralleles). stdin est ferme: les scripts tournent en mode
+    non interactif.
+    """
+    name = stage['name']
+    env = dict(os.environ, PYTHONUNBUFFERED='1', PYTHONIOENCODING='utf-8',
+               TALENTINSIGHT_NON_INTERACTIVE='1')
+    tail = deque(maxlen=20)
     start_time = time.time()
-    
+
+    with print_lock:
+        print(f"[{name}] LANCEMENT: {stage['description']} ({stage['script']}) a {datetime.now().strftime('%H:%M:%S')}")
+
     try:
-        result = subprocess.run(
-            [sys.executable, script_name],
-            cwd=os.getcwd(),
-            capture_output=True,
+        process = subprocess.Popen(
+            [sys.executable, stage['script']],
+            cwd=stage['cwd'],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
-            timeout=1800  # 30 minutes max
+            encoding='utf-8',
+            errors='replace',
+            env=env
         )
-        
-        duration = time.time() - start_time
-        
-        if result.returncode == 0:
-            print(f"SUCCES: {description}")
-            print(f"Duree: {duration:.1f}s")
-            
-            # Compter fichiers generes
-            files_count = count_generated_files(script_name)
-            
-            return {
-                'script': script_name,
-                'description': description,
-                'status': 'success',
-                'duration': duration,
-                'files_generated': files_count,
-                'output': result.stdout[-500:] if result.stdout else '',
-                'error': None
-            }
-        else:
-            print(f"ECHEC: {description}")
-            print(f"Duree: {duration:.1f}s")
-            print(f"Erreur: {result.stderr[:200]}...")
-            
-            return {
-                'script': script_name,
-                'description': description,
-                'status': 'failed',
-                'duration': duration,
-                'files_generated': 0,
-                'output': result.stdout[-300:] if result.stdout else '',
-                'error': result.stderr[-300:] if result.stderr else ''
-            }
-            
-    except subprocess.TimeoutExpired:
-        print(f"TIMEOUT: {description} (30 min)")
-        return {
-            'script': script_name,
-            'description': description,
-            'status': 'timeout',
-            'duration': 1800,
-            'files_generated': 0,
-            'output': '',
-            'error': 'Timeout apres 30 minutes'
-        }
-        
     except Exception as e:
-        print(f"ERREUR: {description} - {e}")
-        return {
-            'script': script_name,
-            'description': description,
-            'status': 'error',
-            'duration': 0,
-            'files_generated': 0,
-            'output': '',
-            'error': str(e)
-        }
+        return stage_result(stage, 'error', 0, '', str(e), start_time)
+
+    timed_out = threading.Event()
+
+    def kill_on_timeout():
+        timed_out.set()
+        process.kill()
+
+    watchdog = threading.Timer(timeout, kill_on_timeout)
+    watchdog.start()
+    try:
+        for line in process.stdout:
+            line = line.rstrip()
+            tail.append(line)
+            with print_lock:
+                print(f"[{name}] {line}")
+        process.wait()
+    finally:
+        watchdog.cancel()
+
+    duration = time.time() - start_time
+    output = '\n'.join(tail)
+
+    if timed_out.is_set():
+        status, error = 'timeout', f'Timeout apres {timeout // 60} minutes'
+    elif process.returncode == 0:
+        status, error = 'success', None
+    else:
+        status, error = 'failed', f'Code retour {process.returncode}: {output[-300:]}'
+
+    with print_lock:
+        print(f"[{name}] {status.upper()}: {stage['description']} ({duration:.1f}s)")
+
+    return stage_result(stage, status, duration, output[-500:], error, start_time)
+
+def stage_result(stage, status, duration, output, error, start_time):
+    """Resultat d'etape au format du rapport de collecte"""
+    return {
+        'name': stage['name'],
+        'script': stage['script'],
+        'description': stage['description'],
+        'status': status,
+        'duration': duration,
+        'started_at': start_time,
+        'files_generated': count_generated_files(stage['script']) if status == 'success' else 0,
+        'output': output,
+        'error': error
+    }
+
+def validate_stages(stages):
+    """Verifie dependances connues et absence de cycle"""
+    names = {stage['name'] for stage in stages}
+    for stage in stages:
+        unknown = [dep for dep in stage['depends_on'] if dep not in names]
+        if unknown:
+            raise ValueError(f"Etape {stage['name']}: dependances inconnues {unknown}")
+
+    visiting, done = set(), set()
+    by_name = {stage['name']: stage for stage in stages}
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Cycle de dependances autour de {name}")
+        visiting.add(name)
+        for dep in by_name[name]['depends_on']:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for stage in stages:
+        visit(stage['name'])
+
+def run_pipeline(stages, max_workers=4, timeout=STAGE_TIMEOUT):
+    """
+    Execute le graphe d'etapes avec au plus `max_workers` etapes simultanees
+
+    Returns:
+        Resultats par etape, dans l'ordre de `stages`
+    """
+    validate_stages(stages)
+
+    by_name = {stage['name']: stage for stage in stages}
+    results = {}
+    running = {}
+    pending = [stage['name'] for stage in stages]
+    pipeline_start = time.time()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            # Etapes pretes: toutes les dependances terminees
+            for name in list(pending):
+                stage = by_name[name]
+                deps = stage['depends_on']
+                if not all(dep in results for dep in deps):
+                    continue
+
+                pending.remove(name)
+                failed_deps = [dep for dep in deps if results[dep]['status'] != 'success']
+                if stage.get('needs_success') and failed_deps:
+                    print(f"[{name}] IGNOREE: dependances en echec {failed_deps}")
+                    results[name] = stage_result(stage, 'skipped', 0, '',
+                                                 f"Dependances en echec: {', '.join(failed_deps)}",
+                                                 time.time())
+                    continue
+
+                running[executor.submit(stream_stage, stage, timeout)] = name
+
+            if not running:
+                # Les etapes ignorees peuvent en debloquer d'autres
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    results[name] = stage_result(by_name[name], 'error', 0, '', str(e), time.time())
+
+    for result in results.values():
+        result['offset'] = result['started_at'] - pipeline_start
+
+    return [results[stage['name']] for stage in stages]
+
+def critical_path(stages, results):
+    """
+    Chemin critique mesure: la chaine de dependances la plus longue en
+    duree reelle (borne basse de la duree totale du pipeline)
+    """
+    durations = {result['name']: result['duration'] for result in results}
+    by_name = {stage['name']: stage for stage in stages}
+    longest = {}
+
+    def path_to(name):
+        if name not in longest:
+            deps = by_name[name]['depends_on']
+            best = max((path_to(dep) for dep in deps), key=lambda item: item[0], default=(0.0, []))
+            longest[name] = (best[0] + durations.get(name, 0), best[1] + [name])
+        return longest[name]
+
+    return max((path_to(stage['name']) for stage in stages), key=lambda item: item[0], default=(0.0, []))
+
+def print_timing_report(stages, results, wall_time):
+    """Temps par etape, chemin critique et gain du parallelisme"""
+    print(f"\n{'='*60}")
+    print("TEMPS PAR ETAPE")
+    print('='*60)
+
+    for result in sorted(results, key=lambda item: item['offset']):
+        print(f"  {result['name']:<15} {result['status']:<8} debut +{result['offset']:6.1f}s  "
+              f"duree {result['duration']:7.1f}s")
+
+    length, path = critical_path(stages, results)
+    total = sum(result['duration'] for result in results)
+
+    print(f"\nDuree murale: {wall_time:.1f}s")
+    print(f"Somme des etapes (execution sequentielle): {total:.1f}s")
+    print(f"Chemin critique: {' -> '.join(path)} ({length:.1f}s)")
 
 def count_generated_files(script_name):
     """Compte les fichiers generes par un scraper"""
@@ -194,7 +340,7 @@ def generate_report(results):
     
     # Statistiques
     successful = len([r for r in results if r['status'] == 'success'])
-    failed = len([r for r in results if r['status'] == 'failed'])
+    failed = len([r for r in results if r['status'] not in ('success', 'skipped')])
     total_files = sum(r['files_generated'] for r in results)
     total_duration = sum(r['duration'] for r in results)
     
@@ -235,8 +381,28 @@ def generate_report(results):
         df_report.to_csv(report_file, index=False, encoding='utf-8')
         print(f"Rapport sauvegarde: {report_file}")
 
-def main():
+def select_stages(only=None, with_clean=False, with_load=False):
+    """Sous-graphe a executer: scrapers choisis, puis nettoyage et chargement"""
+    scrapers = [stage for stage in PIPELINE_STAGES if stage['cwd'] == SCRAPERS_DIR]
+    if only:
+        scrapers = [stage for stage in scrapers if stage['name'] in only]
+
+    stages = [dict(stage) for stage in scrapers]
+    names = {stage['name'] for stage in stages}
+
+    for stage in PIPELINE_STAGES:
+        if stage['name'] == 'clean' and (with_clean or with_load):
+            stages.append(dict(stage, depends_on=[dep for dep in stage['depends_on'] if dep in names]))
+        elif stage['name'] == 'load' and with_load:
+            stages.append(dict(stage))
+
+    return stages
+
+def main(args=None):
     """Fonction principale"""
+    if args is None:
+        args = argparse.Namespace(workers=4, only=None, with_clean=False, with_load=False, yes=False)
+
     print("TALENTINSIGHT - COLLECTE AUTOMATISEE")
     print("=" * 45)
     print(f"Debut: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -255,7 +421,7 @@ def main():
     print("- Adzuna: OBLIGATOIRE (collecte emplois)")
     print("- GitHub: OPTIONNEL (evite rate limiting)")
     
-    config_choice = input("\nConfigurer les cles API maintenant? (o/N): ").strip().lower()
+    config_choice = 'n' if args.yes else input("\nConfigurer les cles API maintenant? (o/N): ").strip().lower()
     if config_choice in ['o', 'oui', 'y', 'yes']:
         adzuna_id, adzuna_key, github_token = configure_api_keys()
         
@@ -264,61 +430,29 @@ def main():
             print("\nTest rapide Adzuna...")
             # Le test sera fait par le scraper lui-meme
     
-    # 3. Configuration scrapers
-    scrapers_config = [
-        {
-            'script': '01_scrape_adzuna.py',
-            'description': 'Adzuna Jobs API',
-            'duration_estimate': '3-5 minutes'
-        },
-        {
-            'script': '01_scrape_stackoverflow.py',
-            'description': 'Stack Overflow Survey',
-            'duration_estimate': '4-6 minutes'
-        },
-        {
-            'script': '01_scrape_github.py',
-            'description': 'GitHub Trending',
-            'duration_estimate': '2-4 minutes'
-        },
-        {
-            'script': '01_scrape_trends.py',
-            'description': 'Google Trends',
-            'duration_estimate': '3-5 minutes'
-        }
-    ]
-    
-    print(f"\nSCRAPERS PROGRAMMES:")
-    for i, config in enumerate(scrapers_config, 1):
-        print(f"  {i}. {config['description']} (~{config['duration_estimate']})")
+    # 3. Graphe des etapes
+    stages = select_stages(args.only, args.with_clean, args.with_load)
     
-    print(f"\nDuree estimee totale: 12-20 minutes")
+    print(f"\nETAPES PROGRAMMEES ({args.workers} en parallele max):")
+    for i, stage in enumerate(stages, 1):
+        deps = f" (apres {', '.join(stage['depends_on'])})" if stage['depends_on'] else ''
+        print(f"  {i}. {stage['description']}{deps}")
     
     # 4. Confirmation
-    start_choice = input("\nLancer la collecte complete? (o/N): ").strip().lower()
-    if start_choice not in ['o', 'oui', 'y', 'yes']:
-        print("Collecte annulee")
-        return
+    if not args.yes:
+        start_choice = input("\nLancer la collecte complete? (o/N): ").strip().lower()
+        if start_choice not in ['o', 'oui', 'y', 'yes']:
+            print("Collecte annulee")
+            return
     
-    # 5. Execution
-    results = []
+    # 5. Execution (scrapers en parallele, nettoyage/chargement ensuite)
     total_start = time.time()
-    
-    for i, config in enumerate(scrapers_config, 1):
-        print(f"\nPROGRESS: {i}/{len(scrapers_config)}")
-        
-        result = run_scraper(config['script'], config['description'])
-        results.append(result)
-        
-        # Pause entre scrapers
-        if i < len(scrapers_config):
-            print("Pause 10 secondes...")
-            time.sleep(10)
-    
+    results = run_pipeline(stages, max_workers=args.workers)
     total_duration = time.time() - total_start
     
     # 6. Rapport final
     generate_report(results)
+    print_timing_report(stages, results, total_duration)
     
     print(f"\nCOLLECTE TERMINEE!")
     print(f"Duree totale: {total_duration/60:.1f} minutes")
@@ -340,25 +474,21 @@ def main():
 
 def run_single_scraper():
     """Mode scraper individuel"""
-    scrapers = {
-        '1': ('01_scrape_adzuna.py', 'Adzuna Jobs API'),
-        '2': ('01_scrape_stackoverflow.py', 'Stack Overflow Survey'),
-        '3': ('01_scrape_github.py', 'GitHub Trending'),
-        '4': ('01_scrape_trends.py', 'Google Trends')
-    }
+    scrapers = {str(i): stage for i, stage in enumerate(select_stages(), 1)}
     
     print("\nMODE SCRAPER INDIVIDUEL")
     print("Choisissez un scraper:")
     
-    for key, (script, desc) in scrapers.items():
-        print(f"  {key}. {desc}")
+    for key, stage in scrapers.items():
+        print(f"  {key}. {stage['description']}")
     
-    choice = input("\nVotre choix (1-4): ").strip()
+    choice = input(f"\nVotre choix (1-{len(scrapers)}): ").strip()
     
     if choice in scrapers:
-        script, description = scrapers[choice]
+        stage = scrapers[choice]
+        description = stage['description']
         setup_directories()
-        result = run_scraper(script, description)
+        result = stream_stage(stage)
         
         if result['status'] == 'success':
             print(f"\nSUCCES: {description}")
@@ -371,16 +501,19 @@ def run_single_scraper():
         print("Choix invalide")
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        if sys.argv[1] == '--single':
-            run_single_scraper()
-        elif sys.argv[1] == '--help':
-            print("TALENTINSIGHT SCRAPER")
-            print("Usage:")
-            print("  python run_all_scrapers.py          # Lance tous les scrapers")
-            print("  python run_all_scrapers.py --single # Mode individuel")
-            print("  python run_all_scrapers.py --help   # Aide")
-        else:
-            print(f"Argument inconnu: {sys.argv[1]}")
+    parser = argparse.ArgumentParser(
+        description="TALENTINSIGHT SCRAPER - scrapers en parallele, puis nettoyage et chargement")
+    parser.add_argument('--single', action='store_true', help="Mode individuel")
+    parser.add_argument('--workers', type=int, default=4, help="Etapes executees en parallele")
+    parser.add_argument('--only', type=lambda value: [name.strip() for name in value.split(',')],
+                        help="Scrapers a lancer, ex: adzuna,github")
+    parser.add_argument('--with-clean', action='store_true', help="Enchaine cleaning/02_clean.py")
+    parser.add_argument('--with-load', action='store_true',
+                        help="Enchaine nettoyage puis chargement database.py")
+    parser.add_argument('--yes', action='store_true', help="Aucune confirmation demandee")
+    cli_args = parser.parse_args()
+
+    if cli_args.single:
+        run_single_scraper()
     else:
-        main()
\ No newline at end of file
+        main(cli_args)
\ No newline at end of file
@@ -0,0 +1,191 @@
+"""
+Extraction de competences par automate Aho-Corasick
+
+Un seul automate construit a partir de TECH_SKILLS et des alias de
+dictionaries/tech_mapping.json: le texte est parcouru une fois, quel que
+soit le nombre de termes du vocabulaire.
+
+- Insensible a la casse, resultats sous forme canonique ('k8s' -> Kubernetes)
+- Limites de mots respectees: 'Go' ne matche pas dans 'Google', 'R' pas
+  dans 'Rust', 'js' pas dans 'Node.js' (un point entre deux caracteres de
+  mot ne coupe pas le mot); pour les termes d'une ou deux lettres, '&' et
+  '-' ne coupent pas non plus ('R&D', 'go-to-market')
+- Termes ambigus (mots courants: 'go', 'node', 'ai'...) reconnus
+  seulement sous leur graphie technique ('Go', 'GO'), voir CASE_SENSITIVE_TERMS
+- Ordre de sortie = ordre du vocabulaire, sans doublons
+"""
+import json
+import os
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+from config import TECH_SKILLS, TECH_MAPPING_FILE
+
+# Termes d'une ou deux lettres: ces caracteres les collent au mot voisin
+SHORT_TERM_LENGTH = 2
+SHORT_TERM_JOINERS = '&-'
+
+# Termes qui sont aussi des mots courants: graphies acceptees dans le texte
+CASE_SENSITIVE_TERMS = {
+    'go': ('Go', 'GO'),
+    'node': ('Node', 'NODE'),
+    'ts': ('TS',),
+    'py': ('Py', 'PY'),
+    'r': ('R',),
+    'ai': ('AI',),
+}
+
+
+def is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+class SkillMatcher:
+    """Automate Aho-Corasick terme -> competence canonique"""
+
+    def __init__(self, vocabulary: Dict[str, str],
+                 case_sensitive: Optional[Dict[str, tuple]] = None):
+        """
+        Args:
+            vocabulary: terme recherche -> nom canonique; l'ordre des noms
+                        canoniques (premiere apparition) fixe l'ordre de sortie
+            case_sensitive: terme -> graphies acceptees dans le texte original
+                            (les autres termes sont insensibles a la casse)
+        """
+        case_sensitive = case_sensitive or {}
+        self.canonical: List[str] = []
+        rank: Dict[str, int] = {}
+
+        # Automate: transitions, lien d'echec et sorties (longueur, rang, graphies) par etat
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.outputs: List[List[tuple]] = [[]]
+
+        for term, canonical in vocabulary.items():
+            term = term.lower().strip()
+            if not term:
+                continue
+            if canonical not in rank:
+                rank[canonical] = len(self.canonical)
+                self.canonical.append(canonical)
+            self._add(term, rank[canonical], case_sensitive.get(term))
+
+        self._build_failure_links()
+
+    def _add(self, term: str, canonical_rank: int, spellings: Optional[tuple] = None) -> None:
+        state = 0
+        for char in term:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            state = next_state
+        self.outputs[state].append((len(term), canonical_rank, spellings))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+
+                # Les termes suffixes d'un terme plus long sont aussi reconnus
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+
+    @staticmethod
+    def _is_boundary(text: str, start: int, end: int) -> bool:
+        """Le terme text[start:end] est-il un mot complet ?"""
+        joiners = SHORT_TERM_JOINERS if end - start <= SHORT_TERM_LENGTH else ''
+        if start > 0:
+            before = text[start - 1]
+            if is_word_char(before) or before in joiners \
+                    or (before == '.' and start > 1 and is_word_char(text[start - 2])):
+                return False
+        if end < len(text):
+            after = text[end]
+            if is_word_char(after) or after in joiners \
+                    or (after == '.' and end + 1 < len(text) and is_word_char(text[end + 1])):
+                return False
+        return True
+
+    def find(self, text: Optional[str]) -> List[str]:
+        """Competences canoniques presentes dans `text`, dans l'ordre du vocabulaire"""
+        if not text:
+            return []
+
+        original = str(text)
+        text = original.lower()
+        if len(text) != len(original):
+            # Minuscule de plusieurs caracteres ('İ'): positions alignees sur l'original
+            text = ''.join(char.lower()[0] for char in original)
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        found = set()
+        state = 0
+
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for length, canonical_rank, spellings in outputs[state]:
+                start = position + 1 - length
+                if canonical_rank in found or not self._is_boundary(text, start, position + 1):
+                    continue
+                if spellings is None or original[start:position + 1] in spellings:
+                    found.add(canonical_rank)
+
+        return [self.canonical[canonical_rank] for canonical_rank in sorted(found)]
+
+
+def build_vocabulary(skills: Iterable[str] = TECH_SKILLS,
+                     mapping_path: str = TECH_MAPPING_FILE) -> Dict[str, str]:
+    """
+    Vocabulaire terme -> nom canonique
+
+    TECH_SKILLS d'abord (ordre de sortie), puis les alias du dictionnaire;
+    un terme present dans le dictionnaire prend sa forme canonique
+    (ex: 'GCP' -> 'Google Cloud').
+    """
+    mapping = {}
+    if mapping_path and os.path.exists(mapping_path):
+        try:
+            with open(mapping_path, 'r', encoding='utf-8') as f:
+                mapping = {alias.lower(): canonical for alias, canonical in json.load(f).items()}
+        except Exception as e:
+            print(f"Dictionnaire de competences illisible ({e}), alias ignores")
+
+    vocabulary = {}
+    for skill in skills:
+        vocabulary[skill.lower()] = mapping.get(skill.lower(), skill)
+    for alias, canonical in mapping.items():
+        vocabulary.setdefault(alias, canonical)
+        vocabulary.setdefault(canonical.lower(), canonical)
+    return vocabulary
+
+
+_matcher: Optional[SkillMatcher] = None
+_matcher_lock = threading.Lock()
+
+
+def get_skill_matcher() -> SkillMatcher:
+    """Automate partage, construit au premier appel"""
+    global _matcher
+    with _matcher_lock:
+        if _matcher is None:
+            _matcher = SkillMatcher(build_vocabulary(), CASE_SENSITIVE_TERMS)
+        return _matcher
+
+
+def extract_skills(text: Optional[str]) -> List[str]:
+    """Competences canoniques du texte avec le vocabulaire partage"""
+    return get_skill_matcher().find(text)
@@ -0,0 +1,256 @@
+"""
+Ordonnanceur de requetes Google Trends
+
+- Regroupe les mots-cles en un minimum de payloads de 5 termes (limite
+  Google), avec un terme d'ancrage optionnel repete dans chaque payload
+  pour rendre les echelles comparables d'un payload a l'autre
+- Cache disque (parquet) par (mots-cles, pays, periode)
+- Comparaisons derivees des payloads deja recuperes: Google normalise
+  chaque payload sur son maximum, un sous-ensemble de termes d'un meme
+  payload se deduit donc par simple remise a l'echelle
+- Debit adaptatif (AIMD) au lieu de pauses fixes: l'intervalle entre
+  requetes double sur un 429 et redescend progressivement apres succes
+"""
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from config import (TRENDS_CACHE_DIR, TRENDS_CACHE_TTL_HOURS, TRENDS_MIN_INTERVAL,
+                    TRENDS_MAX_INTERVAL, TRENDS_MAX_RETRIES)
+
+# Limite Google: 5 termes par payload
+PAYLOAD_SIZE = 5
+
+
+class AdaptiveThrottle:
+    """Intervalle entre requetes: augmentation multiplicative sur 429, diminution additive sinon"""
+
+    def __init__(self, min_interval: float = TRENDS_MIN_INTERVAL,
+                 max_interval: float = TRENDS_MAX_INTERVAL,
+                 decrease_step: float = 0.5):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.decrease_step = decrease_step
+        self.interval = min_interval
+        self.last_request = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self.lock:
+            delay = self.last_request + self.interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.last_request = time.monotonic()
+
+    def success(self) -> None:
+        with self.lock:
+            self.interval = max(self.min_interval, self.interval - self.decrease_step)
+
+    def throttled(self) -> float:
+        with self.lock:
+            self.interval = min(self.max_interval, max(self.interval * 2, self.min_interval * 2))
+            return self.interval
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """Erreur pytrends correspondant a un 429 (selon les versions de pytrends)"""
+    response = getattr(error, 'response', None)
+    if getattr(response, 'status_code', None) == 429:
+        return True
+    return type(error).__name__ == 'TooManyRequestsError' or '429' in str(error)
+
+
+def pack_keywords(keyword_groups: Iterable[Sequence[str]], anchor: Optional[str] = None) -> List[Tuple[str, ...]]:
+    """
+    Regroupe les mots-cles uniques (ordre conserve) en payloads de 5 termes
+
+    Avec un ancrage, chaque payload contient l'ancrage + 4 termes.
+    """
+    keywords = []
+    for group in keyword_groups:
+        for keyword in group:
+            if keyword not in keywords and keyword != anchor:
+                keywords.append(keyword)
+
+    size = PAYLOAD_SIZE - 1 if anchor else PAYLOAD_SIZE
+    payloads = []
+    for start in range(0, len(keywords), size):
+        chunk = tuple(keywords[start:start + size])
+        payloads.append((anchor,) + chunk if anchor else chunk)
+    return payloads
+
+
+def rescale_to_max(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalisation Google: le maximum de l'ensemble vaut 100"""
+    peak = df.max().max()
+    if not peak or pd.isna(peak):
+        return df
+    return df * (100.0 / peak)
+
+
+class TrendsScheduler:
+    """Acces a interest_over_time par payloads groupes, caches et derives"""
+
+    def __init__(self, pytrends, keyword_groups: Iterable[Sequence[str]], anchor: Optional[str] = None,
+                 cache_dir: str = TRENDS_CACHE_DIR, cache_ttl_hours: float = TRENDS_CACHE_TTL_HOURS,
+                 max_retries: int = TRENDS_MAX_RETRIES, throttle: Optional[AdaptiveThrottle] = None):
+        self.pytrends = pytrends
+        self.anchor = anchor
+        self.payloads = pack_keywords(keyword_groups, anchor)
+        self.cache_dir = cache_dir
+        self.cache_ttl_seconds = cache_ttl_hours * 3600
+        self.max_retries = max_retries
+        self.throttle = throttle or AdaptiveThrottle()
+        self.memory: Dict[Tuple, pd.DataFrame] = {}
+        self.stats = {'requests': 0, 'cache_hits': 0, 'derived': 0, 'rate_limited': 0}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # Cache disque
+
+    def _cache_path(self, keywords: Sequence[str], geo: str, timeframe: str) -> str:
+        key = '|'.join(keywords) + f'#{geo}#{timeframe}'
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.parquet')
+
+    def _read_cache(self, path: str) -> Optional[pd.DataFrame]:
+        if not os.path.exists(path):
+            return None
+        if time.time() - os.path.getmtime(path) > self.cache_ttl_seconds:
+            return None
+        try:
+            return pd.read_parquet(path)
+        except Exception:
+            return None
+
+    def _write_cache(self, path: str, df: pd.DataFrame) -> None:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+
+    # Requetes
+
+    def fetch_payload(self, keywords: Sequence[str], geo: str, timeframe: str) -> pd.DataFrame:
+        """
+        interest_over_time d'un payload (memoire, puis disque, puis reseau)
+
+        Returns:
+            DataFrame indexe par date, une colonne par mot-cle (vide si
+            Google n'a pas de donnees)
+        """
+        keywords = tuple(keywords)
+        memory_key = (keywords, geo, timeframe)
+        if memory_key in self.memory:
+            return self.memory[memory_key]
+
+        path = self._cache_path(keywords, geo, timeframe)
+        df = self._read_cache(path)
+        if df is not None:
+            self.stats['cache_hits'] += 1
+        else:
+            df = self._request(keywords, geo, timeframe)
+            self._write_cache(path, df)
+
+        self.memory[memory_key] = df
+        return df
+
+    def _request(self, keywords: Tuple[str, ...], geo: str, timeframe: str) -> pd.DataFrame:
+        for attempt in range(self.max_retries + 1):
+            self.throttle.wait()
+            self.stats['requests'] += 1
+            try:
+                self.pytrends.build_payload(list(keywords), cat=0, timeframe=timeframe, geo=geo, gprop='')
+                df = self.pytrends.interest_over_time()
+            except Exception as e:
+                if not is_rate_limited(e) or attempt >= self.max_retries:
+                    raise
+                self.stats['rate_limited'] += 1
+                interval = self.throttle.throttled()
+                print(f"    429 Google Trends, intervalle porte a {interval:.0f}s")
+                continue
+
+            self.throttle.success()
+            return df.drop(columns=['isPartial'], errors='ignore').astype(float)
+
+    def _payloads_for(self, keywords: Sequence[str]) -> List[Tuple[str, ...]]:
+        return [payload for payload in self.payloads if any(keyword in payload for keyword in keywords)]
+
+    def interest_over_time(self, keywords: Sequence[str], geo: str, timeframe: str = 'today 12-m') -> pd.DataFrame:
+        """
+        Series des mots-cles telles que recuperees dans leurs payloads
+
+        Sans ancrage: valeurs du payload (chaque payload a son echelle).
+        Avec ancrage: tous les payloads du pays sont ramenes a l'echelle
+        du premier via le terme d'ancrage, puis normalises sur 100.
+        """
+        if not self.anchor:
+            frames = [self.fetch_payload(payload, geo, timeframe) for payload in self._payloads_for(keywords)]
+            frames = [df for df in frames if not df.empty]
+            if not frames:
+                return pd.DataFrame()
+            combined = pd.concat(frames, axis=1)
+            return combined[[keyword for keyword in keywords if keyword in combined.columns]]
+
+        combined = self._anchored(geo, timeframe)
+        if combined.empty:
+            return combined
+        return combined[[keyword for keyword in keywords if keyword in combined.columns]]
+
+    def _anchored(self, geo: str, timeframe: str) -> pd.DataFrame:
+        """Tous les payloads d'un pays sur l'echelle commune de l'ancrage"""
+        memory_key = ('__anchored__', geo, timeframe)
+        if memory_key in self.memory:
+            return self.memory[memory_key]
+
+        reference = None
+        scaled = []
+        for payload in self.payloads:
+            df = self.fetch_payload(payload, geo, timeframe)
+            if df.empty or self.anchor not in df.columns:
+                continue
+
+            anchor_total = df[self.anchor].sum()
+            if not anchor_total:
+                print(f"    Ancrage '{self.anchor}' nul pour {geo}, payload ignore")
+                continue
+            if reference is None:
+                reference = anchor_total
+
+            factor = reference / anchor_total
+            columns = [keyword for keyword in payload if keyword != self.anchor]
+            if not scaled:
+                columns = [self.anchor] + columns
+            scaled.append(df[columns] * factor)
+
+        combined = rescale_to_max(pd.concat(scaled, axis=1)) if scaled else pd.DataFrame()
+        self.memory[memory_key] = combined
+        return combined
+
+    def compare(self, keywords: Sequence[str], geo: str, timeframe: str = 'today 12-m') -> pd.DataFrame:
+        """
+        Series des mots-cles normalisees entre elles, comme un payload dedie
+
+        Derivees sans requete si les termes partagent un payload (ou si un
+        ancrage rend les payloads comparables); sinon payload dedie.
+        """
+        keywords = list(keywords)
+        payloads = self._payloads_for(keywords)
+        same_payload = any(all(keyword in payload for keyword in keywords) for payload in payloads)
+
+        if same_payload or self.anchor:
+            df = self.interest_over_time(keywords, geo, timeframe)
+            if not df.empty and len(df.columns) == len(keywords):
+                self.stats['derived'] += 1
+                return rescale_to_max(df)
+
+        return self.fetch_payload(keywords, geo, timeframe)
+
+    def print_stats(self) -> None:
+        print(f"\n=== REQUETES GOOGLE TRENDS ===")
+        print(f"  Payloads planifies par pays: {len(self.payloads)}"
+              f"{' (ancrage: ' + self.anchor + ')' if self.anchor else ''}")
+        print(f"  Requetes reseau: {self.stats['requests']}, hits cache: {self.stats['cache_hits']}, "
+              f"comparaisons derivees: {self.stats['derived']}, 429: {self.stats['rate_limited']}, "
+              f"intervalle final: {self.throttle.interval:.1f}s")
@@ -0,0 +1,141 @@
+"""
+Series Google Trends brutes et indicateurs derives
+
+Les series hebdomadaires sont conservees en format long
+(keyword, geo, date, value) dans data/raw/google_trends/series/,
+partitionnees par pays (geo=FR/<run>.parquet, un fichier par execution).
+
+Les tables de tendances (trends_*.csv) et de comparaisons
+(tech_comparisons_*.csv) sont des vues derivees: un seul groupby
+vectorise sur toutes les series, recalculable sans reseau
+(--rebuild). Ajouter un indicateur = modifier summarize_series.
+
+comparison_group vaut '' pour les series par pays et 'A vs B' pour les
+series d'une comparaison (normalisees entre les seules technologies
+comparees).
+"""
+import glob
+import os
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import TRENDS_SERIES_DIR
+
+SERIES_COLUMNS = ['keyword', 'geo', 'date', 'value', 'timeframe', 'comparison_group', 'run_id']
+
+
+def to_long(interest_data: pd.DataFrame, keywords: List[str], geo: str, timeframe: str,
+            comparison_group: str = '') -> pd.DataFrame:
+    """interest_over_time (une colonne par mot-cle) -> format long"""
+    columns = [keyword for keyword in keywords if keyword in interest_data.columns]
+    if interest_data.empty or not columns:
+        return pd.DataFrame(columns=SERIES_COLUMNS[:-1])
+
+    wide = interest_data[columns].copy()
+    wide.index = pd.to_datetime(wide.index).rename('date')
+    long_df = wide.reset_index().melt(id_vars='date', var_name='keyword', value_name='value')
+    long_df['geo'] = geo
+    long_df['timeframe'] = timeframe
+    long_df['comparison_group'] = comparison_group
+    long_df['value'] = long_df['value'].astype(float)
+    return long_df[SERIES_COLUMNS[:-1]]
+
+
+def write_series(series: pd.DataFrame, run_id: str, root: str = TRENDS_SERIES_DIR) -> List[str]:
+    """Ecrit un fichier parquet par pays pour cette execution"""
+    paths = []
+    for geo, part in series.groupby('geo', sort=True):
+        directory = os.path.join(root, f"geo={geo}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{run_id}.parquet")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        part.drop(columns='geo').assign(run_id=run_id).to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        paths.append(path)
+    return paths
+
+
+def load_series(root: str = TRENDS_SERIES_DIR, latest_only: bool = True) -> pd.DataFrame:
+    """
+    Relit toutes les series stockees
+
+    Avec latest_only, chaque (pays, comparaison, mot-cle) ne garde que son
+    execution la plus recente (Google revise les dernieres semaines).
+    """
+    frames = []
+    for path in sorted(glob.glob(os.path.join(root, 'geo=*', '*.parquet'))):
+        part = pd.read_parquet(path)
+        part['geo'] = os.path.basename(os.path.dirname(path)).split('=', 1)[1]
+        frames.append(part)
+    if not frames:
+        return pd.DataFrame(columns=SERIES_COLUMNS)
+
+    series = pd.concat(frames, ignore_index=True)[SERIES_COLUMNS]
+    if latest_only:
+        keys = ['geo', 'comparison_group', 'keyword']
+        latest = series.groupby(keys, sort=False)['run_id'].transform('max')
+        series = series[series['run_id'] == latest]
+    return series.reset_index(drop=True)
+
+
+def summarize_series(series: pd.DataFrame) -> pd.DataFrame:
+    """
+    Indicateurs par (pays, comparaison, mot-cle) en une passe vectorisee
+
+    Memes definitions que l'ancienne analyse serie par serie: moyenne,
+    max, min, tendance = dernier quart vs premier quart (+/-10%).
+    """
+    keys = ['geo', 'comparison_group', 'keyword']
+    if series.empty:
+        return pd.DataFrame(columns=keys + ['timeframe', 'avg_interest', 'max_interest', 'min_interest',
+                                            'trend_direction', 'trend_strength', 'data_points'])
+
+    # Ordre de premiere apparition conserve (pays, groupes, mots-cles collectes)
+    ordered = series.assign(series_order=series.groupby(keys, sort=False).ngroup())
+    ordered = ordered.sort_values(['series_order', 'date'], kind='stable')
+    grouped = ordered.groupby('series_order', sort=False)
+    position = grouped.cumcount()
+    size = grouped['value'].transform('size')
+    quarter = size // 4
+
+    ordered = ordered.assign(
+        first_value=ordered['value'].where(position < quarter),
+        last_value=ordered['value'].where(position >= size - quarter)
+    )
+    summary = ordered.groupby(['series_order'] + keys, sort=True).agg(
+        timeframe=('timeframe', 'first'),
+        avg_interest=('value', 'mean'),
+        max_interest=('value', 'max'),
+        min_interest=('value', 'min'),
+        data_points=('value', 'size'),
+        first_quarter=('first_value', 'mean'),
+        last_quarter=('last_value', 'mean')
+    ).reset_index()
+
+    first, last = summary['first_quarter'], summary['last_quarter']
+    summary['trend_direction'] = np.select(
+        [last > first * 1.1, last < first * 0.9], ['increasing', 'decreasing'], default='stable')
+    summary['trend_strength'] = (last - first).abs().round(2)
+    summary['avg_interest'] = summary['avg_interest'].round(2)
+    summary['max_interest'] = summary['max_interest'].astype(int)
+    summary['min_interest'] = summary['min_interest'].astype(int)
+    return summary.drop(columns=['series_order', 'first_quarter', 'last_quarter'])
+
+
+def country_trends_view(summary: pd.DataFrame, categorize, analysis_date: Optional[str] = None) -> pd.DataFrame:
+    """Table trends_*.csv: une ligne par (mot-cle, pays)"""
+    rows = summary[summary['comparison_group'] == ''].rename(columns={'geo': 'country'})
+    rows = rows.assign(analysis_date=analysis_date or pd.Timestamp.now().strftime('%Y-%m-%d'),
+                       category=rows['keyword'].map(categorize))
+    return rows[['keyword', 'country', 'timeframe', 'avg_interest', 'max_interest', 'min_interest',
+                 'trend_direction', 'trend_strength', 'data_points', 'analysis_date', 'category']]
+
+
+def comparisons_view(summary: pd.DataFrame, analysis_date: Optional[str] = None) -> pd.DataFrame:
+    """Table tech_comparisons_*.csv: une ligne par (comparaison, technologie, pays)"""
+    rows = summary[summary['comparison_group'] != '']
+    rows = rows.rename(columns={'geo': 'country', 'keyword': 'technology'})
+    rows = rows.assign(analysis_date=analysis_date or pd.Timestamp.now().strftime('%Y-%m-%d'))
+    return rows[['comparison_group', 'technology', 'country', 'avg_interest', 'analysis_date']]
@@ -2,14 +2,14 @@
 Fonctions utilitaires pour les scrapers TalentInsight
 """
 import os
-import time
-import random
 import logging
 import requests
 import pandas as pd
 from datetime import datetime
 from typing import List, Dict, Optional
-from config import DEFAULT_HEADERS, REQUEST_DELAY_MIN, REQUEST_DELAY_MAX, TECH_SKILLS
+from config import DEFAULT_HEADERS
+from http_session import get_client
+from skill_matcher import SkillMatcher, extract_skills
 
 def setup_logging(scraper_name: str) -> logging.Logger:
     """Configure le logging pour un scraper"""
@@ -44,21 +44,22 @@ def setup_logging(scraper_name: str) -> logging.Logger:
 
 def safe_request(url: str, headers: Optional[Dict] = None, params: Optional[Dict] = None, 
                 delay: bool = True, timeout: int = 30) -> Optional[requests.Response]:
-    """Effectue une requête HTTP sécurisée avec gestion d'erreurs"""
+    """Effectue une requête HTTP sécurisée avec gestion d'erreurs
     
-    if delay:
-        time.sleep(random.uniform(REQUEST_DELAY_MIN, REQUEST_DELAY_MAX))
+    `delay` active le limiteur de débit de l'hôte (plus de pause fixe).
+    """
     
     request_headers = DEFAULT_HEADERS.copy()
     if headers:
         request_headers.update(headers)
     
     try:
-        response = requests.get(
+        response = get_client().get(
             url, 
             headers=request_headers, 
             params=params,
-            timeout=timeout
+            timeout=timeout,
+            rate_limit=delay
         )
         response.raise_for_status()
         return response
@@ -77,22 +78,18 @@ def safe_request(url: str, headers: Optional[Dict] = None, params: Optional[Dict
         return None
 
 def extract_skills_from_text(text: str, skills_list: List[str] = None) -> List[str]:
-    """Extrait les compétences techniques d'un texte"""
+    """Extrait les compétences techniques d'un texte (mots complets, sans doublons)
+    
+    Sans `skills_list`, utilise l'automate partagé (TECH_SKILLS + alias
+    de dictionaries/tech_mapping.json).
+    """
     if not text:
         return []
     
     if skills_list is None:
-        skills_list = TECH_SKILLS
-    
-    text_lower = text.lower()
-    found_skills = []
-    
-    for skill in skills_list:
-        # Recherche exacte (mots complets)
-        if f" {skill.lower()} " in f" {text_lower} ":
-            found_skills.append(skill)
+        return extract_skills(text)
     
-    return list(set(found_skills))  # Supprime les doublons
+    return SkillMatcher({skill: skill for skill in skills_list}).find(text)
 
 def clean_salary(salary_str: str) -> Optional[float]:
     """Nettoie et convertit une chaîne de salaire en nombre"""